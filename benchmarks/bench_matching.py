@@ -0,0 +1,105 @@
+"""
+Micro-benchmark: external audio/subtitle name matching, threads vs processes.
+
+Scores every (video, sidecar) pair of synthetic folders with
+name_matching.score_folder, the CPU-bound stage VideoScanner runs per folder,
+spread over a thread pool and a process pool of 1, 2, 4 ... CPU-count
+workers. Threads share the GIL, so only the process pool should scale.
+
+Run: python benchmarks/bench_matching.py [--folders 8 --lessons 300 --output results.json]
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from name_matching import score_folder
+from synthetic_library import LESSON_WORDS
+
+SIDECAR_SUFFIXES = [' [rus].mka', ' [eng].mka', '.ru.srt', '.en.srt']
+
+
+def make_folders(folders, lessons, seed=1):
+    """[(video_names, sidecar_names)] named like real course folders."""
+    rng = random.Random(seed)
+    result = []
+    for _ in range(folders):
+        stems = [f"{n + 1:02d}. {' '.join(rng.sample(LESSON_WORDS, 3))}" for n in range(lessons)]
+        videos = [f"{stem}.mp4" for stem in stems]
+        sidecars = [f"{stem}{suffix}" for stem in stems for suffix in SIDECAR_SUFFIXES
+                    if rng.random() < 0.5]
+        result.append((videos, sidecars))
+    return result
+
+
+def run(pool_cls, workers, folders):
+    """Seconds to score all folders, each split into one chunk per worker."""
+    start = time.perf_counter()
+    with pool_cls(max_workers=workers) as pool:
+        futures = []
+        for videos, sidecars in folders:
+            size = max(1, -(-len(videos) // workers))
+            for i in range(0, len(videos), size):
+                futures.append(pool.submit(score_folder, videos[i:i + size], sidecars))
+        pairs = sum(len(f.result()) for f in futures)
+    return time.perf_counter() - start, pairs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark name matching with threads and processes")
+    parser.add_argument('--folders', type=int, default=8)
+    parser.add_argument('--lessons', type=int, default=300, help="videos per folder")
+    parser.add_argument('--output', help="write the JSON report to this file")
+    args = parser.parse_args()
+
+    folders = make_folders(args.folders, args.lessons)
+    cpus = os.cpu_count() or 1
+    counts = sorted({1, 2, 4, cpus} - {n for n in (2, 4) if n > cpus})
+
+    inline_start = time.perf_counter()
+    for videos, sidecars in folders:
+        score_folder(videos, sidecars)
+    inline = time.perf_counter() - inline_start
+    print(f"{'inline':<8} {'':>3} {inline:8.3f} s", file=sys.stderr)
+
+    results = []
+    for name, pool_cls in (('thread', ThreadPoolExecutor), ('process', ProcessPoolExecutor)):
+        for workers in counts:
+            seconds, pairs = run(pool_cls, workers, folders)
+            results.append({
+                'executor': name,
+                'workers': workers,
+                'seconds': round(seconds, 3),
+                'pairs_per_sec': round(pairs / seconds),
+                'speedup': round(inline / seconds, 2),
+            })
+            print(f"{name:<8} {workers:>3} {seconds:8.3f} s  x{inline / seconds:.2f}", file=sys.stderr)
+
+    report = {
+        'benchmark': 'name_matching',
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': cpus,
+        'pairs': sum(len(v) * len(s) for v, s in folders),
+        'inline_seconds': round(inline, 3),
+        'results': results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text, encoding='utf-8')
+        print(f"Report saved to {args.output}", file=sys.stderr)
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,266 @@
+"""
+End-to-end scanner benchmark.
+
+Generates (or reuses) a synthetic library and runs VideoScanner.scan_directory
+three times against a fresh data directory:
+
+    cold     empty DB and thumbnail cache
+    warm     nothing changed since the cold scan
+    partial  after re-encoding, renaming, deleting and adding a share of lessons
+
+For each phase the report has wall time, files/sec, ffprobe and ffmpeg process
+counts, SQL statements executed and peak RSS. The report is JSON so results
+can be kept and compared between versions:
+
+    python benchmarks/bench_scanner.py --workdir /tmp/vcp-bench --output results.json
+
+With --backend fake no binaries are needed: the library holds placeholder
+files and media_backend.FakeMediaBackend answers probes and frame requests
+after --probe-latency / --frame-latency seconds (calls are counted as runs).
+"""
+import io
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import threading
+import subprocess
+import contextlib
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import media_backend
+from scanner import VideoScanner
+from database import DatabaseManager
+from media_backend import FakeMediaBackend
+from synthetic_library import SyntheticLibrary, find_binary
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process (and of finished child processes)."""
+    try:
+        import resource
+    except ImportError:
+        resource = None
+
+    if resource:
+        # ru_maxrss is in KB on Linux and in bytes on macOS
+        scale = 1024 * 1024 if sys.platform == 'darwin' else 1024
+        own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+        children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale
+        return round(own, 1), round(children, 1)
+
+    if sys.platform == 'win32':
+        import ctypes
+        from ctypes import wintypes
+
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [
+                ('cb', wintypes.DWORD), ('PageFaultCount', wintypes.DWORD),
+                ('PeakWorkingSetSize', ctypes.c_size_t), ('WorkingSetSize', ctypes.c_size_t),
+                ('QuotaPeakPagedPoolUsage', ctypes.c_size_t), ('QuotaPagedPoolUsage', ctypes.c_size_t),
+                ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t), ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+                ('PagefileUsage', ctypes.c_size_t), ('PeakPagefileUsage', ctypes.c_size_t),
+            ]
+
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        handle = ctypes.windll.kernel32.GetCurrentProcess()
+        if ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+            return round(counters.PeakWorkingSetSize / (1024 * 1024), 1), None
+    return None, None
+
+
+class ScanProbe:
+    """
+    Counts processes and SQL statements while active.
+    subprocess.run is wrapped inside media_backend only; every connection
+    opened through DatabaseManager gets a trace callback.
+    """
+
+    def __init__(self, ffmpeg, ffprobe):
+        self.binaries = {str(ffmpeg): 'ffmpeg', str(ffprobe): 'ffprobe'}
+        self.processes = {'ffmpeg': 0, 'ffprobe': 0, 'other': 0}
+        self.statements = 0  # sqlite also reports statements run by triggers
+        self._lock = threading.Lock()
+
+    def _trace(self, sql):
+        with self._lock:
+            self.statements += 1
+
+    @contextlib.contextmanager
+    def active(self):
+        original_run = media_backend.subprocess.run
+        original_connect = DatabaseManager.get_connection
+        probe = self
+
+        def counting_run(cmd, *args, **kwargs):
+            kind = probe.binaries.get(str(cmd[0]), 'other') if cmd else 'other'
+            with probe._lock:
+                probe.processes[kind] += 1
+            return original_run(cmd, *args, **kwargs)
+
+        def traced_connection(self, timeout=10):
+            conn = original_connect(self, timeout)
+            conn.set_trace_callback(probe._trace)
+            return conn
+
+        # media_backend does "import subprocess": patch the attribute it resolves at call time
+        media_backend.subprocess = _SubprocessProxy(counting_run)
+        DatabaseManager.get_connection = traced_connection
+        try:
+            yield self
+        finally:
+            media_backend.subprocess = subprocess
+            DatabaseManager.get_connection = original_connect
+
+
+class _SubprocessProxy:
+    """subprocess module with run() replaced, everything else passed through."""
+
+    def __init__(self, run):
+        self.run = run
+
+    def __getattr__(self, name):
+        return getattr(subprocess, name)
+
+
+def write_config(workdir, ffmpeg, ffprobe, workers, executor='thread'):
+    config = Path(workdir) / 'bench.ini'
+    lines = ["[Paths]", f"thumbnails_dir = {Path(workdir) / 'data' / 'video_thumbnails'}"]
+    if ffmpeg:
+        lines.append(f"ffmpeg_path = {ffmpeg}")
+    if ffprobe:
+        lines.append(f"ffprobe_path = {ffprobe}")
+    lines += ["[Performance]", f"max_workers = {workers}", f"executor = {executor}"]
+    config.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+    return config
+
+
+def run_phase(name, library_root, config, data_dir, ffmpeg, ffprobe, verbose, fake=None):
+    probe = ScanProbe(ffmpeg, ffprobe)
+    output = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+    with output, probe.active():
+        backend = None
+        if fake:
+            backend = FakeMediaBackend(**fake)
+        # A fresh scanner per phase: stats are cumulative per instance
+        scan = VideoScanner(config_file=str(config), data_dir=data_dir, media_backend=backend)
+        start = time.perf_counter()
+        videos, folders = scan.scan_directory(str(library_root))
+        elapsed = time.perf_counter() - start
+
+    if backend:
+        probe.processes['ffprobe'] = backend.calls['probe']
+        probe.processes['ffmpeg'] = backend.calls['frame']
+
+    rss, children_rss = peak_rss_mb()
+    result = {
+        'seconds': round(elapsed, 3),
+        'videos': videos,
+        'folders': folders,
+        'files_per_sec': round(videos / elapsed, 1) if elapsed else None,
+        'ffprobe_runs': probe.processes['ffprobe'],
+        'ffmpeg_runs': probe.processes['ffmpeg'],
+        'db_statements': probe.statements,
+        'peak_rss_mb': rss,
+        'peak_child_rss_mb': children_rss,
+        'thumbnails_generated': scan.stats['thumbnails_generated'],
+        'thumbnails_cached': scan.stats['thumbnails_cached'],
+        'thumbnails_failed': scan.stats['thumbnails_failed'],
+        'stages': scan.metrics.snapshot()['stages'],
+    }
+    print(f"{name:<8} {result['seconds']:8.2f} s {result['files_per_sec'] or 0:9.1f} files/s "
+          f"ffprobe={result['ffprobe_runs']} ffmpeg={result['ffmpeg_runs']} "
+          f"sql={result['db_statements']} rss={rss} MB", file=sys.stderr)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark VideoScanner.scan_directory")
+    parser.add_argument('--workdir', help="where the library and scan data live (default: temp dir)")
+    parser.add_argument('--keep', action='store_true', help="keep a temporary workdir")
+    parser.add_argument('--courses', type=int, default=5)
+    parser.add_argument('--modules', type=int, default=4)
+    parser.add_argument('--lessons', type=int, default=25)
+    parser.add_argument('--change', type=float, default=0.05, help="share of lessons touched for the partial scan")
+    parser.add_argument('--workers', type=int, default=8, help="[Performance] max_workers")
+    parser.add_argument('--executor', choices=('thread', 'process'), default='thread',
+                        help="[Performance] executor (see also bench_matching.py)")
+    parser.add_argument('--backend', choices=('ffmpeg', 'fake'), default='ffmpeg')
+    parser.add_argument('--probe-latency', type=float, default=0.02, help="fake backend: seconds per probe")
+    parser.add_argument('--frame-latency', type=float, default=0.01, help="fake backend: seconds per frame")
+    parser.add_argument('--ffmpeg')
+    parser.add_argument('--ffprobe')
+    parser.add_argument('--output', help="write the JSON report to this file")
+    parser.add_argument('--verbose', action='store_true', help="show scanner output")
+    args = parser.parse_args()
+
+    fake = None
+    if args.backend == 'fake':
+        fake = {'probe_latency': args.probe_latency, 'frame_latency': args.frame_latency}
+        ffmpeg = ffprobe = None
+    else:
+        ffmpeg = find_binary('ffmpeg', args.ffmpeg)
+        ffprobe = find_binary('ffprobe', args.ffprobe)
+        if not ffmpeg or not ffprobe:
+            print("ffmpeg/ffprobe not found (use --ffmpeg/--ffprobe or --backend fake)", file=sys.stderr)
+            return 1
+
+    temp = None
+    if args.workdir:
+        workdir = Path(args.workdir)
+    else:
+        temp = tempfile.mkdtemp(prefix='vcp-bench-')
+        workdir = Path(temp)
+
+    try:
+        lib = SyntheticLibrary.load(workdir, ffmpeg)
+        if lib is None:
+            print(f"Generating library in {workdir} ...", file=sys.stderr)
+            t0 = time.perf_counter()
+            lib = SyntheticLibrary(workdir, ffmpeg).generate(args.courses, args.modules, args.lessons)
+            print(f"{len(lib.videos)} lessons in {time.perf_counter() - t0:.1f} s", file=sys.stderr)
+
+        # Every run starts from an empty DB and thumbnail cache
+        data_dir = workdir / 'data'
+        shutil.rmtree(data_dir, ignore_errors=True)
+        config = write_config(workdir, ffmpeg, ffprobe, args.workers, args.executor)
+
+        phases = {}
+        phases['cold'] = run_phase('cold', lib.root, config, data_dir, ffmpeg, ffprobe, args.verbose, fake)
+        phases['warm'] = run_phase('warm', lib.root, config, data_dir, ffmpeg, ffprobe, args.verbose, fake)
+        changes = lib.mutate(args.change)
+        phases['partial'] = run_phase('partial', lib.root, config, data_dir, ffmpeg, ffprobe, args.verbose, fake)
+        phases['partial']['changes'] = changes
+
+        report = {
+            'benchmark': 'scanner',
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'backend': args.backend,
+            'workers': args.workers,
+            'executor': args.executor,
+            'lessons': len(lib.videos),
+            'phases': phases,
+        }
+    finally:
+        if temp and not args.keep:
+            shutil.rmtree(temp, ignore_errors=True)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text, encoding='utf-8')
+        print(f"Report saved to {args.output}", file=sys.stderr)
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
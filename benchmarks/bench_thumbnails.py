@@ -0,0 +1,162 @@
+"""
+Thumbnail seeking benchmark: [Thumbnails] seek_mode accurate vs keyframe.
+
+Encodes a few long-GOP clips (a keyframe every --gop seconds, like screen
+recordings) and times a cold VideoScanner scan of them once per seek mode,
+each against an empty DB and thumbnail cache. Accurate seeking decodes from
+the previous keyframe up to each timestamp; keyframe mode snaps timestamps
+to the nearest keyframes and decodes one frame per thumbnail.
+
+    python benchmarks/bench_thumbnails.py --videos 4 --duration 120 --gop 20
+
+With --backend fake no binaries are needed: FakeMediaBackend charges
+--decode-latency seconds per second of video decoded from the keyframe.
+"""
+import io
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import contextlib
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from scanner import VideoScanner
+from media_backend import FakeMediaBackend
+from synthetic_library import find_binary, _run
+
+FPS = 15
+
+
+def make_clips(folder, ffmpeg, videos, duration, gop):
+    folder.mkdir(parents=True, exist_ok=True)
+    for n in range(1, videos + 1):
+        path = folder / f"{n:02d}. Recording.mp4"
+        if path.exists():
+            continue
+        if not ffmpeg:
+            path.write_bytes(f"recording {n}".encode() * 1000)
+            continue
+        _run([
+            ffmpeg, '-v', 'error',
+            '-f', 'lavfi', '-i', f'testsrc=size=1280x720:rate={FPS}:duration={duration}',
+            '-c:v', 'mpeg4', '-q:v', '5', '-g', str(int(gop * FPS)),
+            '-an', '-y', path,
+        ])
+
+
+def write_config(workdir, ffmpeg, ffprobe, seek_mode):
+    config = Path(workdir) / f'bench_{seek_mode}.ini'
+    lines = ["[Paths]", f"thumbnails_dir = {Path(workdir) / 'data' / 'video_thumbnails'}"]
+    if ffmpeg:
+        lines.append(f"ffmpeg_path = {ffmpeg}")
+    if ffprobe:
+        lines.append(f"ffprobe_path = {ffprobe}")
+    lines += ["[Thumbnails]", f"seek_mode = {seek_mode}"]
+    config.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+    return config
+
+
+def run_mode(seek_mode, workdir, root, ffmpeg, ffprobe, fake, verbose):
+    data_dir = workdir / 'data'
+    shutil.rmtree(data_dir, ignore_errors=True)
+    config = write_config(workdir, ffmpeg, ffprobe, seek_mode)
+    output = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+    with output:
+        backend = FakeMediaBackend(**fake) if fake else None
+        scan = VideoScanner(config_file=str(config), data_dir=data_dir, media_backend=backend)
+        start = time.perf_counter()
+        videos, _ = scan.scan_directory(str(root))
+        elapsed = time.perf_counter() - start
+
+    stages = scan.metrics.snapshot()['stages']
+    result = {
+        'seconds': round(elapsed, 3),
+        'videos': videos,
+        'thumbnails_generated': scan.stats['thumbnails_generated'],
+        'thumbnails_failed': scan.stats['thumbnails_failed'],
+        'frame_stage': stages.get('thumbnails'),
+        'keyframes_stage': stages.get('keyframes'),
+    }
+    print(f"{seek_mode:<9} {elapsed:8.2f} s  thumbnails={result['thumbnails_generated']} "
+          f"failed={result['thumbnails_failed']}", file=sys.stderr)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark accurate vs keyframe thumbnail seeking")
+    parser.add_argument('--workdir', help="where the clips and scan data live (default: temp dir)")
+    parser.add_argument('--keep', action='store_true', help="keep a temporary workdir")
+    parser.add_argument('--videos', type=int, default=4)
+    parser.add_argument('--duration', type=int, default=120, help="seconds per clip")
+    parser.add_argument('--gop', type=float, default=20.0, help="seconds between keyframes")
+    parser.add_argument('--backend', choices=('ffmpeg', 'fake'), default='ffmpeg')
+    parser.add_argument('--frame-latency', type=float, default=0.01, help="fake backend: seconds per frame")
+    parser.add_argument('--decode-latency', type=float, default=0.005,
+                        help="fake backend: seconds per second decoded from the keyframe")
+    parser.add_argument('--ffmpeg')
+    parser.add_argument('--ffprobe')
+    parser.add_argument('--output', help="write the JSON report to this file")
+    parser.add_argument('--verbose', action='store_true', help="show scanner output")
+    args = parser.parse_args()
+
+    fake = None
+    if args.backend == 'fake':
+        fake = {'duration': float(args.duration), 'keyframe_interval': args.gop,
+                'frame_latency': args.frame_latency, 'decode_latency': args.decode_latency}
+        ffmpeg = ffprobe = None
+    else:
+        ffmpeg = find_binary('ffmpeg', args.ffmpeg)
+        ffprobe = find_binary('ffprobe', args.ffprobe)
+        if not ffmpeg or not ffprobe:
+            print("ffmpeg/ffprobe not found (use --ffmpeg/--ffprobe or --backend fake)", file=sys.stderr)
+            return 1
+
+    temp = None
+    if args.workdir:
+        workdir = Path(args.workdir)
+    else:
+        temp = tempfile.mkdtemp(prefix='vcp-thumbs-')
+        workdir = Path(temp)
+
+    try:
+        root = workdir / 'library'
+        make_clips(root / 'Recordings', ffmpeg, args.videos, args.duration, args.gop)
+        modes = {mode: run_mode(mode, workdir, root, ffmpeg, ffprobe, fake, args.verbose)
+                 for mode in ('accurate', 'keyframe')}
+    finally:
+        if temp and not args.keep:
+            shutil.rmtree(temp, ignore_errors=True)
+
+    speedup = None
+    if modes['keyframe']['seconds']:
+        speedup = round(modes['accurate']['seconds'] / modes['keyframe']['seconds'], 2)
+    print(f"speedup   x{speedup}", file=sys.stderr)
+
+    report = {
+        'benchmark': 'thumbnail_seek',
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'backend': args.backend,
+        'videos': args.videos,
+        'duration': args.duration,
+        'gop_seconds': args.gop,
+        'modes': modes,
+        'speedup': speedup,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text, encoding='utf-8')
+        print(f"Report saved to {args.output}", file=sys.stderr)
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
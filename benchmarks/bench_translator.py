@@ -0,0 +1,55 @@
+"""
+Micro-benchmark: translation lookups.
+
+Compares the flattened Translator.get with the previous nested-dict walk
+for a plain key, a format template and a missing key.
+
+Run: python benchmarks/bench_translator.py [iterations]
+"""
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from translator import Translator
+
+CASES = [
+    ('plain', 'menu.library', {}),
+    ('template', 'player.time_format', {'current': '01:02', 'total': '10:00'}),
+    ('missing', 'no.such.key', {}),
+]
+
+
+def nested_get(translations, key, **kwargs):
+    """The lookup Translator.get used before flattening."""
+    value = translations
+    try:
+        for k in key.split('.'):
+            value = value[k]
+        if kwargs:
+            return value.format(**kwargs)
+        return value
+    except (KeyError, TypeError):
+        return key
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    tr = Translator()
+    for lang in ('ru', 'en'):
+        tr.load_language(lang)
+
+        print(f"Language: {lang}, {iterations} calls per case")
+        print(f"{'case':<10} {'nested':>12} {'flat':>12} {'speedup':>9}")
+        for name, key, kwargs in CASES:
+            assert tr(key, **kwargs) == nested_get(tr.translations, key, **kwargs), key
+            nested = timeit.timeit(lambda: nested_get(tr.translations, key, **kwargs), number=iterations)
+            flat = timeit.timeit(lambda: tr(key, **kwargs), number=iterations)
+            print(f"{name:<10} {nested / iterations * 1e9:9.0f} ns {flat / iterations * 1e9:9.0f} ns "
+                  f"{nested / flat:8.2f}x")
+        print()
+
+
+if __name__ == "__main__":
+    main()
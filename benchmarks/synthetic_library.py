@@ -0,0 +1,256 @@
+"""
+Synthetic course library for scanner benchmarks.
+
+Builds a tree of courses / modules / lessons made of tiny clips encoded with
+ffmpeg's lavfi sources (testsrc + sine). A handful of template clips is
+encoded once; every lesson is a stream-copy remux of one of them with its
+own title, so each file has distinct content (fingerprints differ) while
+generating thousands of lessons stays cheap.
+
+Lessons get external audio ("01. Intro [rus].mka") and subtitles
+("01. Intro.ru.srt", "01. Intro.en.srt") with the naming real courses use.
+
+Without ffmpeg (ffmpeg=None) the files are filled with unique placeholder
+bytes instead; that is enough for scans with media_backend.FakeMediaBackend.
+
+Run: python benchmarks/synthetic_library.py OUT_DIR [--courses 10 --modules 5 --lessons 20]
+"""
+import os
+import sys
+import json
+import random
+import shutil
+import argparse
+import subprocess
+from pathlib import Path
+
+MANIFEST_NAME = 'synthetic_library.json'
+
+TOPICS = [
+    'Python', 'SQL', 'Docker', 'Linux', 'Networking', 'Algorithms', 'Git',
+    'JavaScript', 'Rust', 'Statistics', 'Photography', 'Blender', 'Music Theory',
+]
+MODULE_NAMES = [
+    'Getting Started', 'Basics', 'Core Concepts', 'Working with Data',
+    'Advanced Topics', 'Best Practices', 'Projects', 'Testing', 'Deployment',
+]
+LESSON_WORDS = [
+    'Introduction', 'Overview', 'Setup', 'Variables', 'Functions', 'Loops',
+    'Errors', 'Files', 'Classes', 'Modules', 'Debugging', 'Performance',
+    'Summary', 'Practice', 'Review', 'Examples', 'Patterns', 'Tips',
+]
+
+
+def find_binary(name, explicit=None):
+    """ffmpeg/ffprobe: explicit path, the app's resources/bin, then PATH."""
+    if explicit:
+        return Path(explicit)
+    bundled = Path(__file__).resolve().parent.parent / 'resources' / 'bin' / f'{name}.exe'
+    if bundled.exists():
+        return bundled
+    found = shutil.which(name)
+    return Path(found) if found else None
+
+
+def _run(cmd):
+    subprocess.run([str(c) for c in cmd], check=True, capture_output=True)
+
+
+def _srt(lesson_title, duration):
+    """A two-cue SRT file."""
+    half = max(1, int(duration // 2))
+    return (
+        f"1\n00:00:00,000 --> 00:00:{half:02d},000\n{lesson_title}\n\n"
+        f"2\n00:00:{half:02d},000 --> 00:00:{half * 2:02d},000\nSynthetic subtitle\n"
+    )
+
+
+class SyntheticLibrary:
+    """A generated library on disk plus the manifest describing it."""
+
+    def __init__(self, workdir, ffmpeg, seed=1):
+        self.workdir = Path(workdir)
+        self.root = self.workdir / 'library'
+        self.templates_dir = self.workdir / 'templates'  # outside the scanned root
+        self.ffmpeg = Path(ffmpeg) if ffmpeg else None
+        self.rng = random.Random(seed)
+        self.seed = seed
+        self.video_templates = []
+        self.audio_template = None
+        self.videos = []
+        self._unique = 0
+
+    # --- templates ----------------------------------------------------------
+
+    def build_templates(self, variants=4, duration=2):
+        """Encode the source clips every lesson is remuxed from."""
+        self.templates_dir.mkdir(parents=True, exist_ok=True)
+        if not self.ffmpeg:
+            self.audio_template = self.templates_dir / 'audio.mka'
+            self.audio_template.write_bytes(b'placeholder audio' * 64)
+            return
+        self.video_templates = []
+        for i in range(variants):
+            path = self.templates_dir / f'video_{i}.mp4'
+            if not path.exists():
+                _run([
+                    self.ffmpeg, '-v', 'error',
+                    '-f', 'lavfi', '-i', f'testsrc=size=320x180:rate=15:duration={duration + i}',
+                    '-f', 'lavfi', '-i', f'sine=frequency={220 * (i + 1)}:duration={duration + i}',
+                    '-c:v', 'mpeg4', '-q:v', '10', '-c:a', 'aac', '-b:a', '32k',
+                    '-shortest', '-y', path,
+                ])
+            self.video_templates.append(path)
+
+        self.audio_template = self.templates_dir / 'audio.mka'
+        if not self.audio_template.exists():
+            _run([
+                self.ffmpeg, '-v', 'error',
+                '-f', 'lavfi', '-i', f'sine=frequency=440:duration={duration}',
+                '-c:a', 'aac', '-b:a', '32k', '-metadata:s:a:0', 'language=rus',
+                '-y', self.audio_template,
+            ])
+
+    # --- lessons ------------------------------------------------------------
+
+    def _write_video(self, path, title):
+        """Stream-copy a template with a unique title (distinct content, no re-encode)."""
+        self._unique += 1
+        if not self.ffmpeg:
+            Path(path).write_bytes(f"{title} #{self._unique}\n".encode('utf-8') * 256)
+            return
+        template = self.video_templates[self._unique % len(self.video_templates)]
+        _run([
+            self.ffmpeg, '-v', 'error', '-i', template, '-c', 'copy',
+            '-map_metadata', '-1', '-metadata', f'title={title} #{self._unique}',
+            '-y', path,
+        ])
+
+    def _add_lesson(self, folder, number, audio_ratio, subtitle_ratio, duration):
+        title = ' '.join(self.rng.sample(LESSON_WORDS, 2))
+        stem = f"{number:02d}. {title}"
+        video = folder / f"{stem}.mp4"
+        self._write_video(video, stem)
+
+        if self.rng.random() < audio_ratio:
+            shutil.copyfile(self.audio_template, folder / f"{stem} [rus].mka")
+        if self.rng.random() < subtitle_ratio:
+            (folder / f"{stem}.ru.srt").write_text(_srt(stem, duration), encoding='utf-8')
+            (folder / f"{stem}.en.srt").write_text(_srt(stem, duration), encoding='utf-8')
+
+        self.videos.append(str(video))
+        return video
+
+    def generate(self, courses=10, modules=5, lessons=20, duration=2, variants=4,
+                 audio_ratio=0.3, subtitle_ratio=0.5):
+        """Create courses/modules/lessons under workdir/library."""
+        self.build_templates(variants, duration)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+        for c in range(courses):
+            topic = TOPICS[c % len(TOPICS)]
+            course = self.root / f"{c + 1:02d}. {topic} Course {c // len(TOPICS) + 1}"
+            for m in range(modules):
+                module = course / f"{m + 1:02d}. {MODULE_NAMES[m % len(MODULE_NAMES)]}"
+                module.mkdir(parents=True, exist_ok=True)
+                for n in range(lessons):
+                    self._add_lesson(module, n + 1, audio_ratio, subtitle_ratio, duration)
+
+        self.save_manifest(courses=courses, modules=modules, lessons=lessons, duration=duration)
+        return self
+
+    def mutate(self, fraction=0.05, duration=2):
+        """
+        Partial change for a re-scan: re-encode (content change), rename (move),
+        delete and add a share of the lessons. Returns the counts.
+        """
+        count = max(1, int(len(self.videos) * fraction))
+        picked = self.rng.sample(self.videos, min(len(self.videos), count * 3))
+        changed, renamed, deleted = picked[:count], picked[count:count * 2], picked[count * 2:]
+
+        for path in changed:
+            self._write_video(Path(path), Path(path).stem + ' (updated edition)')
+
+        for path in renamed:
+            old = Path(path)
+            new = old.with_name(old.stem + ' (renamed)' + old.suffix)
+            os.replace(old, new)
+            self.videos[self.videos.index(path)] = str(new)
+
+        for path in deleted:
+            Path(path).unlink(missing_ok=True)
+            self.videos.remove(path)
+
+        folders = sorted({str(Path(v).parent) for v in self.videos})
+        added = 0
+        for _ in range(count):
+            folder = Path(self.rng.choice(folders))
+            number = len(list(folder.glob('*.mp4'))) + 1
+            self._add_lesson(folder, number, 0.3, 0.5, duration)
+            added += 1
+
+        self.save_manifest()
+        return {'changed': len(changed), 'renamed': len(renamed), 'deleted': len(deleted), 'added': added}
+
+    # --- manifest -----------------------------------------------------------
+
+    def save_manifest(self, **params):
+        path = self.workdir / MANIFEST_NAME
+        manifest = {}
+        if path.exists():
+            manifest = json.loads(path.read_text(encoding='utf-8'))
+        manifest.setdefault('params', {}).update(params)
+        manifest.update({
+            'root': str(self.root),
+            'seed': self.seed,
+            'video_templates': [str(p) for p in self.video_templates],
+            'audio_template': str(self.audio_template) if self.audio_template else None,
+            'videos': self.videos,
+            'unique': self._unique,
+        })
+        path.write_text(json.dumps(manifest, indent=2, ensure_ascii=False), encoding='utf-8')
+
+    @classmethod
+    def load(cls, workdir, ffmpeg):
+        """Reopen a library generated earlier (None if there is no manifest)."""
+        path = Path(workdir) / MANIFEST_NAME
+        if not path.exists():
+            return None
+        manifest = json.loads(path.read_text(encoding='utf-8'))
+        lib = cls(workdir, ffmpeg, manifest.get('seed', 1))
+        lib.video_templates = [Path(p) for p in manifest['video_templates']]
+        lib.audio_template = Path(manifest['audio_template']) if manifest.get('audio_template') else None
+        lib.videos = manifest['videos']
+        lib._unique = manifest.get('unique', 0)
+        lib.rng.seed(f"{lib.seed}-{lib._unique}")
+        return lib
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic course library")
+    parser.add_argument('workdir', help="output directory (library/ and templates/ are created inside)")
+    parser.add_argument('--courses', type=int, default=10)
+    parser.add_argument('--modules', type=int, default=5)
+    parser.add_argument('--lessons', type=int, default=20)
+    parser.add_argument('--duration', type=int, default=2, help="clip length in seconds")
+    parser.add_argument('--variants', type=int, default=4, help="number of encoded template clips")
+    parser.add_argument('--audio-ratio', type=float, default=0.3)
+    parser.add_argument('--subtitle-ratio', type=float, default=0.5)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--ffmpeg', help="path to ffmpeg")
+    args = parser.parse_args()
+
+    ffmpeg = find_binary('ffmpeg', args.ffmpeg)
+    if not ffmpeg:
+        print("ffmpeg not found (use --ffmpeg)")
+        return 1
+
+    lib = SyntheticLibrary(args.workdir, ffmpeg, args.seed)
+    lib.generate(args.courses, args.modules, args.lessons, args.duration, args.variants,
+                 args.audio_ratio, args.subtitle_ratio)
+    print(f"Generated {len(lib.videos)} lessons in {lib.root}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -18,175 +18,371 @@ class DatabaseManager:
         """Returns a connection to the SQLite database."""
         return sqlite3.connect(self.db_path, timeout=timeout)
 
-    def init_database(self):
-        """Initializes the database structure, tables, and indices."""
-        with self.get_connection() as conn:
-            c = conn.cursor()
-            
-            # Folders table
-            c.execute("""
-                CREATE TABLE IF NOT EXISTS folders (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    path TEXT UNIQUE NOT NULL,
-                    parent_path TEXT,
-                    name TEXT NOT NULL,
-                    root_path TEXT,
-                    is_folder INTEGER DEFAULT 1,
-                    is_expanded INTEGER DEFAULT 0,
-                    video_count INTEGER DEFAULT 0,
-                    total_duration REAL DEFAULT 0,
-                    total_size INTEGER DEFAULT 0,
-                    last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
+    # Ordered schema migrations: (version, description, method name).
+    # Append new entries only; a released migration must never change.
+    MIGRATIONS = [
+        (1, 'baseline schema', '_migration_baseline'),
+        (2, 'subtitle transcripts', '_migration_transcripts'),
+        (3, 'hot query indices', '_migration_query_indices'),
+        (4, 'content fingerprints', '_migration_fingerprints'),
+        (5, 'library generation counter', '_migration_library_generation'),
+        (6, 'scan journal', '_migration_scan_journal'),
+        (7, 'media failures', '_migration_media_failures'),
+    ]
 
-            # Video files table
-            c.execute("""
-                CREATE TABLE IF NOT EXISTS video_files (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    folder_path TEXT NOT NULL,
-                    file_path TEXT UNIQUE NOT NULL,
-                    file_name TEXT,
-                    track_number INTEGER,
-                    duration REAL DEFAULT 0,
-                    resolution TEXT,
-                    file_size INTEGER DEFAULT 0,
-                    codec TEXT,
-                    thumbnail_path TEXT,
-                    thumbnails_json TEXT,
-                    watched_percent INTEGER DEFAULT 0,
-                    last_position REAL DEFAULT 0,
-                    audio_track_count INTEGER DEFAULT 0,
-                    selected_audio_id INTEGER DEFAULT NULL,
-                    subtitle_track_count INTEGER DEFAULT 0,
-                    selected_subtitle_id INTEGER DEFAULT NULL,
-                    volume INTEGER DEFAULT 100,
-                    subtitles_enabled INTEGER DEFAULT 0,
-                    FOREIGN KEY(folder_path) REFERENCES folders(path) ON DELETE CASCADE,
-                    FOREIGN KEY(selected_audio_id) REFERENCES audio_tracks(id) ON DELETE SET NULL,
-                    FOREIGN KEY(selected_subtitle_id) REFERENCES subtitle_tracks(id) ON DELETE SET NULL
-                )
-            """)
-
-            # Audio tracks table
-            c.execute("""
-                CREATE TABLE IF NOT EXISTS audio_tracks (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    video_id INTEGER NOT NULL,
-                    video_file_path TEXT NOT NULL,
-                    track_type TEXT DEFAULT 'embedded',
-                    stream_index INTEGER,
-                    audio_file_path TEXT,
-                    audio_file_name TEXT,
-                    language TEXT,
-                    title TEXT,
-                    codec TEXT,
-                    bitrate INTEGER,
-                    sample_rate INTEGER,
-                    channels INTEGER,
-                    channel_layout TEXT,
-                    duration REAL DEFAULT 0,
-                    file_size INTEGER DEFAULT 0,
-                    is_default INTEGER DEFAULT 0,
-                    match_score INTEGER DEFAULT 0,
-                    FOREIGN KEY(video_id) REFERENCES video_files(id) ON DELETE CASCADE,
-                    UNIQUE(video_file_path, track_type, stream_index, audio_file_path)
-                )
-            """)
+    def init_database(self):
+        """Brings the database schema up to date by applying pending migrations."""
+        latest = self.MIGRATIONS[-1][0]
 
-            # Subtitle tracks table
+        # Autocommit mode: transactions are managed explicitly below
+        conn = sqlite3.connect(self.db_path, timeout=10, isolation_level=None)
+        try:
+            c = conn.cursor()
             c.execute("""
-                CREATE TABLE IF NOT EXISTS subtitle_tracks (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    video_id INTEGER NOT NULL,
-                    video_file_path TEXT NOT NULL,
-                    track_type TEXT DEFAULT 'embedded',
-                    stream_index INTEGER,
-                    subtitle_file_path TEXT,
-                    subtitle_file_name TEXT,
-                    language TEXT,
-                    title TEXT,
-                    codec TEXT,
-                    format TEXT,
-                    is_default INTEGER DEFAULT 0,
-                    is_forced INTEGER DEFAULT 0,
-                    match_score INTEGER DEFAULT 0,
-                    FOREIGN KEY(video_id) REFERENCES video_files(id) ON DELETE CASCADE,
-                    UNIQUE(video_file_path, track_type, stream_index, subtitle_file_path)
+                CREATE TABLE IF NOT EXISTS schema_version (
+                    version INTEGER PRIMARY KEY,
+                    description TEXT,
+                    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                 )
             """)
 
-            # Video markers table
+            # Fast path: nothing to do when the DB is current
+            current = self._get_schema_version(c)
+            if current >= latest:
+                return
+
+            for version, description, method_name in self.MIGRATIONS:
+                if version <= current:
+                    continue
+
+                c.execute("BEGIN IMMEDIATE")
+                try:
+                    # Re-check under the write lock (another instance may have migrated)
+                    if self._get_schema_version(c) >= version:
+                        c.execute("COMMIT")
+                        continue
+
+                    getattr(self, method_name)(c)
+                    c.execute("INSERT INTO schema_version (version, description) VALUES (?, ?)",
+                              (version, description))
+                    c.execute("COMMIT")
+                    print(f"Database migrated to version {version} ({description})")
+                except Exception:
+                    c.execute("ROLLBACK")
+                    raise
+        finally:
+            conn.close()
+
+    def _get_schema_version(self, c):
+        """Returns the latest applied migration version (0 for a new DB)."""
+        c.execute("SELECT MAX(version) FROM schema_version")
+        row = c.fetchone()
+        return row[0] or 0
+
+    def _ensure_columns(self, c, table, columns):
+        """Adds missing columns to a table created by an older app version."""
+        c.execute(f"PRAGMA table_info({table})")
+        existing = {col[1] for col in c.fetchall()}
+        for name, definition in columns:
+            if name not in existing:
+                c.execute(f"ALTER TABLE {table} ADD COLUMN {name} {definition}")
+                existing.add(name)
+
+    # ===================== MIGRATIONS =====================
+    def _migration_baseline(self, c):
+        """v1: Core tables, indices and columns added before versioned migrations."""
+        # Folders table
+        c.execute("""
+            CREATE TABLE IF NOT EXISTS folders (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                path TEXT UNIQUE NOT NULL,
+                parent_path TEXT,
+                name TEXT NOT NULL,
+                root_path TEXT,
+                is_folder INTEGER DEFAULT 1,
+                is_expanded INTEGER DEFAULT 0,
+                video_count INTEGER DEFAULT 0,
+                total_duration REAL DEFAULT 0,
+                total_size INTEGER DEFAULT 0,
+                last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+
+        # Video files table
+        c.execute("""
+            CREATE TABLE IF NOT EXISTS video_files (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                folder_path TEXT NOT NULL,
+                file_path TEXT UNIQUE NOT NULL,
+                file_name TEXT,
+                track_number INTEGER,
+                duration REAL DEFAULT 0,
+                resolution TEXT,
+                file_size INTEGER DEFAULT 0,
+                codec TEXT,
+                thumbnail_path TEXT,
+                thumbnails_json TEXT,
+                watched_percent INTEGER DEFAULT 0,
+                last_position REAL DEFAULT 0,
+                audio_track_count INTEGER DEFAULT 0,
+                selected_audio_id INTEGER DEFAULT NULL,
+                subtitle_track_count INTEGER DEFAULT 0,
+                selected_subtitle_id INTEGER DEFAULT NULL,
+                volume INTEGER DEFAULT 100,
+                subtitles_enabled INTEGER DEFAULT 0,
+                FOREIGN KEY(folder_path) REFERENCES folders(path) ON DELETE CASCADE,
+                FOREIGN KEY(selected_audio_id) REFERENCES audio_tracks(id) ON DELETE SET NULL,
+                FOREIGN KEY(selected_subtitle_id) REFERENCES subtitle_tracks(id) ON DELETE SET NULL
+            )
+        """)
+
+        # Audio tracks table
+        c.execute("""
+            CREATE TABLE IF NOT EXISTS audio_tracks (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                video_id INTEGER NOT NULL,
+                video_file_path TEXT NOT NULL,
+                track_type TEXT DEFAULT 'embedded',
+                stream_index INTEGER,
+                audio_file_path TEXT,
+                audio_file_name TEXT,
+                language TEXT,
+                title TEXT,
+                codec TEXT,
+                bitrate INTEGER,
+                sample_rate INTEGER,
+                channels INTEGER,
+                channel_layout TEXT,
+                duration REAL DEFAULT 0,
+                file_size INTEGER DEFAULT 0,
+                is_default INTEGER DEFAULT 0,
+                match_score INTEGER DEFAULT 0,
+                FOREIGN KEY(video_id) REFERENCES video_files(id) ON DELETE CASCADE,
+                UNIQUE(video_file_path, track_type, stream_index, audio_file_path)
+            )
+        """)
+
+        # Subtitle tracks table
+        c.execute("""
+            CREATE TABLE IF NOT EXISTS subtitle_tracks (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                video_id INTEGER NOT NULL,
+                video_file_path TEXT NOT NULL,
+                track_type TEXT DEFAULT 'embedded',
+                stream_index INTEGER,
+                subtitle_file_path TEXT,
+                subtitle_file_name TEXT,
+                language TEXT,
+                title TEXT,
+                codec TEXT,
+                format TEXT,
+                is_default INTEGER DEFAULT 0,
+                is_forced INTEGER DEFAULT 0,
+                match_score INTEGER DEFAULT 0,
+                FOREIGN KEY(video_id) REFERENCES video_files(id) ON DELETE CASCADE,
+                UNIQUE(video_file_path, track_type, stream_index, subtitle_file_path)
+            )
+        """)
+
+        # Video markers table
+        c.execute("""
+            CREATE TABLE IF NOT EXISTS video_markers (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                video_id INTEGER NOT NULL,
+                position_seconds REAL NOT NULL,
+                label TEXT,
+                color TEXT DEFAULT '#FFD700',
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY(video_id) REFERENCES video_files(id) ON DELETE CASCADE
+            )
+        """)
+
+        # Tags table
+        c.execute("""
+            CREATE TABLE IF NOT EXISTS tags (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT UNIQUE NOT NULL,
+                color TEXT DEFAULT '#3498db'
+            )
+        """)
+
+        # Video Tags Junction table
+        c.execute("""
+            CREATE TABLE IF NOT EXISTS video_tags (
+                video_id INTEGER NOT NULL,
+                tag_id INTEGER NOT NULL,
+                FOREIGN KEY(video_id) REFERENCES video_files(id) ON DELETE CASCADE,
+                FOREIGN KEY(tag_id) REFERENCES tags(id) ON DELETE CASCADE,
+                PRIMARY KEY(video_id, tag_id)
+            )
+        """)
+
+        # Indices
+        c.execute("CREATE INDEX IF NOT EXISTS idx_parent_path ON folders(parent_path)")
+        c.execute("CREATE INDEX IF NOT EXISTS idx_folder_path ON video_files(folder_path)")
+        c.execute("CREATE INDEX IF NOT EXISTS idx_audio_video_id ON audio_tracks(video_id)")
+        c.execute("CREATE INDEX IF NOT EXISTS idx_audio_video_path ON audio_tracks(video_file_path)")
+        c.execute("CREATE INDEX IF NOT EXISTS idx_subtitle_video_id ON subtitle_tracks(video_id)")
+        c.execute("CREATE INDEX IF NOT EXISTS idx_subtitle_video_path ON subtitle_tracks(video_file_path)")
+        c.execute("CREATE INDEX IF NOT EXISTS idx_markers_video_id ON video_markers(video_id)")
+        
+        # Databases created by older versions may lack these columns
+        self._ensure_columns(c, 'video_files', [
+            ('volume', 'INTEGER DEFAULT 100'),
+            ('subtitles_enabled', 'INTEGER DEFAULT 0'),
+            ('thumbnails_json', 'TEXT'),
+            ('audio_track_count', 'INTEGER DEFAULT 0'),
+            ('selected_audio_id', 'INTEGER DEFAULT NULL'),
+            ('subtitle_track_count', 'INTEGER DEFAULT 0'),
+            ('selected_subtitle_id', 'INTEGER DEFAULT NULL'),
+            ('is_favorite', 'INTEGER DEFAULT 0'),
+        ])
+        self._ensure_columns(c, 'video_markers', [
+            ('color', "TEXT DEFAULT '#FFD700'"),
+        ])
+
+    def _migration_transcripts(self, c):
+        """v2: Subtitle transcript tables and the FTS5 index (if available)."""
+        # One row per indexed subtitle file (mtime/size drive incremental re-indexing)
+        c.execute("""
+            CREATE TABLE IF NOT EXISTS transcript_files (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                subtitle_file_path TEXT UNIQUE NOT NULL,
+                video_id INTEGER NOT NULL,
+                mtime REAL DEFAULT 0,
+                file_size INTEGER DEFAULT 0,
+                cue_count INTEGER DEFAULT 0,
+                FOREIGN KEY(video_id) REFERENCES video_files(id) ON DELETE CASCADE
+            )
+        """)
+
+        # Parsed cues
+        c.execute("""
+            CREATE TABLE IF NOT EXISTS subtitle_cues (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                transcript_id INTEGER NOT NULL,
+                video_id INTEGER NOT NULL,
+                start_seconds REAL NOT NULL,
+                end_seconds REAL NOT NULL,
+                text TEXT NOT NULL,
+                FOREIGN KEY(transcript_id) REFERENCES transcript_files(id) ON DELETE CASCADE
+            )
+        """)
+        c.execute("CREATE INDEX IF NOT EXISTS idx_transcript_video_id ON transcript_files(video_id)")
+        c.execute("CREATE INDEX IF NOT EXISTS idx_cues_transcript_id ON subtitle_cues(transcript_id)")
+
+        # Full-text index over cue text (external content, kept in sync by triggers)
+        try:
             c.execute("""
-                CREATE TABLE IF NOT EXISTS video_markers (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    video_id INTEGER NOT NULL,
-                    position_seconds REAL NOT NULL,
-                    label TEXT,
-                    color TEXT DEFAULT '#FFD700',
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY(video_id) REFERENCES video_files(id) ON DELETE CASCADE
+                CREATE VIRTUAL TABLE IF NOT EXISTS subtitle_cues_fts USING fts5(
+                    text, content='subtitle_cues', content_rowid='id',
+                    tokenize='unicode61 remove_diacritics 2'
                 )
             """)
-
-            # Tags table
             c.execute("""
-                CREATE TABLE IF NOT EXISTS tags (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT UNIQUE NOT NULL,
-                    color TEXT DEFAULT '#3498db'
-                )
+                CREATE TRIGGER IF NOT EXISTS subtitle_cues_ai AFTER INSERT ON subtitle_cues BEGIN
+                    INSERT INTO subtitle_cues_fts(rowid, text) VALUES (new.id, new.text);
+                END
             """)
-
-            # Video Tags Junction table
             c.execute("""
-                CREATE TABLE IF NOT EXISTS video_tags (
-                    video_id INTEGER NOT NULL,
-                    tag_id INTEGER NOT NULL,
-                    FOREIGN KEY(video_id) REFERENCES video_files(id) ON DELETE CASCADE,
-                    FOREIGN KEY(tag_id) REFERENCES tags(id) ON DELETE CASCADE,
-                    PRIMARY KEY(video_id, tag_id)
-                )
+                CREATE TRIGGER IF NOT EXISTS subtitle_cues_ad AFTER DELETE ON subtitle_cues BEGIN
+                    INSERT INTO subtitle_cues_fts(subtitle_cues_fts, rowid, text) VALUES ('delete', old.id, old.text);
+                END
             """)
+        except sqlite3.OperationalError as e:
+            # SQLite built without FTS5: search falls back to LIKE
+            print(f"FTS5 unavailable, transcript search will be slower: {e}")
+
+    def _migration_query_indices(self, c):
+        """v3: Composite indices for library loading and scan queries (see tests/test_query_plans.py)."""
+        # Library view: videos per folder in track order, served straight from the index
+        c.execute("DROP INDEX IF EXISTS idx_folder_path")
+        c.execute("""
+            CREATE INDEX IF NOT EXISTS idx_video_folder_order
+            ON video_files(folder_path, track_number, file_name)
+        """)
+
+        # Scanner: per-root folder counts and hierarchy building
+        c.execute("CREATE INDEX IF NOT EXISTS idx_folders_root_parent ON folders(root_path, parent_path)")
+
+        # Tag -> videos lookups (video -> tags is covered by the primary key)
+        c.execute("CREATE INDEX IF NOT EXISTS idx_video_tags_tag_id ON video_tags(tag_id)")
+
+        # Markers of a video in timeline order
+        c.execute("DROP INDEX IF EXISTS idx_markers_video_id")
+        c.execute("""
+            CREATE INDEX IF NOT EXISTS idx_markers_video_position
+            ON video_markers(video_id, position_seconds)
+        """)
+
+    def _migration_fingerprints(self, c):
+        """v4: Content fingerprint of video files, used by the scanner to detect moves."""
+        self._ensure_columns(c, 'video_files', [
+            ('fingerprint', 'TEXT'),
+        ])
+        c.execute("CREATE INDEX IF NOT EXISTS idx_video_fingerprint ON video_files(fingerprint)")
+
+    # Tables whose changes are visible in the library view
+    LIBRARY_TABLES = ('folders', 'video_files', 'video_markers', 'tags', 'video_tags')
+
+    def _migration_library_generation(self, c):
+        """v5: Counter bumped on every library change; validates the startup snapshot."""
+        c.execute("""
+            CREATE TABLE IF NOT EXISTS library_state (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                generation INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        c.execute("INSERT OR IGNORE INTO library_state (id, generation) VALUES (1, 0)")
+        for table in self.LIBRARY_TABLES:
+            for event in ('INSERT', 'UPDATE', 'DELETE'):
+                c.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS trg_{table}_{event.lower()}_generation
+                    AFTER {event} ON {table}
+                    BEGIN
+                        UPDATE library_state SET generation = generation + 1 WHERE id = 1;
+                    END
+                """)
 
-            # Indices
-            c.execute("CREATE INDEX IF NOT EXISTS idx_parent_path ON folders(parent_path)")
-            c.execute("CREATE INDEX IF NOT EXISTS idx_folder_path ON video_files(folder_path)")
-            c.execute("CREATE INDEX IF NOT EXISTS idx_audio_video_id ON audio_tracks(video_id)")
-            c.execute("CREATE INDEX IF NOT EXISTS idx_audio_video_path ON audio_tracks(video_file_path)")
-            c.execute("CREATE INDEX IF NOT EXISTS idx_subtitle_video_id ON subtitle_tracks(video_id)")
-            c.execute("CREATE INDEX IF NOT EXISTS idx_subtitle_video_path ON subtitle_tracks(video_file_path)")
-            c.execute("CREATE INDEX IF NOT EXISTS idx_markers_video_id ON video_markers(video_id)")
-            
-            # Migrations (ensure columns exist)
-            c.execute("PRAGMA table_info(video_files)")
-            columns = [col[1] for col in c.fetchall()]
-            if 'volume' not in columns:
-                c.execute("ALTER TABLE video_files ADD COLUMN volume INTEGER DEFAULT 100")
-            if 'subtitles_enabled' not in columns:
-                c.execute("ALTER TABLE video_files ADD COLUMN subtitles_enabled INTEGER DEFAULT 0")
-            if 'thumbnails_json' not in columns:
-                c.execute("ALTER TABLE video_files ADD COLUMN thumbnails_json TEXT")
-            if 'audio_track_count' not in columns:
-                c.execute("ALTER TABLE video_files ADD COLUMN audio_track_count INTEGER DEFAULT 0")
-            if 'selected_audio_id' not in columns:
-                c.execute("ALTER TABLE video_files ADD COLUMN selected_audio_id INTEGER DEFAULT NULL")
-            if 'subtitle_track_count' not in columns:
-                c.execute("ALTER TABLE video_files ADD COLUMN subtitle_track_count INTEGER DEFAULT 0")
-            if 'is_favorite' not in columns:
-                c.execute("ALTER TABLE video_files ADD COLUMN is_favorite INTEGER DEFAULT 0")
-            if 'selected_subtitle_id' not in columns:
-                c.execute("ALTER TABLE video_files ADD COLUMN selected_subtitle_id INTEGER DEFAULT NULL")
-            if 'is_favorite' not in columns:
-                c.execute("ALTER TABLE video_files ADD COLUMN is_favorite INTEGER DEFAULT 0")
-
-            # Migration for video_markers
-            c.execute("PRAGMA table_info(video_markers)")
-            columns = [col[1] for col in c.fetchall()]
-            if 'color' not in columns:
-                c.execute("ALTER TABLE video_markers ADD COLUMN color TEXT DEFAULT '#FFD700'")
-
-            conn.commit()
+    def _migration_scan_journal(self, c):
+        """v6: Per-root scan state and folders committed by an unfinished scan (resume)."""
+        c.execute("""
+            CREATE TABLE IF NOT EXISTS scan_runs (
+                root_path TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        c.execute("""
+            CREATE TABLE IF NOT EXISTS scan_journal (
+                root_path TEXT NOT NULL,
+                folder_path TEXT NOT NULL,
+                folder_mtime REAL,
+                completed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (root_path, folder_path)
+            )
+        """)
+
+    def _migration_media_failures(self, c):
+        """v7: Files whose thumbnails still failed after the retry pass (not re-attempted while unchanged)."""
+        c.execute("""
+            CREATE TABLE IF NOT EXISTS media_failures (
+                file_path TEXT PRIMARY KEY,
+                file_size INTEGER,
+                stage TEXT NOT NULL,
+                error TEXT,
+                attempts INTEGER DEFAULT 1,
+                last_attempt TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+
+    def has_transcript_fts(self, conn):
+        """Checks whether the FTS5 transcript index exists."""
+        row = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'subtitle_cues_fts'"
+        ).fetchone()
+        return row is not None
 
     def get_existing_video_data(self, file_path):
         """Retrieves existing video metadata for scanning or loading."""
@@ -290,6 +486,65 @@ class DatabaseManager:
             print(f"Error loading subtitles: {e}")
             return [], None, 0
 
+    def get_video_session(self, file_path):
+        """
+        Loads everything the player needs to open a video in one read transaction:
+        progress, volume, audio/subtitle tracks with selections, and markers.
+        """
+        session = {
+            'file_path': str(file_path),
+            'last_position': 0,
+            'volume': 100,
+            'audio': ([], None),
+            'subtitles': ([], None, 0),
+            'markers': [],
+        }
+        try:
+            with self.get_connection() as conn:
+                conn.row_factory = sqlite3.Row
+                c = conn.cursor()
+                # Keep the snapshot consistent across the batch
+                c.execute("BEGIN")
+
+                c.execute("""
+                    SELECT id, last_position, volume, selected_audio_id,
+                           selected_subtitle_id, subtitles_enabled
+                    FROM video_files WHERE file_path = ?
+                """, (str(file_path),))
+                video = c.fetchone()
+                if not video:
+                    return session
+
+                video_id = video['id']
+                session['last_position'] = video['last_position'] or 0
+                session['volume'] = video['volume'] or 100
+
+                c.execute("""
+                    SELECT * FROM audio_tracks
+                    WHERE video_id = ?
+                    ORDER BY is_default DESC, stream_index ASC
+                """, (video_id,))
+                session['audio'] = ([dict(row) for row in c.fetchall()], video['selected_audio_id'])
+
+                c.execute("""
+                    SELECT * FROM subtitle_tracks
+                    WHERE video_id = ?
+                    ORDER BY is_default DESC, stream_index ASC
+                """, (video_id,))
+                session['subtitles'] = ([dict(row) for row in c.fetchall()],
+                                        video['selected_subtitle_id'], video['subtitles_enabled'])
+
+                c.execute("""
+                    SELECT * FROM video_markers
+                    WHERE video_id = ?
+                    ORDER BY position_seconds ASC
+                """, (video_id,))
+                session['markers'] = [dict(row) for row in c.fetchall()]
+                conn.commit()
+        except Exception as e:
+            print(f"Error loading video session: {e}")
+        return session
+
     def get_track_info(self, table_name, track_id):
         """Retrieves details for a specific audio or subtitle track."""
         try:
@@ -340,6 +595,16 @@ class DatabaseManager:
         except Exception as e:
             print(f"Error updating subtitle state: {e}")
 
+    def get_library_generation(self):
+        """Returns the library change counter (None if unavailable)."""
+        try:
+            with self.get_connection() as conn:
+                row = conn.execute("SELECT generation FROM library_state WHERE id = 1").fetchone()
+                return row[0] if row else None
+        except Exception as e:
+            print(f"Error reading library generation: {e}")
+            return None
+
     def get_courses(self):
         """Loads all data for the library view."""
         try:
@@ -391,6 +656,8 @@ class DatabaseManager:
         try:
             with self.get_connection() as conn:
                 c = conn.cursor()
+                c.execute("DELETE FROM subtitle_cues")
+                c.execute("DELETE FROM transcript_files")
                 c.execute("DELETE FROM subtitle_tracks")
                 c.execute("DELETE FROM audio_tracks")
                 c.execute("DELETE FROM video_files")
@@ -555,6 +822,50 @@ class DatabaseManager:
             print(f"Error updating marker: {e}")
             return False
 
+    # ===================== TRANSCRIPTS =====================
+    def search_transcripts(self, query, limit=200):
+        """Full-text search over indexed subtitle cues. Returns (video, timestamp) hits."""
+        from transcripts import build_match_query
+
+        query = (query or '').strip()
+        if not query:
+            return []
+
+        try:
+            with self.get_connection() as conn:
+                conn.row_factory = sqlite3.Row
+                c = conn.cursor()
+
+                if self.has_transcript_fts(conn):
+                    match = build_match_query(query)
+                    if not match:
+                        return []
+                    c.execute("""
+                        SELECT v.file_path, v.file_name, v.folder_path,
+                               sc.start_seconds, sc.end_seconds, sc.text
+                        FROM subtitle_cues_fts f
+                        JOIN subtitle_cues sc ON sc.id = f.rowid
+                        JOIN video_files v ON v.id = sc.video_id
+                        WHERE subtitle_cues_fts MATCH ?
+                        ORDER BY f.rank
+                        LIMIT ?
+                    """, (match, limit))
+                else:
+                    c.execute("""
+                        SELECT v.file_path, v.file_name, v.folder_path,
+                               sc.start_seconds, sc.end_seconds, sc.text
+                        FROM subtitle_cues sc
+                        JOIN video_files v ON v.id = sc.video_id
+                        WHERE sc.text LIKE ?
+                        ORDER BY v.folder_path, v.track_number, sc.start_seconds
+                        LIMIT ?
+                    """, (f"%{query}%", limit))
+
+                return [dict(row) for row in c.fetchall()]
+        except Exception as e:
+            print(f"Error searching transcripts: {e}")
+            return []
+
     def close(self):
         """Placeholder for closing resources if needed (sqlite3 handles this via context managers)."""
         pass
@@ -91,7 +91,7 @@ class HotkeyManager(QObject):
     global_action_triggered = pyqtSignal(str)
     global_action_state_changed = pyqtSignal(str, bool)
     
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, start_global=True):
         super().__init__(parent)
         # Standard actions (no modifiers or specific modifiers handled separately)
         self.mappings = {
@@ -110,6 +110,7 @@ class HotkeyManager(QObject):
             Qt.Key.Key_BracketRight: "zoom_in",
             Qt.Key.Key_B: "add_marker",
             Qt.Key.Key_G: "toggle_marker_gallery",
+            Qt.Key.Key_I: "toggle_stats",
             
             
             # Fallback for Cyrillic layout (Russian)
@@ -126,6 +127,7 @@ class HotkeyManager(QObject):
             0x44a: "zoom_in",           # RU TVZ (where ] is)
             0x418: "add_marker",        # RU I (where B is)
             0x41f: "toggle_marker_gallery", # RU P (where G is)
+            0x428: "toggle_stats",      # RU SH (where I is)
             
             
             # Multimedia keys (local behavior)
@@ -168,9 +170,16 @@ class HotkeyManager(QObject):
             0xDD: "zoom_in",           # ]
             0x42: "add_marker",        # B
             0x47: "toggle_marker_gallery", # G
+            0x49: "toggle_stats",      # I
         }
         
-        # Start global listener thread
+        if start_global:
+            self.start_global_listener()
+
+    def start_global_listener(self):
+        """Start the global (media keys) listener thread once."""
+        if hasattr(self, 'global_thread'):
+            return
         print("DEBUG: Starting GlobalHotkeyThread") # DEBUG
         self.global_thread = GlobalHotkeyThread()
         self.global_thread.action_triggered.connect(self.global_action_triggered.emit)
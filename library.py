@@ -2,11 +2,38 @@
 from pathlib import Path
 
 from PyQt6.QtWidgets import QTreeWidget, QStyledItemDelegate, QWidget, QLabel
-from PyQt6.QtCore import Qt, QTimer, QRect, QPoint, QRectF
+from PyQt6.QtCore import Qt, QTimer, QRect, QPoint, QRectF, QThread, pyqtSignal
 from PyQt6.QtGui import QPainter, QPixmap, QPalette, QColor, QPen, QPolygon, QCursor, QFont, QBrush, QPainterPath
 
 from translator import tr
 from placeholders import draw_library_placeholder
+from library_snapshot import parse_thumbnails
+
+
+class LibraryLoader(QThread):
+    """
+    Reads the library from the DB off the GUI thread.
+    Emits (generation, None, None) when the DB still matches known_generation.
+    """
+    loaded = pyqtSignal(int, object, object, object)  # request_id, generation, folders, videos
+
+    def __init__(self, db, request_id, known_generation=None):
+        super().__init__()
+        self.db = db
+        self.request_id = request_id
+        self.known_generation = known_generation
+
+    def run(self):
+        generation = self.db.get_library_generation()
+        if generation is not None and generation == self.known_generation:
+            self.loaded.emit(self.request_id, generation, None, None)
+            return
+
+        folders, videos = self.db.get_courses()
+        for v in videos:
+            v['thumbnails'] = parse_thumbnails(v)
+        self.loaded.emit(self.request_id, generation, folders, videos)
+
 
 class VideoItemDelegate(QStyledItemDelegate):
     def __init__(self, config, parent=None):
@@ -0,0 +1,96 @@
+"""
+Library snapshot: a compact binary copy of what the library tree shows.
+
+Written after each scan and on close, read on startup so the tree can be
+built before the database is queried. Each snapshot records the DB library
+generation (see DatabaseManager.get_library_generation); a snapshot with an
+older generation is still shown, then replaced once the DB has been read.
+"""
+import os
+import json
+import zlib
+import marshal
+from pathlib import Path
+
+SNAPSHOT_VERSION = 1
+
+FOLDER_FIELDS = ('path', 'parent_path', 'name', 'root_path',
+                 'video_count', 'total_duration', 'is_expanded')
+
+VIDEO_FIELDS = ('folder_path', 'file_path', 'file_name', 'track_number',
+                'duration', 'resolution', 'file_size', 'watched_percent',
+                'thumbnail_path', 'thumbnails', 'last_position',
+                'marker_count', 'is_favorite', 'tags')
+
+
+def parse_thumbnails(video):
+    """Thumbnail list of a video row (parsed once, snapshot rows carry it parsed)."""
+    if 'thumbnails' in video:
+        return video['thumbnails']
+    if video.get('thumbnails_json'):
+        try:
+            return json.loads(video['thumbnails_json'])
+        except (ValueError, TypeError):
+            pass
+    return []
+
+
+def _video_row(video):
+    row = []
+    for field in VIDEO_FIELDS:
+        if field == 'thumbnails':
+            row.append(parse_thumbnails(video))
+        elif field == 'tags':
+            row.append([dict(tag) for tag in video.get('tags', [])])
+        else:
+            row.append(video.get(field))
+    return tuple(row)
+
+
+def save_snapshot(path, generation, folders, videos):
+    """Write the snapshot atomically. Returns True on success."""
+    data = (
+        SNAPSHOT_VERSION,
+        generation,
+        FOLDER_FIELDS,
+        VIDEO_FIELDS,
+        [tuple(f.get(field) for field in FOLDER_FIELDS) for f in folders],
+        [_video_row(v) for v in videos],
+    )
+    path = Path(path)
+    tmp_path = path.with_suffix(path.suffix + '.tmp')
+    try:
+        blob = zlib.compress(marshal.dumps(data), 1)
+        with open(tmp_path, 'wb') as f:
+            f.write(blob)
+        os.replace(tmp_path, path)
+        return True
+    except (OSError, ValueError) as e:
+        print(f"Error saving library snapshot: {e}")
+        try:
+            tmp_path.unlink()
+        except OSError:
+            pass
+        return False
+
+
+def load_snapshot(path):
+    """Returns (generation, folders, videos) or None if missing, corrupt or outdated."""
+    try:
+        with open(path, 'rb') as f:
+            data = marshal.loads(zlib.decompress(f.read()))
+    except FileNotFoundError:
+        return None
+    except (OSError, EOFError, ValueError, TypeError, zlib.error) as e:
+        print(f"Error reading library snapshot: {e}")
+        return None
+
+    if not isinstance(data, tuple) or len(data) != 6 or data[0] != SNAPSHOT_VERSION:
+        return None
+    _, generation, folder_fields, video_fields, folder_rows, video_rows = data
+    if tuple(folder_fields) != FOLDER_FIELDS or tuple(video_fields) != VIDEO_FIELDS:
+        return None
+
+    folders = [dict(zip(FOLDER_FIELDS, row)) for row in folder_rows]
+    videos = [dict(zip(VIDEO_FIELDS, row)) for row in video_rows]
+    return generation, folders, videos
@@ -4,6 +4,10 @@ import configparser
 import time
 from pathlib import Path
 
+# Must run before the imports it should measure (no-op unless VCP_STARTUP_PROFILE is set)
+import startup_profile
+startup_profile.install()
+
 # Fix for 'charmap' codec errors on Windows when printing Cyrillic
 if sys.platform == 'win32':
     import io
@@ -29,7 +33,6 @@ import locale
 locale.setlocale(locale.LC_NUMERIC, 'C')
 from database import DatabaseManager
 import configparser
-import json
 import io
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout,
@@ -37,24 +40,26 @@ from PyQt6.QtWidgets import (
     QLineEdit, QHBoxLayout, QFileDialog,
     QStyle, QMenu, QMessageBox, QCheckBox, QSplitter,
     QTreeWidgetItemIterator, QDialog, QGroupBox, QSpinBox, QSizePolicy, QFrame, QComboBox,
-    QTextEdit, QProgressBar, QListWidget, QGridLayout
+    QTextEdit, QProgressBar, QListWidget, QListWidgetItem, QGridLayout
 )
 from PyQt6.QtCore import Qt, QSize, QRect, QTimer, QUrl, pyqtSignal, QByteArray, QPoint, QThread, QRectF
 from PyQt6.QtGui import QIcon, QPixmap, QFont, QBrush, QColor, QPainter, QAction, QKeyEvent, QMouseEvent, QActionGroup, QPalette, QPolygon, QCursor, QPen, QTextCursor
 from styles import DARK_STYLE
 import styles
-from taskbar_progress import TaskbarProgress
 import re
 from translator import tr, Translator
-from about_dialog import AboutDialog
-from settings_dialog import SettingsDialog, ScanProgressDialog
 from subtitle_popup import SubtitlePopup, SubtitleButton
 from volume_popup import VolumePopup, VolumeButton
 from placeholders import draw_video_placeholder, draw_library_placeholder
 from player import VideoPlayerWidget
-from library import HoverTreeWidget, VideoItemDelegate
+from library import HoverTreeWidget, VideoItemDelegate, LibraryLoader
+import library_snapshot
 from hotkeys import HotkeyManager
-from tags_dialog import TagsDialog
+from playback_profiles import PlaybackProfiles
+from media_governor import get_governor
+# Dialogs, the taskbar integration and the scanner are imported on first use
+
+startup_profile.mark('imports')
 
 
 
@@ -74,9 +79,19 @@ class VideoCourseBrowser(QMainWindow):
         self.script_dir = Path(__file__).parent
         self.config_file = RESOURCES_DIR / 'settings.ini'
         self.db_file = DATA_DIR / 'video_courses.db'
+        self.library_snapshot_file = DATA_DIR / 'library_snapshot.bin'
+        self._library_load_seq = 0
+        self._library_loader = None
+        # Background reload after in-place row updates, so folder rows catch up
+        self.library_refresh_timer = QTimer(self)
+        self.library_refresh_timer.setSingleShot(True)
+        self.library_refresh_timer.setInterval(2000)
+        self.library_refresh_timer.timeout.connect(self.refresh_library_in_background)
         self.db = DatabaseManager(self.db_file)
+        startup_profile.mark('database')
 
-        self.hotkey_manager = HotkeyManager(self)
+        # The global hotkey thread starts after the first paint (see _deferred_init)
+        self.hotkey_manager = HotkeyManager(self, start_global=False)
         self.hotkey_manager.global_action_triggered.connect(self.handle_player_action)
         self.hotkey_manager.global_action_state_changed.connect(
             lambda action, pressed: self.handle_player_action(action, pressed)
@@ -85,9 +100,11 @@ class VideoCourseBrowser(QMainWindow):
 
         self.load_icons()
 
-        self.taskbar_progress = TaskbarProgress()
+        # Created in _deferred_init (COM setup is slow and not needed for the first paint)
+        self.taskbar_progress = None
 
         self.create_menu_bar()
+        startup_profile.mark('settings_icons_menu')
 
         central_widget = QWidget()
         self.setCentralWidget(central_widget)
@@ -118,6 +135,20 @@ class VideoCourseBrowser(QMainWindow):
         self.search_edit.setObjectName("librarySearch")
         browser_layout.addWidget(self.search_edit)
 
+        # Transcript search hits (video + timestamp), shown under the search field
+        self.transcript_results = QListWidget()
+        self.transcript_results.setObjectName("transcriptResults")
+        self.transcript_results.setMaximumHeight(200)
+        self.transcript_results.setVisible(False)
+        self.transcript_results.itemActivated.connect(self.on_transcript_hit_activated)
+        browser_layout.addWidget(self.transcript_results)
+
+        # Debounce transcript queries while typing
+        self.transcript_search_timer = QTimer(self)
+        self.transcript_search_timer.setSingleShot(True)
+        self.transcript_search_timer.setInterval(250)
+        self.transcript_search_timer.timeout.connect(self.run_transcript_search)
+
         self.course_tree = HoverTreeWidget()
         self.course_tree.setColumnCount(1)
         self.course_tree.setHeaderHidden(True)
@@ -143,8 +174,10 @@ class VideoCourseBrowser(QMainWindow):
 
         browser_layout.addWidget(self.course_tree)
         self.splitter.addWidget(browser_widget)
+        startup_profile.mark('library_widgets')
 
-        self.video_player = VideoPlayerWidget()
+        # mpv is initialized in _deferred_init, after the window is on screen
+        self.video_player = VideoPlayerWidget(init_mpv=False)
         self.video_player.setMinimumWidth(400) # Ensure player has minimum width
         self.video_player.db = self.db
         self.video_player.taskbar_progress = self.taskbar_progress
@@ -164,11 +197,17 @@ class VideoCourseBrowser(QMainWindow):
         self.video_player.prev_video_requested.connect(self.play_prev_video)
         self.video_player.markers_changed.connect(self.on_markers_changed)
         self.video_player.toggle_fullscreen_requested.connect(self.toggle_fullscreen)
+        self.video_player.preload_requested.connect(self.preload_next_video)
+        self.video_player.load_failed.connect(self.on_video_load_failed)
 
         # Apply initial subtitle settings
         self.video_player.set_subtitle_styles(self.sub_color, self.sub_border_color, self.sub_scale)
+        self.video_player.set_position_update_rate(self.position_update_hz)
+        self.video_player.set_preload(self.preload_next, self.preload_seconds)
+        self.video_player.set_playback_profiles(self.playback_profiles)
 
         self.splitter.addWidget(self.video_player)
+        startup_profile.mark('player_widget')
 
         # Set default sizes before restoring state
         self.splitter.setSizes([int(self.window_width * 0.3), int(self.window_width * 0.7)])
@@ -185,15 +224,38 @@ class VideoCourseBrowser(QMainWindow):
         # Double-check splitter sizes after all geometry is set
         QTimer.singleShot(50, self._ensure_player_visible)
         
-        self.load_courses()
+        self.load_courses_from_snapshot()
+        startup_profile.mark('load_courses')
         self.course_tree.setFocusPolicy(Qt.FocusPolicy.NoFocus)
-        QTimer.singleShot(100, self.restore_last_video)
+        # _deferred_init (then restore_last_video) is queued by the first showEvent
+        self._deferred_init_queued = False
 
         self.last_saved_position = {}
         self.progress_save_timer = QTimer(self)
         self.progress_save_timer.timeout.connect(self.periodic_progress_save)
         self.progress_save_timer.start(1000)
 
+    def _deferred_init(self):
+        """Subsystems that are not needed for the first paint: mpv, global hotkeys, taskbar."""
+        startup_profile.mark('first_paint')
+
+        if not self.video_player.player:
+            self.video_player.setup_mpv()
+        startup_profile.mark('mpv')
+
+        self.hotkey_manager.start_global_listener()
+        startup_profile.mark('global_hotkeys')
+
+        from taskbar_progress import TaskbarProgress
+        self.taskbar_progress = TaskbarProgress()
+        self.video_player.taskbar_progress = self.taskbar_progress
+        self._attach_taskbar()
+        startup_profile.mark('taskbar')
+
+        startup_profile.report()
+        # Needs mpv
+        QTimer.singleShot(100, self.restore_last_video)
+
     def keyPressEvent(self, event: QKeyEvent):
         action = self.hotkey_manager.get_action(event)
         
@@ -268,6 +330,10 @@ class VideoCourseBrowser(QMainWindow):
             self.video_player.frame_step()
         elif action == "frame_back":
             self.video_player.frame_back_step()
+        elif action == "toggle_stats":
+            enabled = self.video_player.toggle_stats_overlay()
+            if hasattr(self, 'stats_action'):
+                self.stats_action.setChecked(enabled)
         elif action == "speed_up":
             self.video_player.adjust_speed(0.1)
         elif action == "speed_down":
@@ -497,8 +563,8 @@ class VideoCourseBrowser(QMainWindow):
         item = self.find_video_item(last_video_path)
 
         if item:
-            saved_position, saved_volume = self.get_saved_position(last_video_path)
-            self.video_player.load_video(last_video_path, saved_position, volume=saved_volume, auto_play=False)
+            # Position and volume come from the DB session loaded by the player
+            self.video_player.load_video(last_video_path, auto_play=False)
             # Update delegate
             delegate = self.course_tree.itemDelegate()
             if isinstance(delegate, VideoItemDelegate):
@@ -561,6 +627,14 @@ class VideoCourseBrowser(QMainWindow):
         frame_back_action.triggered.connect(lambda: self.handle_player_action("frame_back"))
         tools_menu.addAction(frame_back_action)
 
+        tools_menu.addSeparator()
+
+        self.stats_action = QAction(tr('menu.playback_stats'), self)
+        self.stats_action.setCheckable(True)
+        self.stats_action.setShortcut('I')
+        self.stats_action.triggered.connect(lambda: self.handle_player_action("toggle_stats"))
+        tools_menu.addAction(self.stats_action)
+
         # [View] Menu
         view_menu = menubar.addMenu(tr('menu.view'))
 
@@ -635,6 +709,7 @@ class VideoCourseBrowser(QMainWindow):
         gc.collect()
             
     def open_settings(self):
+        from settings_dialog import SettingsDialog
         dialog = SettingsDialog(self, self.config_file)
         if dialog.exec() == QDialog.DialogCode.Accepted:
             self.load_settings()
@@ -642,11 +717,15 @@ class VideoCourseBrowser(QMainWindow):
             QMessageBox.information(self, tr('settings.done'), tr('settings.saved'))
 
     def show_about(self):
+        from about_dialog import AboutDialog
         dialog = AboutDialog(self)
         dialog.exec()
 
     def save_progress(self, position_sec, file_path):
         """Save playback progress."""
+        if self.video_player.load_state == 'loading' or file_path != self.video_player.current_file:
+            # Position of the previous file while the next one opens
+            return
         try:
             # Calculate percent here or let database.py handle it. 
             # Current database.py save_progress expects (file_path, position_sec, duration_sec)
@@ -663,7 +742,7 @@ class VideoCourseBrowser(QMainWindow):
             print(f"Error saving progress: {e}")
 
     def periodic_progress_save(self):
-        if not self.video_player.current_file:
+        if not self.video_player.current_file or self.video_player.load_state == 'loading':
             return
 
         file_path = self.video_player.current_file
@@ -736,10 +815,18 @@ class VideoCourseBrowser(QMainWindow):
             iterator += 1
         self.course_tree.viewport().update()
 
+    def on_video_load_failed(self, file_path, error):
+        self.info_label.setText(tr('status.load_failed', file=Path(file_path).name, error=error))
+
     def on_video_finished(self):
         if self.video_player.current_file:
             self.db.mark_video_as_watched(self.video_player.current_file)
-            self.load_courses()
+            # Update the row in place: rebuilding the tree would stall the switch to the next lesson
+            self.update_video_item_display(self.video_player.current_file, 100, 0)
+            # Folder rows are refreshed off the UI thread once the next lesson has started
+            self.library_refresh_timer.start()
+            if self.auto_play_next:
+                self.play_next_video(auto_play=True)
 
     def clear_metadata(self):
         """Clear all metadata via main window button."""
@@ -1018,6 +1105,7 @@ class VideoCourseBrowser(QMainWindow):
 
     def edit_tags(self, item):
         """Open tags dialog."""
+        from tags_dialog import TagsDialog
         file_path = item.data(0, Qt.ItemDataRole.UserRole)
         dialog = TagsDialog(self, self.db, file_path)
         if dialog.exec() == QDialog.DialogCode.Accepted:
@@ -1072,40 +1160,36 @@ class VideoCourseBrowser(QMainWindow):
         elif item_type == 'folder':
             item.setExpanded(not item.isExpanded())
 
-    def play_next_video(self):
-        if not self.video_player.current_file:
-            return
-
-        current_item = self.find_video_item(self.video_player.current_file)
-        if not current_item:
-            return
-
-        # Determine if we should auto-play the next video
-        # If player is currently playing (not paused), then auto-play next
-        should_play = True
-        if self.video_player.player:
-            should_play = not self.video_player.player.pause
-
+    def find_adjacent_video_item(self, current_item, forward=True):
+        """Return the next (or previous) video item in course order."""
         iterator = QTreeWidgetItemIterator(self.course_tree, QTreeWidgetItemIterator.IteratorFlag.All)
-        # Advance to current
+        last_video_item = None
+
         while iterator.value():
             item = iterator.value()
             iterator += 1
             if item == current_item:
+                if not forward:
+                    return last_video_item
                 break
-        
+            if item.data(0, Qt.ItemDataRole.UserRole + 1) == 'video':
+                last_video_item = item
+
         # Continue to find next video
         while iterator.value():
             item = iterator.value()
-            item_type = item.data(0, Qt.ItemDataRole.UserRole + 1)
-            if item_type == 'video':
-                self.play_video_in_player(item, resume=True, auto_play=should_play)
-                self.course_tree.scrollToItem(item)
-                self.course_tree.setCurrentItem(item)
-                return
+            if item.data(0, Qt.ItemDataRole.UserRole + 1) == 'video':
+                return item
             iterator += 1
+        return None
+
+    def play_next_video(self, auto_play=None):
+        self._play_adjacent_video(forward=True, auto_play=auto_play)
 
     def play_prev_video(self):
+        self._play_adjacent_video(forward=False)
+
+    def _play_adjacent_video(self, forward, auto_play=None):
         if not self.video_player.current_file:
             return
 
@@ -1113,37 +1197,44 @@ class VideoCourseBrowser(QMainWindow):
         if not current_item:
             return
 
-        # Determine if we should auto-play the prev video
+        # Determine if we should auto-play the next video
+        # If player is currently playing (not paused), then auto-play next
         should_play = True
-        if self.video_player.player:
+        if auto_play is not None:
+            should_play = auto_play
+        elif self.video_player.player:
             should_play = not self.video_player.player.pause
 
-        iterator = QTreeWidgetItemIterator(self.course_tree, QTreeWidgetItemIterator.IteratorFlag.All)
-        last_video_item = None
+        item = self.find_adjacent_video_item(current_item, forward)
+        if item:
+            self.play_video_in_player(item, resume=True, auto_play=should_play)
+            self.course_tree.scrollToItem(item)
+            self.course_tree.setCurrentItem(item)
 
-        while iterator.value():
-            item = iterator.value()
-            if item == current_item:
-                if last_video_item:
-                    self.play_video_in_player(last_video_item, resume=True, auto_play=should_play)
-                    self.course_tree.scrollToItem(last_video_item)
-                    self.course_tree.setCurrentItem(last_video_item)
-                return
-            
-            item_type = item.data(0, Qt.ItemDataRole.UserRole + 1)
-            if item_type == 'video':
-                last_video_item = item
-            
-            iterator += 1
+    def preload_next_video(self, file_path):
+        """Open the next lesson in the background while the current one ends."""
+        current_item = self.find_video_item(file_path)
+        if not current_item:
+            return
+
+        item = self.find_adjacent_video_item(current_item, forward=True)
+        if not item:
+            return
 
-    def play_video_in_player(self, item, resume=True, auto_play=True):
+        next_path = item.data(0, Qt.ItemDataRole.UserRole)
+        if next_path and Path(next_path).exists():
+            # Resume position comes from the DB, as in play_video_in_player
+            self.video_player.preload_next(next_path)
+
+    def play_video_in_player(self, item, resume=True, auto_play=True, start_position=None):
         file_path = item.data(0, Qt.ItemDataRole.UserRole)
 
         if file_path and Path(file_path).exists():
-            saved_position = 0
-            saved_volume = 100
-            if resume:
-                saved_position, saved_volume = self.get_saved_position(file_path)
+            # None = let the player take position/volume from its DB session
+            saved_position = None if resume else 0
+            saved_volume = None if resume or start_position is not None else 100
+            if start_position is not None:
+                saved_position = start_position
 
             self.video_player.load_video(file_path, saved_position, volume=saved_volume, auto_play=auto_play)
             # Update delegate
@@ -1153,7 +1244,6 @@ class VideoCourseBrowser(QMainWindow):
                 delegate.is_paused = not auto_play
                 self.course_tree.viewport().update()
                 
-            #self.video_player.restore_audio_track(file_path)
             self.update_window_title_for_item(item)
 
     def play_video(self, item):
@@ -1257,6 +1347,7 @@ class VideoCourseBrowser(QMainWindow):
             config.write(f)
 
         # Show progress dialog with console output
+        from settings_dialog import ScanProgressDialog
         dialog = ScanProgressDialog(self)
         dialog.start_scan(self.config_file, paths, self.ffmpeg_path, self.ffprobe_path)
         dialog.scanner_thread.finished_scan.connect(
@@ -1268,6 +1359,7 @@ class VideoCourseBrowser(QMainWindow):
         self.info_label.setText(tr('status.found', folders=total_folders, videos=total_videos))
         # Refresh courses immediately while dialog might still be open
         self.load_courses()
+        self.save_library_snapshot()
 
     def create_default_settings(self):
         config = configparser.ConfigParser()
@@ -1297,6 +1389,8 @@ class VideoCourseBrowser(QMainWindow):
             'count': '12',
             'quality': '2',
             'regenerate': 'False',
+            # accurate or keyframe (nearest keyframes: faster on long-GOP screen recordings)
+            'seek_mode': 'accurate',
             'max_workers': '8',
             'animation_interval': '400'
         }
@@ -1306,7 +1400,35 @@ class VideoCourseBrowser(QMainWindow):
         config['Subtitles'] = {
             'text_color': '#FFFFFF',
             'outline_color': '#000000',
-            'font_scale': '1.0'
+            'font_scale': '1.0',
+            'index_transcripts': 'False'
+        }
+        config['Playback'] = {
+            'position_update_hz': '8',
+            'preload_next': 'True',
+            'preload_seconds': '30',
+            'auto_play_next': 'False',
+            # auto (by file location), local or network; override any option
+            # as <profile>_<option>, e.g. network_demuxer_max_bytes = 1GiB
+            'profile': 'auto'
+        }
+        config['Performance'] = {
+            'max_workers': '8',
+            'thumbnail_workers': '4',
+            'ffmpeg_timeout': '5',
+            # Frame timeouts adapt to measured seek latency, up to this many seconds
+            'ffmpeg_timeout_max': '60',
+            # thread or process (name matching of big folders in worker processes)
+            'executor': 'thread',
+            'process_workers': '0',
+            # Concurrent ffmpeg/ffprobe processes in total / per disk (0 = automatic)
+            'media_processes': '0',
+            'media_per_device': '0'
+        }
+        config['Scan'] = {
+            'prune_missing': 'True',
+            'prune_dry_run': 'False',
+            'metrics_report': 'True'
         }
 
         with open(self.config_file, 'w', encoding='utf-8') as f:
@@ -1337,6 +1459,8 @@ class VideoCourseBrowser(QMainWindow):
         # Binary files - get from already loaded config
         self.ffmpeg_path = resolve_binary_path(config, 'ffmpeg_path', 'bin/ffmpeg.exe')
         self.ffprobe_path = resolve_binary_path(config, 'ffprobe_path', 'bin/ffprobe.exe')
+        get_governor().configure(config.getint('Performance', 'media_processes', fallback=0),
+                                 config.getint('Performance', 'media_per_device', fallback=0))
         self.libmpv_path = resolve_binary_path(config, 'libmpv_path', 'bin/libmpv-2.dll')
 
         self.window_width = config.getint('Display', 'window_width', fallback=1400)
@@ -1353,6 +1477,13 @@ class VideoCourseBrowser(QMainWindow):
         self.sub_border_color = config.get('Subtitles', 'outline_color', fallback='#000000')
         self.sub_scale = config.getfloat('Subtitles', 'font_scale', fallback=1.0)
 
+        # Playback settings
+        self.position_update_hz = config.getint('Playback', 'position_update_hz', fallback=8)
+        self.preload_next = config.getboolean('Playback', 'preload_next', fallback=True)
+        self.preload_seconds = config.getint('Playback', 'preload_seconds', fallback=30)
+        self.auto_play_next = config.getboolean('Playback', 'auto_play_next', fallback=False)
+        self.playback_profiles = PlaybackProfiles(config)
+
     def save_subtitle_settings(self, property_name, value):
         """Save subtitle style settings to ini file."""
         config = configparser.ConfigParser()
@@ -1398,6 +1529,75 @@ class VideoCourseBrowser(QMainWindow):
     def load_courses(self):
         """Load courses from DB and build tree."""
         print("DEBUG: load_courses start") # DEBUG
+        # Supersedes a background reconcile that is still running
+        self._library_load_seq += 1
+
+        if not self.db_file.exists():
+            self.course_tree.clear()
+            self.info_label.setText(tr('status.db_not_found'))
+            return
+
+        folders, videos = self.db.get_courses()
+        self._build_library_tree(folders, videos)
+
+    def load_courses_from_snapshot(self):
+        """
+        Startup: build the tree from the library snapshot without querying the DB,
+        then compare generations and reload from the DB in the background if stale.
+        """
+        snapshot = None
+        if self.db_file.exists():
+            snapshot = library_snapshot.load_snapshot(self.library_snapshot_file)
+        if snapshot is None:
+            self.load_courses()
+            return
+
+        generation, folders, videos = snapshot
+        self._build_library_tree(folders, videos)
+        self._start_library_loader(generation)
+
+    def refresh_library_in_background(self):
+        """Re-read the library on a LibraryLoader thread and rebuild the tree when it arrives."""
+        if self._library_loader is not None:
+            # One reload at a time; try again once it is done
+            self.library_refresh_timer.start()
+            return
+        self._start_library_loader()
+
+    def _start_library_loader(self, known_generation=None):
+        self._library_load_seq += 1
+        loader = LibraryLoader(self.db, self._library_load_seq, known_generation)
+        loader.loaded.connect(self._on_library_reconciled)
+        loader.finished.connect(loader.deleteLater)
+        self._library_loader = loader
+        loader.start()
+
+    def _on_library_reconciled(self, request_id, generation, folders, videos):
+        """UI thread: the DB was read in the background; rebuild if the snapshot was stale."""
+        self._library_loader = None
+        if request_id != self._library_load_seq or folders is None:
+            return
+
+        print(f"Library changed (generation {generation}), reloading tree")
+        scroll = self.course_tree.verticalScrollBar().value()
+        self._build_library_tree(folders, videos)
+        self.course_tree.verticalScrollBar().setValue(scroll)
+
+    def save_library_snapshot(self):
+        """Write the current library state to the snapshot file (after a scan and on close)."""
+        if not self.db_file.exists():
+            return
+        generation = self.db.get_library_generation()
+        if generation is None:
+            return
+        folders, videos = self.db.get_courses()
+        # Skip a snapshot that may mix two generations
+        if self.db.get_library_generation() != generation:
+            return
+        library_snapshot.save_snapshot(self.library_snapshot_file, generation, folders, videos)
+
+    def _build_library_tree(self, folders, videos):
+        """Build the library tree from folder and video rows (DB or snapshot)."""
         folder_font = QFont()
         folder_font.setBold(True)
 
@@ -1413,12 +1613,6 @@ class VideoCourseBrowser(QMainWindow):
         if isinstance(delegate, VideoItemDelegate):
             delegate.thumbnail_cache.clear()
 
-        if not self.db_file.exists():
-            self.info_label.setText(tr('status.db_not_found'))
-            return
-        
-        folders, videos = self.db.get_courses()
-        
         # Index folders
         folder_items = {}
         folders_data = {}
@@ -1478,6 +1672,7 @@ class VideoCourseBrowser(QMainWindow):
                 break
 
         # Add videos
+        thumb_count = 0
         for v in videos:
             if v['folder_path'] in folder_items:
                 parent_item = folder_items[v['folder_path']]
@@ -1491,12 +1686,9 @@ class VideoCourseBrowser(QMainWindow):
                 video_item.setData(0, Qt.ItemDataRole.UserRole, v['file_path'])
                 video_item.setData(0, Qt.ItemDataRole.UserRole + 1, 'video')
                 
-                thumbnails_list = []
-                if v['thumbnails_json']:
-                    try:
-                        thumbnails_list = json.loads(v['thumbnails_json'])
-                    except:
-                        pass
+                thumbnails_list = library_snapshot.parse_thumbnails(v)
+                if thumbnails_list:
+                    thumb_count += 1
 
                 # Data for delegate
                 # Tuple structure:
@@ -1522,8 +1714,7 @@ class VideoCourseBrowser(QMainWindow):
         # Info panel statistics
         folder_count = len(folders)
         video_count = len(videos)
-        thumb_count = sum(1 for v in videos if v.get('thumbnails_json'))
-        resumed_count = sum(1 for v in videos if v.get('last_position', 0) > 0)
+        resumed_count = sum(1 for v in videos if (v.get('last_position') or 0) > 0)
 
         self.info_label.setText(tr('status.loaded',
                                    folders=folder_count,
@@ -1537,6 +1728,7 @@ class VideoCourseBrowser(QMainWindow):
 
     def filter_library(self, text):
         """Filter library items by text."""
+        self.transcript_search_timer.start()
         query = text.lower()
         self.course_tree.blockSignals(True)
         self.course_tree.setUpdatesEnabled(False)
@@ -1582,10 +1774,56 @@ class VideoCourseBrowser(QMainWindow):
             
         return is_visible
 
+    def run_transcript_search(self):
+        """Search subtitle transcripts for the current query."""
+        text = self.search_edit.text().strip()
+        self.transcript_results.clear()
+
+        if len(text) < 3:
+            self.transcript_results.setVisible(False)
+            return
+
+        hits = self.db.search_transcripts(text)
+        for hit in hits:
+            label = tr('library.transcript_hit',
+                       time=VideoPlayerWidget.format_time(hit['start_seconds']),
+                       name=hit['file_name'],
+                       text=hit['text'])
+            list_item = QListWidgetItem(label)
+            list_item.setToolTip(hit['text'])
+            list_item.setData(Qt.ItemDataRole.UserRole, hit['file_path'])
+            list_item.setData(Qt.ItemDataRole.UserRole + 1, hit['start_seconds'])
+            self.transcript_results.addItem(list_item)
+
+        self.transcript_results.setVisible(bool(hits))
+        if hits:
+            self.info_label.setText(tr('library.transcript_results', count=len(hits)))
+
+    def on_transcript_hit_activated(self, list_item):
+        """Open the video of a transcript hit at the cue timestamp."""
+        file_path = list_item.data(Qt.ItemDataRole.UserRole)
+        position = list_item.data(Qt.ItemDataRole.UserRole + 1) or 0
+
+        iterator = QTreeWidgetItemIterator(self.course_tree)
+        while iterator.value():
+            item = iterator.value()
+            if item.data(0, Qt.ItemDataRole.UserRole) == file_path:
+                self.course_tree.setCurrentItem(item)
+                self.play_video_in_player(item, auto_play=True, start_position=position)
+                return
+            iterator += 1
+
     def showEvent(self, event):
         print("DEBUG: showEvent start") # DEBUG
         super().showEvent(event)
         self.setFocus()
+        self._attach_taskbar()
+        if not self._deferred_init_queued:
+            # Queued behind the paint events of the window being shown
+            self._deferred_init_queued = True
+            QTimer.singleShot(0, self._deferred_init)
+
+    def _attach_taskbar(self):
         if self.taskbar_progress:
             try:
                 hwnd = int(self.winId())
@@ -1596,9 +1834,13 @@ class VideoCourseBrowser(QMainWindow):
 
     def closeEvent(self, event):
         self.save_window_state()
+        if self._library_loader:
+            self._library_loader.wait()
+        self.save_library_snapshot()
         if hasattr(self, 'hotkey_manager'):
             self.hotkey_manager.stop()
-        self.taskbar_progress.clear()
+        if self.taskbar_progress:
+            self.taskbar_progress.clear()
         event.accept()
 
 
@@ -1606,6 +1848,7 @@ def main():
     app = QApplication(sys.argv)
     app.setStyle('Fusion')
     app.setStyleSheet(DARK_STYLE)
+    startup_profile.mark('qapplication')
 
     try:
         print("DEBUG: Application starting...") # DEBUG
@@ -1614,6 +1857,7 @@ def main():
         is_maximized = window.restore_window_state()
         print("DEBUG: Window state restored") # DEBUG
         window.show()
+        startup_profile.mark('window_shown')
         print("DEBUG: Window shown") # DEBUG
         if is_maximized:
             # Explicitly synchronize screen association before maximizing
@@ -1653,4 +1897,7 @@ def main():
 
 
 if __name__ == '__main__':
+    # Worker processes of the scanner (executor = process) in the frozen build
+    import multiprocessing
+    multiprocessing.freeze_support()
     main()
@@ -4,6 +4,21 @@ from PyQt6.QtGui import QPixmap, QColor, QPalette
 
 from translator import tr
 
+# Fixed item geometry lets the gallery place items without a layout
+ITEM_WIDTH = 180
+ITEM_HEIGHT = 140
+ITEM_SPACING = 10
+ITEM_STRIDE = ITEM_WIDTH + ITEM_SPACING
+# Items kept alive beyond each edge of the visible area
+OVERSCAN_ITEMS = 3
+
+
+def _format_time(seconds):
+    m, s = divmod(int(seconds), 60)
+    h, m = divmod(m, 60)
+    return f"{h:02d}:{m:02d}:{s:02d}" if h > 0 else f"{m:02d}:{s:02d}"
+
+
 class MarkerItem(QFrame):
     """A single item in the marker gallery."""
     clicked = pyqtSignal(float) # timestamp
@@ -12,13 +27,7 @@ class MarkerItem(QFrame):
 
     def __init__(self, marker_data, parent=None):
         super().__init__(parent)
-        self.marker_data = marker_data
-        self.marker_id = marker_data.get('id')
-        self.timestamp = marker_data.get('position_seconds', 0)
-        self.label_text = marker_data.get('label', "")
-        self.color = marker_data.get('color', "#FFD700")
-        
-        self.setFixedSize(180, 140)
+        self.setFixedSize(ITEM_WIDTH, ITEM_HEIGHT)
         self.setCursor(Qt.CursorShape.PointingHandCursor)
         self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground)
         
@@ -35,11 +44,7 @@ class MarkerItem(QFrame):
         layout.addWidget(self.thumb_label)
 
         # Time Label with plate (Overlay on thumbnail)
-        m, s = divmod(int(self.timestamp), 60)
-        h, m = divmod(m, 60)
-        time_str = f"{h:02d}:{m:02d}:{s:02d}" if h > 0 else f"{m:02d}:{s:02d}"
-        
-        self.time_label = QLabel(time_str, self.thumb_label)
+        self.time_label = QLabel("", self.thumb_label)
         self.time_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self.time_label.setStyleSheet("""
             background-color: rgba(0, 0, 0, 180);
@@ -60,16 +65,8 @@ class MarkerItem(QFrame):
         thumb_layout.addLayout(time_hbox)
         
         # Title Label with plate
-        self.title_label = QLabel(self.label_text)
+        self.title_label = QLabel()
         self.title_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.title_label.setStyleSheet(f"""
-            background-color: rgba(30, 30, 30, 200);
-            color: #eaeaea;
-            border: 1px solid {self.color};
-            border-radius: 4px;
-            padding: 2px 6px;
-            font-size: 11px;
-        """)
         self.title_label.setWordWrap(False)
         layout.addWidget(self.title_label, 0, Qt.AlignmentFlag.AlignCenter)
 
@@ -86,6 +83,31 @@ class MarkerItem(QFrame):
             }}
         """)
 
+        self.set_marker_data(marker_data)
+
+    def set_marker_data(self, marker_data):
+        """Update time, label and color in place."""
+        self.marker_data = marker_data
+        self.marker_id = marker_data.get('id')
+        self.timestamp = marker_data.get('position_seconds', 0)
+        self.label_text = marker_data.get('label', "")
+        self.color = marker_data.get('color', "#FFD700")
+
+        self.time_label.setText(_format_time(self.timestamp))
+        self.title_label.setText(self.label_text)
+        self.title_label.setStyleSheet(f"""
+            background-color: rgba(30, 30, 30, 200);
+            color: #eaeaea;
+            border: 1px solid {self.color};
+            border-radius: 4px;
+            padding: 2px 6px;
+            font-size: 11px;
+        """)
+
+    def clear_pixmap(self):
+        self.thumb_label.clear()
+        self.thumb_label.setText("...")
+
     def set_pixmap(self, pixmap):
         scaled = pixmap.scaled(self.thumb_label.size(), Qt.AspectRatioMode.KeepAspectRatioByExpanding, Qt.TransformationMode.SmoothTransformation)
         self.thumb_label.setPixmap(scaled)
@@ -108,10 +130,15 @@ class MarkerItem(QFrame):
             self.delete_requested.emit(self.marker_id)
 
 class MarkerGalleryWidget(QFrame):
-    """Horizontal gallery of markers with screenshots."""
+    """
+    Horizontal gallery of markers with screenshots.
+    Only items near the visible area exist as widgets; markers are diffed by id
+    on update and loaded thumbnails are kept.
+    """
     seek_requested = pyqtSignal(float)
     delete_requested = pyqtSignal(int) # marker_id
     edit_requested = pyqtSignal(dict) # marker_data
+    thumbnails_requested = pyqtSignal(list) # markers that need a screenshot
 
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -126,69 +153,136 @@ class MarkerGalleryWidget(QFrame):
                 border-radius: 10px;
             }
         """)
-        
+
         layout = QVBoxLayout(self)
         layout.setContentsMargins(10, 5, 10, 25)
-        
+
         # Scroll Area
         self.scroll = QScrollArea()
         self.scroll.setFocusPolicy(Qt.FocusPolicy.NoFocus)
-        self.scroll.setWidgetResizable(True)
+        self.scroll.setWidgetResizable(False)
         self.scroll.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAsNeeded)
         self.scroll.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
         self.scroll.setStyleSheet("background: transparent; border: none;")
-        
+
+        # Items are positioned manually at index * ITEM_STRIDE
         self.content_widget = QWidget()
         self.content_widget.setStyleSheet("background: transparent;")
-        self.content_layout = QHBoxLayout(self.content_widget)
-        self.content_layout.setContentsMargins(0, 0, 0, 0)
-        self.content_layout.setSpacing(10)
-        self.content_layout.addStretch() # Initial stretch
-        
+        self.content_widget.setFixedHeight(ITEM_HEIGHT)
+
         self.scroll.setWidget(self.content_widget)
+        self.scroll.horizontalScrollBar().valueChanged.connect(self._update_visible_items)
         layout.addWidget(self.scroll)
-        
-        self.items = {} # {marker_id: MarkerItem}
+
+        self.empty_label = QLabel(tr('player.no_markers') or "No markers found", self)
+        self.empty_label.setStyleSheet("""
+            background-color: rgba(0, 0, 0, 100);
+            color: #aaaaaa;
+            border-radius: 6px;
+            padding: 10px 20px;
+            font-size: 13px;
+            border: 1px solid rgba(255, 255, 255, 20);
+        """)
+        self.empty_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.empty_label.adjustSize()
+
+        self.markers = [] # sorted by time
+        self.items = {} # {marker_id: MarkerItem}, realized items only
+        self.pixmaps = {} # {marker_id: QPixmap}, survives item recycling
+        self._requested = set() # marker ids with a pending/finished thumbnail request
 
     def set_markers(self, markers):
-        """Update the gallery with a list of markers."""
-        # Clear existing
-        for i in reversed(range(self.content_layout.count())):
-            item = self.content_layout.itemAt(i)
-            if item.widget():
-                item.widget().setParent(None)
-        
-        self.items.clear()
-        
-        # Sort markers by time
+        """Update the gallery, touching only markers that were added, changed or removed."""
         sorted_markers = sorted(markers, key=lambda x: x.get('position_seconds', 0))
-        
+        old = {m['id']: m for m in self.markers}
+        new_ids = {m['id'] for m in sorted_markers}
+
+        for marker_id in old.keys() - new_ids:
+            self.pixmaps.pop(marker_id, None)
+            self._requested.discard(marker_id)
+            item = self.items.pop(marker_id, None)
+            if item:
+                item.deleteLater()
+
         for m in sorted_markers:
-            item = MarkerItem(m)
-            item.clicked.connect(self.seek_requested)
-            item.edit_requested.connect(self.edit_requested)
-            item.delete_requested.connect(self.delete_requested)
-            self.content_layout.insertWidget(self.content_layout.count() - 1, item)
-            self.items[m['id']] = item
-            
-        if not sorted_markers:
-            lbl = QLabel(tr('player.no_markers') or "No markers found")
-            lbl.setStyleSheet("""
-                background-color: rgba(0, 0, 0, 100);
-                color: #aaaaaa;
-                border-radius: 6px;
-                padding: 10px 20px;
-                font-size: 13px;
-                border: 1px solid rgba(255, 255, 255, 20);
-            """)
-            lbl.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            # Center the label in the layout
-            container = QWidget()
-            vbox = QVBoxLayout(container)
-            vbox.addStretch()
-            vbox.addWidget(lbl, 0, Qt.AlignmentFlag.AlignCenter)
-            vbox.addStretch()
-            self.content_layout.insertWidget(0, container)
+            previous = old.get(m['id'])
+            if previous is None or previous == m:
+                continue
+            if previous.get('position_seconds') != m.get('position_seconds'):
+                # Screenshot shows the old frame
+                self.pixmaps.pop(m['id'], None)
+                self._requested.discard(m['id'])
+                if m['id'] in self.items:
+                    self.items[m['id']].clear_pixmap()
+            if m['id'] in self.items:
+                self.items[m['id']].set_marker_data(m)
+
+        self.markers = sorted_markers
+        self.content_widget.setFixedWidth(max(0, len(sorted_markers) * ITEM_STRIDE - ITEM_SPACING))
+        self._update_empty_label()
+        self._update_visible_items()
+
+    def _update_empty_label(self):
+        self.empty_label.setVisible(not self.markers)
+        if not self.markers:
+            self.empty_label.move((self.width() - self.empty_label.width()) // 2,
+                                  (self.height() - self.empty_label.height()) // 2)
+            self.empty_label.raise_()
+
+    def _create_item(self, marker):
+        item = MarkerItem(marker, self.content_widget)
+        item.clicked.connect(self.seek_requested)
+        item.edit_requested.connect(self.edit_requested)
+        item.delete_requested.connect(self.delete_requested)
+        if marker['id'] in self.pixmaps:
+            item.set_pixmap(self.pixmaps[marker['id']])
+        item.show()
+        self.items[marker['id']] = item
+        return item
+
+    def _update_visible_items(self, *_):
+        """Realize items around the viewport, drop the rest, ask for missing thumbnails."""
+        if not self.markers:
+            return
+
+        left = self.scroll.horizontalScrollBar().value()
+        right = left + self.scroll.viewport().width()
+        first = max(0, left // ITEM_STRIDE - OVERSCAN_ITEMS)
+        last = min(len(self.markers) - 1, right // ITEM_STRIDE + OVERSCAN_ITEMS)
+
+        visible_ids = set()
+        missing = []
+        for index in range(first, last + 1):
+            marker = self.markers[index]
+            marker_id = marker['id']
+            visible_ids.add(marker_id)
+
+            item = self.items.get(marker_id) or self._create_item(marker)
+            item.move(index * ITEM_STRIDE, 0)
+
+            if marker_id not in self.pixmaps and marker_id not in self._requested:
+                missing.append(marker)
+
+        for marker_id in [mid for mid in self.items if mid not in visible_ids]:
+            self.items.pop(marker_id).deleteLater()
+
+        # Screenshots cost an ffmpeg run each: only for what the user can see
+        if missing and self.isVisible():
+            self._requested.update(m['id'] for m in missing)
+            self.thumbnails_requested.emit(missing)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self._update_visible_items()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._update_empty_label()
+        self._update_visible_items()
+
+    def thumbnail_failed(self, marker_id):
+        """The screenshot was not made: ask again the next time the marker is shown."""
+        self._requested.discard(marker_id)
 
     def update_thumbnail(self, marker_id, pixmap):
         """Update thumbnail for a specific marker."""
@@ -198,3 +292,5 @@ class MarkerGalleryWidget(QFrame):
         elif f"ts_{marker_id}" in self.items:
              self.items[f"ts_{marker_id}"].set_pixmap(pixmap)
 
+        if any(m['id'] == marker_id for m in self.markers):
+            self.pixmaps[marker_id] = pixmap
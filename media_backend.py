@@ -0,0 +1,261 @@
+"""
+Media backends used by VideoScanner for probing files and grabbing frames.
+
+FFmpegBackend runs the ffprobe/ffmpeg binaries. FakeMediaBackend answers in
+process with ffprobe-shaped data and placeholder frame files after a configurable
+delay, so the scanning pipeline, caching and DB writes can be measured and
+tested without real media or binaries.
+
+A backend provides:
+    can_probe / can_extract              capabilities (binaries found, ...)
+    probe(path, select_streams, timeout) ffprobe -show_format -show_streams JSON as a dict, or None
+    keyframes(path, timeout)             keyframe times (seconds) of the first video stream
+    extract_frame(video_path, time_sec, out_path, width, height, quality, timeout, seek_mode)
+                                         write one JPEG frame to out_path
+                                         seek_mode 'accurate': the frame at time_sec
+                                         seek_mode 'keyframe': the keyframe before it
+                                         (keyframes only are decoded: tolerant of slow
+                                         media and long GOPs)
+"""
+import json
+import time
+import bisect
+import threading
+import subprocess
+from pathlib import Path
+
+
+def get_subprocess_startupinfo():
+    """Get startupinfo to hide console windows on Windows."""
+    startupinfo = None
+    if hasattr(subprocess, 'STARTUPINFO'):
+        startupinfo = subprocess.STARTUPINFO()
+        startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+        startupinfo.wShowWindow = subprocess.SW_HIDE
+    return startupinfo
+
+
+def nearest_keyframes(targets, keyframes):
+    """
+    For each target time, the nearest keyframe time. A keyframe is used once
+    while a neighbouring unused one exists, so long GOPs don't give duplicate
+    thumbnails. Without keyframes the targets are returned unchanged.
+    """
+    keyframes = sorted(set(keyframes))
+    if not keyframes:
+        return list(targets)
+    used = set()
+    chosen = []
+    for target in targets:
+        i = bisect.bisect_left(keyframes, target)
+        candidates = sorted(range(max(0, i - 2), min(len(keyframes), i + 2)),
+                            key=lambda j: abs(keyframes[j] - target))
+        pick = next((j for j in candidates if j not in used), candidates[0])
+        used.add(pick)
+        chosen.append(keyframes[pick])
+    return chosen
+
+
+class FFmpegBackend:
+    """Probes with ffprobe and extracts frames with ffmpeg."""
+
+    def __init__(self, ffmpeg_path, ffprobe_path):
+        self.ffmpeg_path = Path(ffmpeg_path)
+        self.ffprobe_path = Path(ffprobe_path)
+        self.can_probe = self.ffprobe_path.exists()
+        self.can_extract = self.ffmpeg_path.exists()
+
+    def probe(self, path, select_streams=None, timeout=10):
+        cmd = [
+            str(self.ffprobe_path),
+            '-v', 'quiet',
+            '-print_format', 'json',
+            '-show_format',
+            '-show_streams',
+        ]
+        if select_streams:
+            cmd += ['-select_streams', select_streams]
+        cmd.append(str(path))
+
+        result = subprocess.run(
+            cmd,
+            capture_output=True,
+            encoding='utf-8',
+            errors='ignore',
+            timeout=timeout,
+            startupinfo=get_subprocess_startupinfo()
+        )
+        if result.returncode == 0 and result.stdout:
+            return json.loads(result.stdout)
+        return None
+
+    def keyframes(self, path, timeout=30):
+        # Packet flags only: the file is demuxed, nothing is decoded
+        cmd = [
+            str(self.ffprobe_path),
+            '-v', 'quiet',
+            '-select_streams', 'v:0',
+            '-show_entries', 'packet=pts_time,flags',
+            '-of', 'csv=p=0',
+            str(path),
+        ]
+        result = subprocess.run(
+            cmd,
+            capture_output=True,
+            encoding='utf-8',
+            errors='ignore',
+            timeout=timeout,
+            startupinfo=get_subprocess_startupinfo()
+        )
+        times = []
+        for line in result.stdout.splitlines():
+            pts, _, flags = line.partition(',')
+            if 'K' in flags:
+                try:
+                    times.append(float(pts))
+                except ValueError:
+                    pass
+        return times
+
+    def extract_frame(self, video_path, time_sec, out_path, width, height, quality, timeout,
+                      seek_mode='accurate'):
+        # -ss BEFORE -i = fast seek without decoding
+        # -frames:v 1 = only 1 frame, -q:v = JPEG quality (2-31), -an = no audio
+        cmd = [str(self.ffmpeg_path)]
+        if seek_mode == 'keyframe':
+            # Stop at the keyframe before time_sec and decode keyframes only
+            cmd += ['-noaccurate_seek', '-skip_frame', 'nokey']
+        cmd += [
+            '-ss', f'{time_sec:.3f}',
+            '-i', str(video_path),
+            '-vf', f'scale={width}:{height}:force_original_aspect_ratio=decrease,'
+                   f'pad={width}:{height}:(ow-iw)/2:(oh-ih)/2:color=black',
+            '-frames:v', '1',
+            '-q:v', str(quality),
+            '-an',
+            '-y',
+            str(out_path)
+        ]
+        subprocess.run(
+            cmd,
+            capture_output=True,
+            timeout=timeout,
+            startupinfo=get_subprocess_startupinfo()
+        )
+
+
+# Frame file written by the fake backend: JPEG start/end markers only, not decodable
+PLACEHOLDER_FRAME = b'\xff\xd8fake frame\xff\xd9'
+
+
+class FakeMediaBackend:
+    """
+    In-process stand-in for ffprobe/ffmpeg.
+
+    probe_latency / frame_latency: seconds slept per call (to model process cost)
+    duration, resolution, codec: what every video reports
+    audio_streams / subtitle_streams: embedded tracks per video
+    fail: file names (or substrings of them) whose probe fails
+    slow_frames: files whose frames fail with accurate seeking (time out), but
+                 not with seek_mode='keyframe'
+    broken_frames: files whose frames always fail
+    keyframe_interval: seconds between keyframes (GOP length)
+    decode_latency: extra seconds per second of video decoded from the keyframe
+                    before the target (accurate seeking only)
+    Calls are counted in `calls` ('probe', 'frame', 'keyframes').
+    """
+
+    def __init__(self, probe_latency=0.0, frame_latency=0.0, duration=60.0,
+                 resolution=(1280, 720), codec='h264', audio_streams=1,
+                 subtitle_streams=0, fail=(), slow_frames=(), broken_frames=(),
+                 keyframe_interval=2.0, decode_latency=0.0):
+        self.can_probe = True
+        self.can_extract = True
+        self.probe_latency = probe_latency
+        self.frame_latency = frame_latency
+        self.duration = duration
+        self.resolution = resolution
+        self.codec = codec
+        self.audio_streams = audio_streams
+        self.subtitle_streams = subtitle_streams
+        self.fail = tuple(fail)
+        self.slow_frames = tuple(slow_frames)
+        self.broken_frames = tuple(broken_frames)
+        self.keyframe_interval = keyframe_interval
+        self.decode_latency = decode_latency
+        self.calls = {'probe': 0, 'frame': 0, 'keyframes': 0}
+        self._lock = threading.Lock()
+
+    def _count(self, kind):
+        with self._lock:
+            self.calls[kind] += 1
+
+    def probe(self, path, select_streams=None, timeout=10):
+        self._count('probe')
+        if self.probe_latency:
+            time.sleep(self.probe_latency)
+
+        path = Path(path)
+        if any(pattern in path.name for pattern in self.fail):
+            return None
+
+        duration = f'{self.duration:.6f}'
+        audio = [
+            {
+                'index': 0, 'codec_type': 'audio', 'codec_name': 'aac',
+                'sample_rate': '48000', 'channels': 2, 'channel_layout': 'stereo',
+                'bit_rate': '128000', 'duration': duration,
+                'disposition': {'default': 1 if i == 0 else 0},
+                'tags': {'language': 'rus' if i == 0 else 'eng'},
+            }
+            for i in range(self.audio_streams)
+        ]
+
+        if select_streams and select_streams.startswith('a'):
+            # External audio file
+            return {
+                'format': {'duration': duration, 'bit_rate': '128000', 'tags': {}},
+                'streams': audio[:1] or [{'index': 0, 'codec_type': 'audio', 'codec_name': 'aac'}],
+            }
+
+        width, height = self.resolution
+        streams = [{
+            'index': 0, 'codec_type': 'video', 'codec_name': self.codec,
+            'width': width, 'height': height, 'duration': duration,
+        }]
+        for track in audio:
+            streams.append(dict(track, index=len(streams)))
+        for i in range(self.subtitle_streams):
+            streams.append({
+                'index': len(streams), 'codec_type': 'subtitle', 'codec_name': 'subrip',
+                'codec_long_name': 'SubRip subtitle',
+                'disposition': {'default': 0, 'forced': 0},
+                'tags': {'language': 'eng', 'title': f'Subtitles {i + 1}'},
+            })
+
+        try:
+            size = str(path.stat().st_size)
+        except OSError:
+            size = '0'
+        return {'format': {'duration': duration, 'size': size}, 'streams': streams}
+
+    def keyframes(self, path, timeout=30):
+        self._count('keyframes')
+        count = int(self.duration // self.keyframe_interval) + 1
+        return [round(i * self.keyframe_interval, 3) for i in range(count)]
+
+    def extract_frame(self, video_path, time_sec, out_path, width, height, quality, timeout,
+                      seek_mode='accurate'):
+        self._count('frame')
+        latency = self.frame_latency
+        if seek_mode != 'keyframe' and self.decode_latency:
+            # Decoding from the previous keyframe up to the target
+            latency += (time_sec % self.keyframe_interval) * self.decode_latency
+        if latency:
+            time.sleep(latency)
+        name = Path(video_path).name
+        if any(pattern in name for pattern in self.broken_frames):
+            return
+        if seek_mode != 'keyframe' and any(pattern in name for pattern in self.slow_frames):
+            raise subprocess.TimeoutExpired('ffmpeg', timeout)
+        Path(out_path).write_bytes(PLACEHOLDER_FRAME)
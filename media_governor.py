@@ -0,0 +1,239 @@
+"""
+Process-wide cap on concurrent ffmpeg/ffprobe processes.
+
+The scanner (video threads x thumbnail threads), the seek preview popup and
+marker thumbnails all start media subprocesses. Each start goes through the
+MediaGovernor singleton (get_governor()), which limits:
+
+    - the total number of media processes (default: CPU count, at least 2)
+    - processes reading from one device (default: 2 on rotational disks
+      where that can be detected, otherwise the total)
+
+and hands out free slots by priority class: interactive preview, then
+marker thumbnails, then scanning. Scanning never takes the last slot, so a
+preview does not wait behind a scan. Wait times are kept per class.
+
+Worker threads block:
+
+    with get_governor().slot(PRIORITY_SCAN, video_path):
+        subprocess.run(...)
+
+The Qt UI thread must not block; it polls with try_acquire() and calls
+release() when its QProcess finishes.
+"""
+import os
+import time
+import threading
+import itertools
+from contextlib import contextmanager
+from pathlib import Path
+
+from scan_metrics import Histogram
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_MARKERS = 1
+PRIORITY_SCAN = 2
+
+PRIORITY_NAMES = {
+    PRIORITY_INTERACTIVE: 'interactive',
+    PRIORITY_MARKERS: 'markers',
+    PRIORITY_SCAN: 'scan',
+}
+
+# Concurrent reads on one spinning disk before seeks dominate
+ROTATIONAL_DEVICE_LIMIT = 2
+
+
+def device_of(path):
+    """
+    Key of the device holding path: st_dev of the path or of its nearest
+    existing parent (always an int, so one disk has one key), None if unknown.
+    """
+    try:
+        current = Path(path).absolute()
+    except (TypeError, ValueError):
+        return None
+    for candidate in (current, *current.parents):
+        try:
+            return os.stat(candidate).st_dev
+        except (OSError, ValueError):
+            continue
+    return None
+
+
+def is_rotational(device):
+    """True/False for a spinning/solid-state disk, None if unknown (non-Linux, network, ...)."""
+    if not isinstance(device, int):
+        return None
+    block = Path(f"/sys/dev/block/{os.major(device)}:{os.minor(device)}")
+    for candidate in (block / 'queue' / 'rotational', block / '..' / 'queue' / 'rotational'):
+        try:
+            return candidate.read_text().strip() == '1'
+        except OSError:
+            continue
+    return None
+
+
+class Slot:
+    """A granted media process slot; release() is idempotent."""
+
+    __slots__ = ('governor', 'priority', 'device', 'waited', 'released')
+
+    def __init__(self, governor, priority, device, waited):
+        self.governor = governor
+        self.priority = priority
+        self.device = device
+        self.waited = waited
+        self.released = False
+
+    def release(self):
+        self.governor.release(self)
+
+
+class MediaGovernor:
+    """Priority semaphore for media subprocesses with a per-device limit."""
+
+    def __init__(self, max_processes=0, per_device=0):
+        self._cond = threading.Condition()
+        self._waiters = []   # queued requests: (priority, seq, device)
+        self._seq = itertools.count()
+        self._active = 0
+        self._device_active = {}
+        self._device_limits = {}
+        self._waits = {}     # {priority: Histogram}
+        self.configure(max_processes, per_device)
+
+    def configure(self, max_processes=0, per_device=0):
+        """0 = automatic: CPU count (min 2) in total; per device 2 on HDDs, else the total."""
+        with self._cond:
+            self.max_processes = max_processes if max_processes > 0 else max(2, os.cpu_count() or 2)
+            self.per_device = per_device
+            self._device_limits.clear()
+            self._cond.notify_all()
+
+    # --- limits -------------------------------------------------------------
+
+    def _class_limit(self, priority):
+        """Scanning leaves one slot free for interactive and marker requests."""
+        if priority >= PRIORITY_SCAN and self.max_processes > 1:
+            return self.max_processes - 1
+        return self.max_processes
+
+    def device_limit(self, device):
+        limit = self._device_limits.get(device)
+        if limit is None:
+            if self.per_device > 0:
+                limit = self.per_device
+            elif is_rotational(device):
+                limit = ROTATIONAL_DEVICE_LIMIT
+            else:
+                limit = self.max_processes
+            self._device_limits[device] = limit
+        return limit
+
+    def _can_start(self, priority, device, order):
+        """Caller holds the lock. order: (priority, seq) of the request in the queue."""
+        if self._active >= self._class_limit(priority):
+            return False
+        if device is not None and self._device_active.get(device, 0) >= self.device_limit(device):
+            return False
+        # A more urgent waiter (or an older one of the same class) that could run goes first
+        for waiting_priority, waiting_seq, waiting_device in self._waiters:
+            if (waiting_priority, waiting_seq) > order:
+                continue
+            if self._active < self._class_limit(waiting_priority) and (
+                    waiting_device is None or waiting_device == device or
+                    self._device_active.get(waiting_device, 0) < self.device_limit(waiting_device)):
+                return False
+        return True
+
+    def _grant(self, priority, device, waited):
+        self._active += 1
+        if device is not None:
+            self._device_active[device] = self._device_active.get(device, 0) + 1
+        hist = self._waits.get(priority)
+        if hist is None:
+            hist = self._waits[priority] = Histogram()
+        hist.observe(waited)
+        return Slot(self, priority, device, waited)
+
+    # --- acquire / release --------------------------------------------------
+
+    def acquire(self, priority, path=None, timeout=None):
+        """Block until a slot is free; returns a Slot, or None on timeout."""
+        device = device_of(path) if path is not None else None
+        start = time.perf_counter()
+        with self._cond:
+            entry = (priority, next(self._seq), device)
+            self._waiters.append(entry)
+            try:
+                while True:
+                    self._waiters.remove(entry)
+                    if self._can_start(priority, device, entry[:2]):
+                        return self._grant(priority, device, time.perf_counter() - start)
+                    self._waiters.append(entry)
+
+                    remaining = None
+                    if timeout is not None:
+                        remaining = timeout - (time.perf_counter() - start)
+                        if remaining <= 0:
+                            self._waiters.remove(entry)
+                            return None
+                    self._cond.wait(remaining)
+            except BaseException:
+                if entry in self._waiters:
+                    self._waiters.remove(entry)
+                raise
+
+    def try_acquire(self, priority, path=None):
+        """Slot if one is free right now, else None (for the UI thread)."""
+        device = device_of(path) if path is not None else None
+        with self._cond:
+            if self._can_start(priority, device, (priority, float('inf'))):
+                return self._grant(priority, device, 0.0)
+            return None
+
+    def release(self, slot):
+        with self._cond:
+            if slot is None or slot.released:
+                return
+            slot.released = True
+            self._active -= 1
+            if slot.device is not None:
+                self._device_active[slot.device] -= 1
+                if not self._device_active[slot.device]:
+                    del self._device_active[slot.device]
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self, priority, path=None):
+        granted = self.acquire(priority, path)
+        try:
+            yield granted
+        finally:
+            self.release(granted)
+
+    # --- reporting ----------------------------------------------------------
+
+    def snapshot(self):
+        with self._cond:
+            return {
+                'max_processes': self.max_processes,
+                'active': self._active,
+                'waiting': len(self._waiters),
+                'waits': {PRIORITY_NAMES.get(p, str(p)): hist.to_dict()
+                          for p, hist in sorted(self._waits.items())},
+            }
+
+
+_governor = None
+_governor_lock = threading.Lock()
+
+
+def get_governor():
+    """The process-wide MediaGovernor."""
+    global _governor
+    with _governor_lock:
+        if _governor is None:
+            _governor = MediaGovernor()
+        return _governor
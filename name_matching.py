@@ -0,0 +1,109 @@
+"""
+Matching of external audio/subtitle files to videos by file name.
+
+Pure functions of file names, so they can run in worker processes
+(VideoScanner with [Performance] executor = process): score_folder takes and
+returns plain lists/dicts of strings and ints, which pickle cheaply.
+"""
+import re
+from pathlib import Path
+
+_SEPARATORS_RE = re.compile(r'[_\-\.\[\]\(\)\{\}]')
+_SPACES_RE = re.compile(r'\s+')
+
+EPISODE_PATTERNS = [
+    re.compile(p, re.IGNORECASE) for p in (
+        r'(?:episode|ep|e|урок|lesson|part|часть|глава|chapter|ch)[\s\.\-_]*(\d+)',
+        r'^(\d+)[\s\.\-_]',
+        r'[\s\.\-_](\d+)[\s\.\-_]',
+        r'[\s\.\-_](\d+)$',
+        r's\d+e(\d+)',
+    )
+]
+
+LANGUAGE_TAG_PATTERNS = [
+    re.compile(p, re.IGNORECASE) for p in (
+        r'[\[\(]?(rus|russian|ru|рус|русский)[\]\)]?',
+        r'[\[\(]?(eng|english|en|англ|английский)[\]\)]?',
+        r'[\[\(]?(ukr|ukrainian|ua|укр|украинский)[\]\)]?',
+    )
+]
+
+
+def normalize_name(name):
+    """Normalize filename for comparison."""
+    name = Path(name).stem.lower()
+    name = _SEPARATORS_RE.sub(' ', name)
+    return _SPACES_RE.sub(' ', name).strip()
+
+
+def extract_episode_number(name):
+    """Extract episode/lesson number from filename."""
+    name = Path(name).stem
+    for pattern in EPISODE_PATTERNS:
+        match = pattern.search(name)
+        if match:
+            return int(match.group(1))
+    return None
+
+
+def has_language_tag(name):
+    return any(pattern.search(name) for pattern in LANGUAGE_TAG_PATTERNS)
+
+
+def _name_key(name):
+    return normalize_name(name), extract_episode_number(name)
+
+
+def _score(video_key, other_key, other_tagged):
+    video_norm, video_ep = video_key
+    other_norm, other_ep = other_key
+    score = 0
+
+    # Exact name match
+    if video_norm == other_norm:
+        score += 100
+    else:
+        # One name contains the other
+        if video_norm in other_norm or other_norm in video_norm:
+            score += 50
+
+        # Common prefix
+        min_len = min(len(video_norm), len(other_norm))
+        if min_len > 0:
+            common_prefix = 0
+            for i in range(min_len):
+                if video_norm[i] == other_norm[i]:
+                    common_prefix += 1
+                else:
+                    break
+            score += int(common_prefix / min_len * 30)
+
+    # Episode number match
+    if video_ep is not None and other_ep is not None and video_ep == other_ep:
+        score += 40
+
+    # Language tags
+    if other_tagged:
+        score += 5
+
+    return score
+
+
+def calculate_match_score(video_name, other_name):
+    """Match score of an external audio/subtitle file to a video."""
+    return _score(_name_key(video_name), _name_key(other_name), has_language_tag(other_name))
+
+
+def score_folder(video_names, other_names):
+    """
+    Scores of every (video, external file) pair of a folder:
+    {(video_name, other_name): score}. Each name is normalized once.
+    """
+    others = [(name, _name_key(name), has_language_tag(name)) for name in other_names]
+    scores = {}
+    for video_name in video_names:
+        video_key = _name_key(video_name)
+        for other_name, other_key, other_tagged in others:
+            scores[(video_name, other_name)] = _score(video_key, other_key, other_tagged)
+    return scores
@@ -0,0 +1,128 @@
+"""
+mpv cache and demuxer profiles for local and network libraries.
+
+Each profile maps to per-file loadfile options. Values come from built-in
+defaults and can be overridden in the [Playback] section of settings.ini
+as <profile>_<option>, e.g. network_demuxer_max_bytes = 1GiB.
+"""
+import os
+import sys
+from functools import lru_cache
+from pathlib import Path
+
+# mpv options a profile may set (as written in settings.ini)
+PROFILE_OPTIONS = (
+    'cache',
+    'demuxer_max_bytes',
+    'demuxer_readahead_secs',
+    'demuxer_max_back_bytes',
+    'vd_lavc_threads',
+    'ad_lavc_threads',
+)
+
+DEFAULT_PROFILES = {
+    'local': {
+        'cache': 'auto',
+        'demuxer_max_bytes': '150MiB',
+        'demuxer_readahead_secs': '5',
+        'demuxer_max_back_bytes': '50MiB',
+        'vd_lavc_threads': '0',
+        'ad_lavc_threads': '2',
+    },
+    'network': {
+        # Read far ahead and keep a back buffer so seeks on SMB/NFS hit the cache
+        'cache': 'yes',
+        'demuxer_max_bytes': '512MiB',
+        'demuxer_readahead_secs': '60',
+        'demuxer_max_back_bytes': '256MiB',
+        'vd_lavc_threads': '0',
+        'ad_lavc_threads': '2',
+    },
+}
+
+# Linux filesystem types that live on another machine
+REMOTE_FILESYSTEMS = {
+    'nfs', 'nfs4', 'cifs', 'smbfs', 'smb3', 'sshfs', 'fuse.sshfs',
+    'afs', '9p', 'ceph', 'glusterfs', 'fuse.glusterfs', 'davfs', 'fuse.rclone',
+}
+
+DRIVE_REMOTE = 4  # GetDriveTypeW result for mapped network drives
+
+
+@lru_cache(maxsize=64)
+def _is_remote_anchor(anchor):
+    """Check one drive/UNC anchor (Windows) or mount point (Linux)."""
+    if sys.platform == 'win32':
+        if anchor.startswith(('\\\\', '//')):
+            return True
+        try:
+            import ctypes
+            return ctypes.windll.kernel32.GetDriveTypeW(anchor) == DRIVE_REMOTE
+        except Exception:
+            return False
+
+    try:
+        with open('/proc/mounts', 'r', encoding='utf-8') as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 3 and parts[1] == anchor:
+                    return parts[2] in REMOTE_FILESYSTEMS
+    except OSError:
+        pass
+    return False
+
+
+def _mount_point(path):
+    """Closest existing mount point above path."""
+    path = Path(os.path.abspath(path))
+    for candidate in (path, *path.parents):
+        try:
+            if os.path.ismount(candidate):
+                return str(candidate)
+        except OSError:
+            continue
+    return path.anchor or '/'
+
+
+def is_remote_path(path):
+    """True if path is on a network share (UNC, mapped drive, NFS/SMB mount)."""
+    path = str(path)
+    if path.startswith(('\\\\', '//')):
+        return True
+    if sys.platform == 'win32':
+        anchor = Path(path).anchor
+        return bool(anchor) and _is_remote_anchor(anchor)
+    return _is_remote_anchor(_mount_point(path))
+
+
+class PlaybackProfiles:
+    """Chooses the local or network profile for a file and builds its mpv options."""
+
+    def __init__(self, config=None):
+        # auto = pick by file location, or force 'local' / 'network'
+        self.mode = 'auto'
+        self.profiles = {name: dict(options) for name, options in DEFAULT_PROFILES.items()}
+
+        if config is not None and config.has_section('Playback'):
+            self.mode = config.get('Playback', 'profile', fallback='auto').strip().lower()
+            for name, options in self.profiles.items():
+                for option in PROFILE_OPTIONS:
+                    value = config.get('Playback', f'{name}_{option}', fallback='').strip()
+                    if value:
+                        options[option] = value
+
+        if self.mode not in ('auto', *self.profiles):
+            print(f"Unknown playback profile '{self.mode}', using auto")
+            self.mode = 'auto'
+
+    def profile_for(self, file_path):
+        """Profile name for a file."""
+        if self.mode != 'auto':
+            return self.mode
+        return 'network' if is_remote_path(file_path) else 'local'
+
+    def options_for(self, file_path):
+        """(profile name, loadfile options) for a file."""
+        name = self.profile_for(file_path)
+        options = {option.replace('_', '-'): value for option, value in self.profiles[name].items()}
+        return name, options
@@ -1,22 +1,50 @@
 
 import sys
+import time
 from pathlib import Path
 from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QSlider, QSizePolicy, QStylePainter, QStyleOptionSlider, QStyle, QToolTip, QMenu
-from PyQt6.QtCore import Qt, QTimer, pyqtSignal, QPoint, QRect
-from PyQt6.QtGui import QIcon, QColor, QPalette, QPainter, QPen, QBrush
+from PyQt6.QtCore import Qt, QTimer, QThread, pyqtSignal, QPoint, QRect
+from PyQt6.QtGui import QIcon, QColor, QPalette, QPainter, QPen, QBrush, QPixmap
 
 from mpv_handler import setup_mpv_dll, MPVVideoWidget
 from translator import tr
 from subtitle_popup import SubtitleButton
 from volume_popup import VolumeButton
 from preview_popup import PreviewPopup
-from marker_dialog import MarkerDialog
 from marker_gallery import MarkerGalleryWidget
 from thumbnail_provider import ThumbnailProvider
 
 ROOT_DIR = Path(__file__).parent
 RESOURCES_DIR = ROOT_DIR / "resources"
 
+
+def _mpv_quote(value):
+    """Quote an option value for mpv's key=value list (%bytelen%value form)."""
+    value = str(value)
+    return f"%{len(value.encode('utf-8'))}%{value}"
+
+
+def _same_file(a, b):
+    """Compare paths as mpv reports them with paths stored in the DB."""
+    return Path(a).resolve() == Path(b).resolve()
+
+
+def _end_file_error(event):
+    """Error text of an mpv end-file event that ended in an error, else None.
+    python-mpv 1.x passes an MpvEvent object, older versions a dict."""
+    data = getattr(event, 'data', None)
+    if data is not None:
+        reason, error = getattr(data, 'reason', None), getattr(data, 'error', None)
+    elif isinstance(event, dict):
+        info = event.get('event') or {}
+        reason, error = info.get('reason'), info.get('error')
+    else:
+        return None
+    # MPV_END_FILE_REASON_ERROR
+    if reason not in (4, 'error'):
+        return None
+    return str(error) if error else 'error'
+
 class ClickableSlider(QSlider):
     """Slider that jumps to click position."""
     hovered = pyqtSignal(int, QPoint)
@@ -30,50 +58,78 @@ class ClickableSlider(QSlider):
         self.setMouseTracking(True)
         self.markers = []
         self.duration = 0
+        # Marker ticks pre-rendered once; rebuilt when markers, duration or size change
+        self._marker_layer = None
+        self._marker_layer_key = None
 
     def set_markers(self, markers, duration):
         """Update markers and duration for drawing."""
         self.markers = markers
         self.duration = duration
+        self._marker_layer = None
         self.update()
 
+    def resizeEvent(self, event):
+        self._marker_layer = None
+        super().resizeEvent(event)
+
+    def _build_marker_layer(self):
+        """Render all marker ticks into a transparent pixmap the size of the slider."""
+        w = self.width()
+        h = self.height()
+        dpr = self.devicePixelRatioF()
+
+        layer = QPixmap(max(1, int(w * dpr)), max(1, int(h * dpr)))
+        layer.setDevicePixelRatio(dpr)
+        layer.fill(Qt.GlobalColor.transparent)
+
+        painter = QPainter(layer)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+
+        tick_h = 8
+        y = (h - tick_h) // 2
+        pens = {}
+        drawn = set()
+        for marker in self.markers:
+            pos_sec = marker.get('position_seconds', 0)
+            if pos_sec > self.duration:
+                continue
+
+            x = int(pos_sec / self.duration * w)
+            m_color = marker.get('color', '#FFD700')
+            # Markers closer than a pixel produce the same tick
+            if (x, m_color) in drawn:
+                continue
+            drawn.add((x, m_color))
+
+            pen = pens.get(m_color)
+            if pen is None:
+                pen = pens[m_color] = QPen(QColor(m_color), 2)
+            painter.setPen(pen)
+            painter.drawLine(x, y, x, y + tick_h)
+
+        painter.end()
+        return layer
+
     def paintEvent(self, event):
-        """Custom paint to draw marker ticks."""
+        """Custom paint: slider plus the cached marker layer (one blit)."""
         try:
-            # print("DEBUG: ClickableSlider paintEvent start") # DEBUG
             super().paintEvent(event)
             
             # Ensure duration is a valid number
             duration = self.duration if self.duration is not None else 0
             
             if not self.markers or duration <= 0:
-                # print("DEBUG: No markers or zero duration") # DEBUG
                 return
 
+            key = (self.width(), self.height(), self.devicePixelRatioF())
+            if self._marker_layer is None or self._marker_layer_key != key:
+                self._marker_layer = self._build_marker_layer()
+                self._marker_layer_key = key
+
             painter = QPainter(self)
-            painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-            
-            w = self.width()
-            h = self.height()
-            
-            # Draw markers
-            for marker in self.markers:
-                pos_sec = marker.get('position_seconds', 0)
-                m_color = marker.get('color', '#FFD700')
-                if pos_sec > self.duration: continue
-                
-                # Ratio 0..1
-                ratio = pos_sec / self.duration
-                x = int(ratio * w)
-                
-                # Draw tick mark with marker color
-                painter.setPen(QPen(QColor(m_color), 2))
-                tick_h = 8
-                y = (h - tick_h) // 2
-                painter.drawLine(x, y, x, y + tick_h)
-            
+            painter.drawPixmap(0, 0, self._marker_layer)
             painter.end()
-            # print("DEBUG: ClickableSlider paintEvent end") # DEBUG
         except Exception as e:
             print(f"❌ ERROR in ClickableSlider.paintEvent: {e}")
             import traceback
@@ -144,6 +200,59 @@ class ClickableSlider(QSlider):
             traceback.print_exc()
 
 
+def _empty_session(file_path):
+    """Session for a file that is not in the DB (same shape as get_video_session)."""
+    return {
+        'file_path': str(file_path),
+        'last_position': 0,
+        'volume': 100,
+        'audio': ([], None),
+        'subtitles': ([], None, 0),
+        'markers': [],
+    }
+
+
+def _default_audio_id(session):
+    """First audio track of a session without a valid saved choice, else None."""
+    audio_tracks, selected_audio_id = session['audio']
+    if not audio_tracks or any(t['id'] == selected_audio_id for t in audio_tracks):
+        return None
+    return audio_tracks[0]['id']
+
+
+class VideoSessionLoader(QThread):
+    """
+    Loads a video's tracks, markers and progress from the DB off the GUI thread.
+    save_default_audio: without a saved audio track the first one becomes the
+    saved choice (for a file being opened, not for a preloaded one).
+    """
+    loaded = pyqtSignal(int, object)  # request_id, session dict
+
+    def __init__(self, db, file_path, request_id, save_default_audio=False):
+        super().__init__()
+        self.db = db
+        self.file_path = file_path
+        self.request_id = request_id
+        self.save_default_audio = save_default_audio
+
+    def run(self):
+        try:
+            session = self.db.get_video_session(self.file_path)
+        except Exception as e:
+            print(f"Error loading video session: {e}")
+            session = _empty_session(self.file_path)
+
+        audio_id = _default_audio_id(session) if self.save_default_audio else None
+        if audio_id is not None:
+            print("⏩ No saved audio track - selecting first available")
+            try:
+                self.db.save_selected_audio(self.file_path, audio_id)
+                session['audio'] = (session['audio'][0], audio_id)
+            except Exception as e:
+                print(f"Error saving audio track: {e}")
+        self.loaded.emit(self.request_id, session)
+
+
 class VideoPlayerWidget(QWidget):
     """MPV-based player with audio track support."""
     video_finished = pyqtSignal()
@@ -156,8 +265,12 @@ class VideoPlayerWidget(QWidget):
     prev_video_requested = pyqtSignal()
     markers_changed = pyqtSignal(str) # file_path
     toggle_fullscreen_requested = pyqtSignal()
+    preload_requested = pyqtSignal(str) # current file_path, near its end
+    load_failed = pyqtSignal(str, str) # file_path, mpv error
+    # mpv callbacks run on mpv's event thread; this hands them to the UI thread
+    _mpv_event = pyqtSignal(str, object)
 
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, init_mpv=True):
         super().__init__(parent)
         print("DEBUG: VideoPlayerWidget init start") # DEBUG
         self.db = None
@@ -168,7 +281,25 @@ class VideoPlayerWidget(QWidget):
         self.is_seeking_slider = False
         self.taskbar_progress = None
         self.is_loading = False
-        self.auto_play_pending = False
+        # Load sequence: idle -> loading -> loaded (file-loaded) -> playing (playback-restart)
+        self.load_state = 'idle'
+        # External tracks passed via loadfile options, selected once mpv lists them
+        self._pending_audio_file = None
+        self._pending_subtitle_file = None
+        # Next lesson appended to mpv's playlist ahead of time (see preload_next)
+        self.preload_seconds = 0
+        self._preloaded = None
+        self._pending_preload = None
+        self._preload_requested_for = None
+        # DB session fetches (see VideoSessionLoader); stale results are ignored by request id
+        self._session_request_seq = 0
+        self._pending_load = None
+        self._session_loaders = set()
+        # Cache/demuxer profile per file (see playback_profiles.py)
+        self.playback_profiles = None
+        self.current_profile = None
+        self._seek_started = None
+        self.last_seek_latency_ms = None
         self.player = None
         self.sub_color = "#FFFFFF"
         self.sub_border_color = "#000000"
@@ -176,14 +307,33 @@ class VideoPlayerWidget(QWidget):
         self.sub_scale = 1.0
         self.markers = [] 
         
+        # time-pos bridge: mpv's thread stores the latest value, a UI timer publishes it
+        self._pending_position_ms = None
+        self._published_position_ms = None
+        self._published_second = None
+        self._published_total = None
+        self._published_slider_px = None
+        self.position_timer = QTimer(self)
+        self.position_timer.timeout.connect(self._publish_position)
+        self.set_position_update_rate(8)
+        self._mpv_event.connect(self._on_mpv_event)
+
+        # Playback statistics overlay (cache fill, seek latency)
+        self.stats_timer = QTimer(self)
+        self.stats_timer.setInterval(500)
+        self.stats_timer.timeout.connect(self._update_stats_overlay)
+        
         # Marker Gallery & Thumbnailing
         self.thumb_provider = ThumbnailProvider(self)
         self.thumb_provider.finished.connect(self._on_marker_thumbnail_ready)
+        self.thumb_provider.failed.connect(self._on_marker_thumbnail_failed)
         self.marker_gallery = None # Created in setup_ui
         print("DEBUG: Calling setup_ui") # DEBUG
         self.setup_ui()
-        print("DEBUG: Calling setup_mpv") # DEBUG
-        self.setup_mpv()
+        # init_mpv=False: the owner calls setup_mpv() later (e.g. after the first paint)
+        if init_mpv:
+            print("DEBUG: Calling setup_mpv") # DEBUG
+            self.setup_mpv()
         print("DEBUG: VideoPlayerWidget init done") # DEBUG
 
     def setup_ui(self):
@@ -212,6 +362,7 @@ class VideoPlayerWidget(QWidget):
         self.marker_gallery.seek_requested.connect(self._on_marker_gallery_seek)
         self.marker_gallery.edit_requested.connect(self.edit_marker)
         self.marker_gallery.delete_requested.connect(self.delete_marker)
+        self.marker_gallery.thumbnails_requested.connect(self._request_marker_thumbnails)
 
         layout.addWidget(self.video_container, 1)
 
@@ -453,7 +604,7 @@ class VideoPlayerWidget(QWidget):
                 vo='gpu',
                 hwdec='auto-safe',
                 sid='no', # Disable subtitles by default
-                keep_open=True,
+                keep_open='always',  # Stay on the last frame even with a preloaded next entry
                 idle=True,
                 osc=False,
                 osd_level=0,
@@ -472,33 +623,53 @@ class VideoPlayerWidget(QWidget):
             
             # Apply initial subtitle styles
             self._apply_subtitle_styles()
+            if self.preload_seconds:
+                self.player.prefetch_playlist = 'yes'
 
             @self.player.property_observer('time-pos')
             def time_observer(_name, value):
+                # Runs on mpv's event thread: only store the value (atomic under the GIL)
                 if value is not None:
-                    self.position_updated(int(value * 1000))
+                    self._pending_position_ms = int(value * 1000)
 
             @self.player.property_observer('duration')
-            def duration_observer(_name, value):
-                if value is not None:
-                    self.duration_changed(int(value * 1000))
+            def duration_observer(name, value):
+                self._mpv_event.emit(name, value)
 
             @self.player.property_observer('pause')
-            def pause_observer(_name, value):
-                self.state_changed(value)
+            def pause_observer(name, value):
+                self._mpv_event.emit(name, value)
 
             @self.player.property_observer('eof-reached')
-            def eof_observer(_name, value):
-                if value:
-                    self.video_finished.emit()
-
-            @self.player.property_observer('playback-restart')
-            def playback_restart_observer(_name, value):
-                if value and self.is_loading:
-                    self.is_loading = False
-                    if self.auto_play_pending:
-                        QTimer.singleShot(50, self._ensure_playing)
-                        self.auto_play_pending = False
+            def eof_observer(name, value):
+                self._mpv_event.emit(name, value)
+
+            @self.player.property_observer('track-list')
+            def track_list_observer(name, value):
+                self._mpv_event.emit(name, value)
+
+            @self.player.event_callback('file-loaded')
+            def file_loaded_callback(_event):
+                # The path tells a late event of a replaced loadfile from the current one
+                try:
+                    path = self.player.path
+                except Exception:
+                    path = None
+                self._mpv_event.emit('file-loaded', path)
+
+            @self.player.event_callback('end-file')
+            def end_file_callback(event):
+                error = _end_file_error(event)
+                if error:
+                    self._mpv_event.emit('load-error', error)
+
+            @self.player.event_callback('seek')
+            def seek_callback(_event):
+                self._mpv_event.emit('seek', time.perf_counter())
+
+            @self.player.event_callback('playback-restart')
+            def playback_restart_callback(_event):
+                self._mpv_event.emit('playback-restart', time.perf_counter())
 
             self.video_widget.set_player(self.player)
             print("MPV initialized successfully")
@@ -509,13 +680,82 @@ class VideoPlayerWidget(QWidget):
             # Do not raise here to allow app to start even without libmpv
             self.player = None
 
-    def _ensure_playing(self):
-        """Ensure video plays after loading."""
-        try:
-            if self.player and self.player.pause:
-                self.player.pause = False
-        except Exception as e:
-            print(f"Error ensuring playback: {e}")
+    def set_position_update_rate(self, hz):
+        """Set how often (per second) playback position is published to the UI."""
+        hz = max(1, min(int(hz), 30))
+        self.position_timer.setInterval(1000 // hz)
+
+    def _reset_published_position(self):
+        """Forget published values so the next tick redraws everything."""
+        self._pending_position_ms = None
+        self._published_position_ms = None
+        self._published_second = None
+        self._published_total = None
+        self._published_slider_px = None
+
+    def _publish_position(self):
+        """UI-thread tick: forward the latest time-pos if it changed."""
+        position_ms = self._pending_position_ms
+        if position_ms is None or position_ms == self._published_position_ms:
+            return
+        if self.load_state == 'loading':
+            # mpv may still report the previous file until file-loaded
+            return
+        self._published_position_ms = position_ms
+        self.position_updated(position_ms)
+        self._check_preload(position_ms)
+
+    def _on_mpv_event(self, name, value):
+        """UI-thread handler for mpv property changes and events."""
+        if name == 'duration':
+            if value is not None:
+                self.duration_changed(int(value * 1000))
+        elif name == 'pause':
+            self.state_changed(value)
+        elif name == 'eof-reached':
+            if value:
+                self.video_finished.emit()
+        elif name == 'track-list':
+            self._select_pending_external_tracks()
+        elif name == 'file-loaded':
+            self._on_file_loaded(value)
+        elif name == 'load-error':
+            self._on_load_error(value)
+        elif name == 'seek':
+            if self._seek_started is None:
+                self._seek_started = value
+        elif name == 'playback-restart':
+            self._on_playback_restart(value)
+
+    def _on_file_loaded(self, path):
+        """mpv opened the file: tracks are known, first frame is on its way."""
+        if self.load_state != 'loading':
+            return
+        if not path or not self.current_file or not _same_file(path, self.current_file):
+            # Late event of the file a newer load replaced
+            return
+        self.load_state = 'loaded'
+        self._apply_subtitle_styles()
+        self._select_pending_external_tracks()
+
+    def _on_load_error(self, error):
+        """mpv could not open the file being loaded."""
+        if self.load_state != 'loading':
+            return
+        self.load_state = 'idle'
+        self.is_loading = False
+        self.position_timer.stop()
+        print(f"Error opening video {self.current_file}: {error}")
+        self.load_failed.emit(self.current_file or '', error)
+
+    def _on_playback_restart(self, timestamp):
+        """First frame after load (or after a seek) has been presented."""
+        if self._seek_started is not None:
+            self.last_seek_latency_ms = int((timestamp - self._seek_started) * 1000)
+            self._seek_started = None
+        if self.load_state == 'loaded':
+            self.load_state = 'playing'
+            self.is_loading = False
 
     def set_ffmpeg_path(self, path):
         """Set FFmpeg path for preview generation."""
@@ -524,13 +764,14 @@ class VideoPlayerWidget(QWidget):
         if hasattr(self, 'thumb_provider'):
             self.thumb_provider.ffmpeg_path = path
 
-    def load_video(self, file_path, saved_position=0, volume=100, auto_play=True):
+    def load_video(self, file_path, saved_position=None, volume=None, auto_play=True):
         """
         Load video
         file_path: path to file
-        saved_position: saved position in seconds
-        volume: saved volume in % (default 100)
+        saved_position: start position in seconds (None = saved progress from DB)
+        volume: volume in % (None = saved volume from DB)
         auto_play: automatically start playback
+        DB lookups run on a VideoSessionLoader thread; mpv opens the file when they arrive.
         """
         if not Path(file_path).exists():
             return False
@@ -540,29 +781,89 @@ class VideoPlayerWidget(QWidget):
             if setup_mpv_dll():
                 print("VideoPlayerWidget: Attempting to initialize MPV (DLL found)...")
                 self.setup_mpv()
-            
+
             if not self.player:
                 print("VideoPlayerWidget: Cannot load video, player not initialized")
                 return False
 
-        self.current_file = file_path
-        self.saved_position = saved_position
-        self.saved_position = saved_position
-        self.position_restore_attempted = False
+        # current_file switches in _open_video: until then mpv still plays the
+        # previous file, whose position must not be published for the new one
+        self.position_timer.stop()
+        self.saved_position = saved_position or 0
+        # The start position is passed to loadfile, no separate seek is needed
+        self.position_restore_attempted = True
+        self._reset_published_position()
         self.is_loading = True
-        self.auto_play_pending = auto_play
-        
+        self.load_state = 'loading'
+        self._preload_requested_for = None
+        self._seek_started = None
+        self.last_seek_latency_ms = None
+        if self.playback_profiles:
+            self.current_profile = self.playback_profiles.profile_for(file_path)
+
         # Update preview popup video path
         if hasattr(self, 'preview_popup'):
             self.preview_popup.set_video(str(file_path))
 
         self.video_widget.reset_zoom_pan()
+        # Don't show the previous video's markers while the session loads
+        self.load_markers(file_path, [])
+
+        self._session_request_seq += 1
+        self._pending_load = {
+            'request_id': self._session_request_seq,
+            'file_path': file_path,
+            'saved_position': saved_position,
+            'volume': volume,
+            'auto_play': auto_play,
+        }
+
+        preloaded = self._take_preloaded(file_path, saved_position)
+        if preloaded:
+            self._pending_load = None
+            return self._open_video(file_path, preloaded['session'], saved_position, volume, auto_play, preloaded)
+
+        self._start_session_loader(file_path, self._session_request_seq, self._on_session_loaded,
+                                   save_default_audio=True)
+        return True
+
+    def _start_session_loader(self, file_path, request_id, handler, save_default_audio=False):
+        """Fetch the DB session for a file on a worker thread."""
+        if not self.db:
+            handler(request_id, _empty_session(file_path))
+            return
+
+        loader = VideoSessionLoader(self.db, file_path, request_id, save_default_audio)
+        loader.loaded.connect(handler)
+        loader.finished.connect(lambda: self._session_loaders.discard(loader))
+        loader.finished.connect(loader.deleteLater)
+        # Keep a reference until the thread is done
+        self._session_loaders.add(loader)
+        loader.start()
+
+    def _on_session_loaded(self, request_id, session):
+        """UI thread: DB session arrived, open the file unless a newer load superseded it."""
+        pending = self._pending_load
+        if not pending or pending['request_id'] != request_id:
+            return
+        self._pending_load = None
+        self._open_video(pending['file_path'], session, pending['saved_position'],
+                         pending['volume'], pending['auto_play'])
+
+    def _open_video(self, file_path, session, saved_position, volume, auto_play, preloaded=None):
+        """Apply a loaded session to the UI and hand the file to mpv."""
+        if saved_position is None:
+            saved_position = session['last_position'] or 0
+        self.saved_position = saved_position
+        self.current_file = file_path
+        self._reset_published_position()
+        self.position_timer.start()
 
         try:
             # Set volume BEFORE loading video
             if volume is None:
-                volume = 100
-            
+                volume = session['volume'] or 100
+
             try:
                 self.player.volume = volume
             except Exception as e:
@@ -577,68 +878,274 @@ class VideoPlayerWidget(QWidget):
                 if hasattr(self.volume_btn.popup, '_update_label'):
                     self.volume_btn.popup._update_label(int(volume))
 
-            self.player.sid = 'no'
-            self.player.loadfile(file_path)
-            self._apply_subtitle_styles()
+            # Fill track menus from the session
+            self.load_audio_tracks(file_path, session['audio'])
+            self.load_subtitle_tracks(file_path, session['subtitles'])
+
+            self.player.pause = not auto_play
+            if preloaded:
+                # Already opened (and possibly buffered) as the next playlist entry
+                self._pending_audio_file, self._pending_subtitle_file = preloaded['pending']
+                self.player.command('playlist-next')
+                if _default_audio_id(session) is not None:
+                    # The preload saved nothing: store the audio choice off the GUI thread
+                    self._start_session_loader(file_path, 0, lambda *_: None, save_default_audio=True)
+            else:
+                # Start position and track selection go to mpv in a single command
+                options, self._pending_audio_file, self._pending_subtitle_file = \
+                    self._build_load_options(file_path, saved_position, session)
+                self.player.loadfile(file_path, 'replace', **options)
             self.play_btn.setEnabled(True)
             self.progress_slider.setEnabled(True)
             self.prev_video_btn.setEnabled(True)
             self.next_video_btn.setEnabled(True)
 
-            # ADDED: Load audio tracks
-            QTimer.singleShot(200, lambda: self.load_audio_tracks(file_path))
-            
-            # Load tracks info from DB and restore state
-            QTimer.singleShot(100, lambda: self.load_subtitle_tracks(file_path))
-            QTimer.singleShot(200, lambda: self.restore_subtitle_track(file_path))
-            
             # Load markers
-            self.load_markers(file_path)
-
-            if auto_play:
-                QTimer.singleShot(100, self._start_playback)
-            else:
-                QTimer.singleShot(100, self._load_paused)
+            self.load_markers(file_path, session['markers'])
 
             return True
 
         except Exception as e:
             print(f"Error loading video: {e}")
             self.is_loading = False
-            self.auto_play_pending = False
+            self.load_state = 'idle'
             return False
 
-    def _load_paused(self):
-        """Load video in paused mode."""
-        if not self.player: return
+    def _build_load_options(self, file_path, saved_position, session):
+        """
+        Per-file loadfile options: start position, audio and subtitle selection.
+        Returns (options, pending_audio_file, pending_subtitle_file); external files
+        are attached via audio-files-append/sub-files-append (one path, never split at
+        the path-list separator) and selected on file-loaded.
+        """
+        audio_tracks, selected_audio_id = session['audio']
+        subtitle_tracks, selected_subtitle_id, subtitles_enabled = session['subtitles']
+        options = {}
+        pending_audio_file = None
+        pending_subtitle_file = None
+
+        if self.playback_profiles:
+            _, profile_options = self.playback_profiles.options_for(file_path)
+            options.update(profile_options)
+
+        if saved_position and saved_position > 0:
+            options['start'] = f"{float(saved_position):.3f}"
+
+        # Audio: saved track, or the first one (saved by VideoSessionLoader when
+        # the file is opened; a preloaded lesson writes nothing)
+        audio_track = None
+        if audio_tracks:
+            audio_track = next((t for t in audio_tracks if t['id'] == selected_audio_id), None)
+            if audio_track is None:
+                audio_track = audio_tracks[0]
+
+        if audio_track:
+            if audio_track['track_type'] == 'embedded':
+                stream_index = audio_track['stream_index']
+                options['aid'] = str(int(stream_index) if stream_index is not None else 1)
+            elif audio_track['audio_file_path'] and Path(audio_track['audio_file_path']).exists():
+                options['audio-files-append'] = _mpv_quote(audio_track['audio_file_path'])
+                pending_audio_file = audio_track['audio_file_path']
+            else:
+                print(f"❌ External file not found: {audio_track['audio_file_path']}")
+
+        # Subtitles: off unless enabled and a saved track exists
+        options['sid'] = 'no'
+        subtitle_track = None
+        if subtitles_enabled and selected_subtitle_id:
+            subtitle_track = next((t for t in subtitle_tracks if t['id'] == selected_subtitle_id), None)
+
+        if subtitle_track:
+            if subtitle_track['track_type'] == 'embedded':
+                options['sid'] = str(subtitle_track['stream_index'])
+            elif subtitle_track['subtitle_file_path'] and Path(subtitle_track['subtitle_file_path']).exists():
+                options['sub-files-append'] = _mpv_quote(subtitle_track['subtitle_file_path'])
+                pending_subtitle_file = subtitle_track['subtitle_file_path']
+            else:
+                print(f"❌ External subtitle file not found: {subtitle_track['subtitle_file_path']}")
+
+        return options, pending_audio_file, pending_subtitle_file
+
+    def set_playback_profiles(self, profiles):
+        """Use a PlaybackProfiles instance for per-file cache/demuxer options."""
+        self.playback_profiles = profiles
+
+    # ===================== STATS OVERLAY =====================
+    def toggle_stats_overlay(self, enabled=None):
+        """Show/hide cache fill and seek latency on the video (mpv OSD)."""
+        if enabled is None:
+            enabled = not self.stats_timer.isActive()
+        if enabled:
+            self.stats_timer.start()
+            self._update_stats_overlay()
+        else:
+            self.stats_timer.stop()
+            if self.player:
+                try:
+                    self.player.show_text('', 1, 0)
+                except Exception:
+                    pass
+        return enabled
+
+    def _update_stats_overlay(self):
+        if not self.player or not self.current_file:
+            return
+
         try:
-            self.player.pause = True
-            if self.saved_position > 0 and not self.position_restore_attempted:
-                QTimer.singleShot(150, self.restore_position)
+            cache_seconds = self.player.demuxer_cache_duration or 0
+            cache_state = self.player.demuxer_cache_state or {}
+            buffering = self.player.cache_buffering_state
+        except Exception:
+            cache_seconds, cache_state, buffering = 0, {}, None
+
+        cache_mib = cache_state.get('fw-bytes', 0) / (1024 * 1024)
+        profile = self.current_profile or tr('player.stats_na')
+        latency = self.last_seek_latency_ms
+
+        lines = [
+            tr('player.stats_profile', profile=profile),
+            tr('player.stats_cache', seconds=f"{cache_seconds:.1f}", size=f"{cache_mib:.1f}",
+               percent=buffering if buffering is not None else tr('player.stats_na')),
+            tr('player.stats_seek', ms=latency if latency is not None else tr('player.stats_na')),
+        ]
+        try:
+            # Level 0 shows even with osd_level=0; refreshed before it expires
+            self.player.show_text('\n'.join(lines), self.stats_timer.interval() + 200, 0)
         except Exception as e:
-            print(f"Error loading paused: {e}")
+            print(f"Error showing stats overlay: {e}")
+
+    # ===================== PRELOAD =====================
+    def set_preload(self, enabled, seconds=30):
+        """Enable opening the next lesson `seconds` before the current one ends."""
+        self.preload_seconds = max(1, int(seconds)) if enabled else 0
+        if self.player:
+            try:
+                self.player.prefetch_playlist = 'yes' if enabled else 'no'
+            except Exception as e:
+                print(f"Error setting playlist prefetch: {e}")
+
+    def _check_preload(self, position_ms):
+        """Ask for the next lesson once playback gets close to the end."""
+        if not self.preload_seconds or not self.current_file:
+            return
+        if self._preload_requested_for == self.current_file:
+            return
+        duration_ms = self.progress_slider.maximum()
+        if duration_ms <= 0 or duration_ms - position_ms > self.preload_seconds * 1000:
+            return
+        self._preload_requested_for = self.current_file
+        self.preload_requested.emit(self.current_file)
+
+    def preload_next(self, file_path, saved_position=None):
+        """
+        Append the next lesson to mpv's playlist so it is opened and buffered
+        (prefetch-playlist) while the current one is still playing.
+        saved_position: start position in seconds (None = saved progress from DB)
+        """
+        if not self.player or not self.current_file or file_path == self.current_file:
+            return False
+        if not Path(file_path).exists():
+            return False
+
+        self._clear_preloaded()
+        self._session_request_seq += 1
+        self._pending_preload = {
+            'request_id': self._session_request_seq,
+            'file_path': file_path,
+            'saved_position': saved_position,
+            'current_file': self.current_file,
+        }
+        self._start_session_loader(file_path, self._session_request_seq, self._on_preload_session_loaded)
+        return True
+
+    def _on_preload_session_loaded(self, request_id, session):
+        """UI thread: append the next lesson once its DB session is ready."""
+        pending = self._pending_preload
+        if not pending or pending['request_id'] != request_id:
+            return
+        self._pending_preload = None
+        if pending['current_file'] != self.current_file or not self.player:
+            return
+
+        file_path = pending['file_path']
+        start = pending['saved_position']
+        if start is None:
+            start = session['last_position'] or 0
 
-    def _start_playback(self):
-        """Start playback after loading."""
-        if not self.player: return
         try:
-            if self.player.pause:
-                self.player.pause = False
-            if self.saved_position > 0 and not self.position_restore_attempted:
-                QTimer.singleShot(150, self.restore_position)
+            options, pending_audio, pending_subtitle = self._build_load_options(file_path, start, session)
+            self.player.loadfile(file_path, 'append', **options)
+            self._preloaded = {
+                'file_path': file_path,
+                'saved_position': pending['saved_position'],
+                'session': session,
+                'pending': (pending_audio, pending_subtitle),
+            }
+            print(f"⏭ Preloading next lesson: {Path(file_path).name}")
         except Exception as e:
-            print(f"Error starting playback: {e}")
+            print(f"Error preloading next video: {e}")
+            self._preloaded = None
+
+    def _take_preloaded(self, file_path, saved_position):
+        """Return the preloaded entry if it matches the requested load, else drop it."""
+        self._pending_preload = None
+        preloaded = self._preloaded
+        if preloaded and preloaded['file_path'] == file_path \
+                and preloaded['saved_position'] == saved_position:
+            self._preloaded = None
+            return preloaded
+        self._clear_preloaded()
+        return None
+
+    def _clear_preloaded(self):
+        """Remove the appended next entry from mpv's playlist."""
+        if self._preloaded and self.player:
+            try:
+                self.player.command('playlist-clear')
+            except Exception as e:
+                print(f"Error clearing playlist: {e}")
+        self._preloaded = None
+
+    def _select_pending_external_tracks(self):
+        """Select external audio/subtitle files attached by loadfile once mpv lists them."""
+        if not self.player or not (self._pending_audio_file or self._pending_subtitle_file):
+            return
+
+        try:
+            track_list = self.player.track_list or []
+        except Exception:
+            return
+
+        for track in track_list:
+            if not track.get('external'):
+                continue
+            filename = track.get('external-filename')
+            if not filename:
+                continue
+            try:
+                if track.get('type') == 'audio' and self._pending_audio_file \
+                        and _same_file(filename, self._pending_audio_file):
+                    self.player.aid = track['id']
+                    self._pending_audio_file = None
+                elif track.get('type') == 'sub' and self._pending_subtitle_file \
+                        and _same_file(filename, self._pending_subtitle_file):
+                    self.player.sid = track['id']
+                    self._pending_subtitle_file = None
+            except Exception as e:
+                print(f"Error selecting external track: {e}")
 
     # ADDED: Methods for audio tracks
-    def load_audio_tracks(self, filepath):
-        """Load list of audio tracks from DB."""
+    def load_audio_tracks(self, filepath, audio=None):
+        """Fill the audio track menu. audio: prefetched (tracks, selected_audio_id)."""
         self.volume_btn.popup.clearAudio()
 
-        if not self.db:
-            return
+        if audio is None:
+            if not self.db:
+                return
+            audio = self.db.load_audio_tracks(filepath)
 
         try:
-            tracks, selected_audio_id = self.db.load_audio_tracks(filepath)
+            tracks, selected_audio_id = audio
 
             if not tracks:
                 self.volume_btn.popup.addAudioItem(tr('player.no_tracks'), None)
@@ -683,9 +1190,6 @@ class VideoPlayerWidget(QWidget):
             if tracks:
                 self.volume_btn.popup.setAudioIndex(selected_index)
 
-            # ADDED: Restore selected track
-            QTimer.singleShot(300, lambda: self.restore_audio_track(filepath))
-
         except Exception as e:
             print(f"Error loading audio tracks: {e}")
 
@@ -770,79 +1274,19 @@ class VideoPlayerWidget(QWidget):
             QTimer.singleShot(100, lambda: setattr(self.player, 'pause', False))
 
 
-    def restore_audio_track(self, filepath):
-        """Restore saved audio track when loading video."""
-        if not self.db or not self.player:
-            return
-
-        try:
-            tracks, selected_audio_id = self.db.load_audio_tracks(filepath)
-            
-            if not selected_audio_id:
-                print("⏩ No saved audio track - selecting first available")
-                if tracks:
-                    track = tracks[0]
-                    track_id = track['id']
-                    self.db.save_selected_audio(filepath, track_id)
-                    
-                    track_type = track['track_type']
-                    stream_index = track['stream_index']
-                    audio_file_path = track['audio_file_path']
-                    
-                    print(f"💾 Saved first track: {track_type}, stream={stream_index}")
-                    
-                    if track_type == 'embedded':
-                        aid = int(stream_index) if stream_index is not None else 1
-                        self.player.aid = aid
-                    elif track_type == 'external' and audio_file_path:
-                        if Path(audio_file_path).exists():
-                            self.player.command('audio-add', audio_file_path, 'select')
-                    
-                    for i in range(self.volume_btn.popup.audioCount()):
-                        if self.volume_btn.popup.audioItemData(i) == track_id:
-                            self.volume_btn.popup.setAudioIndex(i)
-                            break
-                return
-
-            track = self.db.get_track_info('audio_tracks', selected_audio_id)
-            if not track:
-                return
-
-            track_type = track['track_type']
-            stream_index = track['stream_index']
-            audio_file_path = track['audio_file_path']
-            
-            # Application logic (outside DB lock)
-            print(f"🔄 Restoring saved: {track_type}, stream={stream_index}")
-
-            if track_type == 'embedded':
-                aid = int(stream_index) if stream_index is not None else 1
-                self.player.aid = aid
-                print(f"✅ Restored embedded aid={aid}")
-
-            elif track_type == 'external' and audio_file_path:
-                if Path(audio_file_path).exists():
-                    self.player.command('audio-add', audio_file_path, 'select')
-                    print(f"✅ Restored external: {audio_file_path}")
-                else:
-                    print(f"❌ External file not found: {audio_file_path}")
-
-        except Exception as e:
-            print(f"❌ Restore error: {e}")
-            import traceback
-            traceback.print_exc()
-
     # ===================== SUBTITLES =====================
-    def load_subtitle_tracks(self, filepath):
-        """Load list of subtitles from DB."""
+    def load_subtitle_tracks(self, filepath, subtitles=None):
+        """Fill the subtitle menu. subtitles: prefetched (tracks, selected_subtitle_id, subtitles_enabled)."""
         popup = self.subtitle_btn.popup
         popup.clear()
 
-        if not self.db:
-            return
+        if subtitles is None:
+            if not self.db:
+                return
+            subtitles = self.db.load_subtitle_tracks(filepath)
 
         try:
-            tracks, selected_subtitle_id, subtitles_enabled = self.db.load_subtitle_tracks(filepath)
+            tracks, selected_subtitle_id, subtitles_enabled = subtitles
             
             if not tracks:
                 return
@@ -890,9 +1334,6 @@ class VideoPlayerWidget(QWidget):
             # Set button state based on subtitles_enabled from DB
             self.subtitle_btn.set_enabled_state(bool(subtitles_enabled))
 
-            # Restore state is now handled in load_video for better timing control
-            # QTimer.singleShot(400, lambda: self.restore_subtitle_track(filepath))
-
         except Exception as e:
             print(f"Error loading subtitle tracks: {e}")
 
@@ -959,19 +1400,29 @@ class VideoPlayerWidget(QWidget):
             print(f"Error changing subtitle style: {e}")
 
     # ===================== MARKERS =====================
-    def load_markers(self, file_path):
-        """Load markers from DB and update slider."""
-        if self.db:
-            self.markers = self.db.get_markers(file_path)
+    def load_markers(self, file_path, markers=None):
+        """Load markers from DB (or use prefetched ones) and update slider."""
+        if markers is not None or self.db:
+            self.markers = markers if markers is not None else self.db.get_markers(file_path)
             self.progress_slider.set_markers(self.markers, self.player.duration if self.player else 0)
             
-            # Update Gallery
+            # Update Gallery (it asks for the thumbnails it can show)
             if self.marker_gallery:
                 self.marker_gallery.set_markers(self.markers)
-                # Request thumbnails
-                if self.markers:
-                    for m in self.markers:
-                        self.thumb_provider.get_thumbnail(file_path, m['position_seconds'], m['id'])
+
+    def _request_marker_thumbnails(self, markers):
+        """Generate (or load cached) screenshots for gallery items."""
+        if not self.current_file:
+            for m in markers:
+                self.marker_gallery.thumbnail_failed(m['id'])
+            return
+        for m in markers:
+            self.thumb_provider.get_thumbnail(self.current_file, m['position_seconds'], m['id'])
+
+    def _on_marker_thumbnail_failed(self, request_id):
+        """Let the gallery ask again for a screenshot that was not made."""
+        if self.marker_gallery and request_id.startswith("marker_"):
+            self.marker_gallery.thumbnail_failed(int(request_id.replace("marker_", "")))
 
     def add_marker(self, timestamp=None):
         """Add marker at specified position or current position."""
@@ -1004,6 +1455,7 @@ class VideoPlayerWidget(QWidget):
             # Show dialog - Pass empty label to keep field clear
             duration = self.progress_slider.maximum() / 1000.0
             print(f"DEBUG: Opening dialog... Default label fallback: {default_label}, duration: {duration}") # DEBUG
+            from marker_dialog import MarkerDialog
             dlg = MarkerDialog(self, pos, label="", max_duration=duration)
             if dlg.exec():
                 label, color, new_pos = dlg.get_data()
@@ -1053,12 +1505,16 @@ class VideoPlayerWidget(QWidget):
             
         try:
             duration = self.progress_slider.maximum() / 1000.0
+            from marker_dialog import MarkerDialog
             dlg = MarkerDialog(self, pos, label=label, color=color, max_duration=duration)
             dlg.setWindowTitle(tr('player.edit_marker_title') or "Edit Marker")
             if dlg.exec():
                 new_label, new_color, new_pos = dlg.get_data()
                 if new_label or new_pos != pos: # Allow saving even if label is empty but pos changed
                     self.db.update_marker(m_id, new_label, new_color, position=new_pos)
+                    if new_pos != pos:
+                        # Cached screenshot shows the old frame
+                        self.thumb_provider.invalidate(self.current_file, m_id)
                     self.load_markers(self.current_file)
                     self.markers_changed.emit(self.current_file)
         except Exception as e:
@@ -1077,12 +1533,9 @@ class VideoPlayerWidget(QWidget):
             self.marker_gallery.hide()
         else:
             self._update_gallery_geometry()
+            # Showing the gallery requests thumbnails for visible items
             self.marker_gallery.show()
             self.marker_gallery.raise_()
-            # Ensure markers are up to date and have thumbnails
-            if self.current_file and self.markers:
-                for m in self.markers:
-                    self.thumb_provider.get_thumbnail(self.current_file, m['position_seconds'], m['id'])
 
     def _on_marker_thumbnail_ready(self, request_id, pixmap):
         """Slot called when a marker thumbnail is generated."""
@@ -1222,50 +1675,9 @@ class VideoPlayerWidget(QWidget):
         except Exception as e:
             print(f"Error saving selected subtitle: {e}")
 
-    def restore_subtitle_track(self, filepath):
-        """Restore saved subtitles when loading video."""
-        if not self.db or not self.player:
-            return
-
-        try:
-            tracks, selected_subtitle_id, subtitles_enabled = self.db.load_subtitle_tracks(filepath)
-            
-            if not subtitles_enabled:
-                try:
-                    self.player.sid = 'no'
-                except:
-                    pass
-                return
-            
-            if not selected_subtitle_id:
-                return
-
-            track = self.db.get_track_info('subtitle_tracks', selected_subtitle_id)
-            if not track:
-                return
-
-            track_type = track['track_type']
-            stream_index = track['stream_index']
-            subtitle_file_path = track['subtitle_file_path']
-
-            if track_type == 'embedded':
-                try:
-                    self.player.sid = stream_index
-                except Exception as e:
-                    print(f"❌ Error restoring subtitle: {e}")
-            else:
-                if subtitle_file_path and Path(subtitle_file_path).exists():
-                    self.player.command('sub-add', subtitle_file_path, 'select')
-                else:
-                    print(f"❌ External subtitle file not found: {subtitle_file_path}")
-
-        except Exception as e:
-            print(f"❌ Subtitle restore error: {e}")
-
-
-
     def duration_changed(self, duration_ms):
         self.progress_slider.setRange(0, duration_ms)
+        self._published_slider_px = None
         # Refresh markers and ensure duration is synced to slider for context menu
         self.progress_slider.set_markers(self.markers if hasattr(self, 'markers') else [], duration_ms / 1000.0)
 
@@ -1338,6 +1750,11 @@ class VideoPlayerWidget(QWidget):
             pass
             
         self.current_file = None
+        self._preloaded = None  # 'stop' also cleared mpv's playlist
+        self._pending_preload = None
+        self._pending_load = None
+        self.position_timer.stop()
+        self._reset_published_position()
         self.play_btn.setEnabled(False)
         self.progress_slider.setEnabled(False)
         self.progress_slider.setValue(0)
@@ -1348,12 +1765,19 @@ class VideoPlayerWidget(QWidget):
         self.video_widget.update() # Force repaint for placeholder
 
     def position_updated(self, position_ms):
+        """Apply a playback position to the UI (called from the UI thread only)."""
         if self.is_seeking_slider:
             return
 
-        self.slider_updating = True
-        self.progress_slider.setValue(position_ms)
-        self.slider_updating = False
+        # Move the slider only when the handle would move by at least a pixel
+        slider = self.progress_slider
+        slider_px = QStyle.sliderPositionFromValue(slider.minimum(), slider.maximum(),
+                                                   position_ms, slider.width())
+        if slider_px != self._published_slider_px:
+            self._published_slider_px = slider_px
+            self.slider_updating = True
+            slider.setValue(position_ms)
+            self.slider_updating = False
 
         current_sec = position_ms // 1000
 
@@ -1362,6 +1786,12 @@ class VideoPlayerWidget(QWidget):
         except:
             total_sec = 0
 
+        # Everything below only changes once per second
+        if current_sec == self._published_second and total_sec == self._published_total:
+            return
+        self._published_second = current_sec
+        self._published_total = total_sec
+
         self.time_label.setText(tr('player.time_format',
                                    current=self.format_time(current_sec),
                                    total=self.format_time(total_sec)))
@@ -5,6 +5,7 @@ from pathlib import Path
 from PyQt6.QtWidgets import QWidget, QLabel, QVBoxLayout
 from PyQt6.QtCore import Qt, QProcess, QTimer, QSize, QPoint
 from PyQt6.QtGui import QPixmap, QColor, QPainter, QBrush
+from media_governor import get_governor, PRIORITY_INTERACTIVE
 
 class PreviewPopup(QWidget):
     """
@@ -65,6 +66,9 @@ class PreviewPopup(QWidget):
         self.process = QProcess()
         self.process.readyReadStandardOutput.connect(self._handle_process_output)
         self.process.finished.connect(self._handle_process_finished)
+        self.process.errorOccurred.connect(self._handle_process_error)
+        # Media process slot of the running ffmpeg (see media_governor)
+        self.slot = None
         
         # Debounce Timer
         self.debounce_timer = QTimer()
@@ -141,6 +145,7 @@ class PreviewPopup(QWidget):
         if self.process.state() != QProcess.ProcessState.NotRunning:
             self.process.kill()
             self.process.waitForFinished(100)
+        self._release_slot()
 
         # Build FFmpeg command
         # Extract 1 frame at specific time
@@ -162,14 +167,29 @@ class PreviewPopup(QWidget):
             "-" # Pipe output
         ]
         
+        self.slot = get_governor().try_acquire(PRIORITY_INTERACTIVE, self.current_video_path)
+        if self.slot is None:
+            # Every media slot is taken: try again shortly
+            self.debounce_timer.start()
+            return
+
         self.process_data = bytearray() # Reset buffer
         self.process.start(str(ffmpeg_exe), args)
 
+    def _release_slot(self):
+        get_governor().release(self.slot)
+        self.slot = None
+
+    def _handle_process_error(self, error):
+        if error == QProcess.ProcessError.FailedToStart:
+            self._release_slot()
+
     def _handle_process_output(self):
         data = self.process.readAllStandardOutput()
         self.process_data.extend(data)
 
     def _handle_process_finished(self):
+        self._release_slot()
         if len(self.process_data) > 0:
             pixmap = QPixmap()
             if pixmap.loadFromData(self.process_data, "JPG"):
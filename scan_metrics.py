@@ -0,0 +1,194 @@
+"""
+Thread-safe scan metrics: per-stage latency histograms, counters and gauges.
+
+VideoScanner keeps one ScanMetrics, resets it at the start of every
+scan_directory call and saves a JSON report when the scan ends. Listeners
+(ScannerThread -> ScanProgressDialog) receive snapshot dicts at most every
+`emit_interval` seconds while the scan runs, and once more at the end.
+
+    with metrics.stage('probe'):
+        ...
+    metrics.incr('ffprobe_runs')
+    metrics.gauge('video_queue', pending)
+"""
+import json
+import time
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+# Histogram bucket upper bounds, seconds
+BUCKETS = (0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1.0, 2.0, 5.0, 10.0, float('inf'))
+
+
+def _bucket_label(bound):
+    if bound == float('inf'):
+        return 'inf'
+    return f"{bound * 1000:g}ms"
+
+
+class Histogram:
+    """Latency distribution of one stage (not locked: ScanMetrics holds the lock)."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+        self.buckets = [0] * len(BUCKETS)
+
+    def observe(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.min = seconds if self.min is None else min(self.min, seconds)
+        self.max = seconds if self.max is None else max(self.max, seconds)
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.buckets[i] += 1
+                break
+
+    def percentile(self, q):
+        """Upper bound of the bucket holding the q-th quantile (max for the last bucket)."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if seen >= rank:
+                return min(BUCKETS[i], self.max)
+        return self.max
+
+    def to_dict(self):
+        def ms(value):
+            return round(value * 1000, 2) if value is not None else None
+        return {
+            'count': self.count,
+            'total_s': round(self.total, 3),
+            'mean_ms': ms(self.total / self.count) if self.count else None,
+            'min_ms': ms(self.min),
+            'max_ms': ms(self.max),
+            'p50_ms': ms(self.percentile(0.5)),
+            'p95_ms': ms(self.percentile(0.95)),
+            'buckets': {_bucket_label(b): n for b, n in zip(BUCKETS, self.buckets) if n},
+        }
+
+
+class ScanMetrics:
+    """Per-scan metrics shared by the scanner's worker threads."""
+
+    def __init__(self, emit_interval=0.5):
+        self.emit_interval = emit_interval
+        self._lock = threading.Lock()
+        self._listeners = []
+        self.reset()
+
+    def reset(self, root=None):
+        with self._lock:
+            self.root = root
+            self.started = time.time()
+            self._start = time.perf_counter()
+            self._last_emit = 0.0
+            self.stages = {}     # {stage: Histogram}
+            self.counters = {}   # {name: int}
+            self.gauges = {}     # {name: [current, peak]}
+
+    # --- listeners ----------------------------------------------------------
+
+    def add_listener(self, callback):
+        """callback(snapshot_dict); called from scanner threads."""
+        self._listeners.append(callback)
+
+    def _maybe_emit(self, force=False):
+        if not self._listeners:
+            return
+        now = time.perf_counter()
+        with self._lock:
+            if not force and now - self._last_emit < self.emit_interval:
+                return
+            self._last_emit = now
+        snapshot = self.snapshot()
+        for callback in self._listeners:
+            try:
+                callback(snapshot)
+            except Exception as e:
+                print(f"Error in scan metrics listener: {e}")
+
+    def flush(self):
+        """Send the current snapshot to listeners regardless of the throttle."""
+        self._maybe_emit(force=True)
+
+    # --- recording ----------------------------------------------------------
+
+    def observe(self, stage, seconds):
+        with self._lock:
+            hist = self.stages.get(stage)
+            if hist is None:
+                hist = self.stages[stage] = Histogram()
+            hist.observe(seconds)
+        self._maybe_emit()
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def incr(self, name, amount=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def gauge(self, name, value):
+        """Set a current value (e.g. queue depth); the peak is kept too."""
+        with self._lock:
+            current = self.gauges.get(name)
+            if current is None:
+                self.gauges[name] = [value, value]
+            else:
+                current[0] = value
+                current[1] = max(current[1], value)
+
+    def stage_total(self, stage):
+        with self._lock:
+            hist = self.stages.get(stage)
+            return hist.total if hist else 0.0
+
+    # --- export -------------------------------------------------------------
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'type': 'metrics',
+                'root': self.root,
+                'elapsed_s': round(time.perf_counter() - self._start, 3),
+                'stages': {name: hist.to_dict() for name, hist in self.stages.items()},
+                'counters': dict(self.counters),
+                'gauges': {name: {'current': v[0], 'peak': v[1]} for name, v in self.gauges.items()},
+            }
+
+    def save_report(self, reports_dir, extra=None, keep=20):
+        """Write this scan's snapshot as JSON; only the newest `keep` reports are kept."""
+        reports_dir = Path(reports_dir)
+        report = self.snapshot()
+        report['started'] = time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self.started))
+        if extra:
+            report.update(extra)
+        try:
+            reports_dir.mkdir(parents=True, exist_ok=True)
+            stamp = time.strftime('%Y%m%d-%H%M%S', time.localtime(self.started))
+            path = reports_dir / f"scan-{stamp}.json"
+            n = 1
+            while path.exists():  # scans of several roots started in the same second
+                n += 1
+                path = reports_dir / f"scan-{stamp}-{n}.json"
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2, ensure_ascii=False)
+
+            for old in sorted(reports_dir.glob('scan-*.json'))[:-keep]:
+                old.unlink()
+            return path
+        except OSError as e:
+            print(f"Error saving scan report: {e}")
+            return None
@@ -0,0 +1,147 @@
+"""
+Typed, throttled progress events for a library scan.
+
+VideoScanner reports how many video files were discovered, probed,
+thumbnailed and persisted (written to the DB), and the folder in progress.
+Listeners get a ScanProgress at most every `emit_interval` seconds, plus one
+at each phase change, with a smoothed files/sec rate and an ETA.
+"""
+import time
+import threading
+from dataclasses import dataclass
+from typing import Optional
+
+PHASE_DISCOVERING = 'discovering'
+PHASE_SCANNING = 'scanning'
+PHASE_FINISHING = 'finishing'
+PHASE_DONE = 'done'
+PHASE_CANCELLED = 'cancelled'
+
+
+@dataclass(frozen=True)
+class ScanProgress:
+    root: str
+    phase: str
+    discovered: int
+    probed: int
+    thumbnailed: int
+    persisted: int
+    current_folder: str
+    elapsed: float
+    files_per_sec: float
+    eta_seconds: Optional[float]
+
+
+class ProgressReporter:
+    """Thread-safe progress counters of one scan_directory call."""
+
+    # Weight of the latest interval in the smoothed rate
+    RATE_SMOOTHING = 0.3
+
+    def __init__(self, emit_interval=0.25):
+        self.emit_interval = emit_interval
+        self._lock = threading.Lock()
+        self._listeners = []
+        self.reset()
+
+    def reset(self, root=''):
+        with self._lock:
+            self.root = root
+            self.phase = PHASE_DISCOVERING
+            self.discovered = 0
+            self.probed = 0
+            self.thumbnailed = 0
+            self.persisted = 0
+            self.current_folder = ''
+            self._start = time.perf_counter()
+            self._last_emit = 0.0
+            self._rate_time = self._start
+            self._rate_done = 0
+            self._rate = 0.0
+        self._emit(force=True)
+
+    def add_listener(self, callback):
+        """callback(ScanProgress); called from scanner threads."""
+        self._listeners.append(callback)
+
+    # --- updates ------------------------------------------------------------
+
+    def _add(self, field, amount):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + amount)
+        self._emit()
+
+    def add_discovered(self, count):
+        self._add('discovered', count)
+
+    def add_probed(self, count=1):
+        self._add('probed', count)
+
+    def add_thumbnailed(self, count=1):
+        self._add('thumbnailed', count)
+
+    def add_persisted(self, count=1):
+        self._add('persisted', count)
+
+    def set_folder(self, folder):
+        with self._lock:
+            self.current_folder = str(folder)
+        self._emit()
+
+    def set_phase(self, phase):
+        with self._lock:
+            self.phase = phase
+        self._emit(force=True)
+
+    # --- events -------------------------------------------------------------
+
+    def _update_rate(self, now):
+        """Exponentially smoothed persisted files per second (caller holds the lock)."""
+        interval = now - self._rate_time
+        if interval <= 0:
+            return
+        current = (self.persisted - self._rate_done) / interval
+        if self._rate_done == 0 and self._rate == 0.0:
+            self._rate = current
+        else:
+            self._rate += self.RATE_SMOOTHING * (current - self._rate)
+        self._rate_time = now
+        self._rate_done = self.persisted
+
+    def snapshot(self):
+        now = time.perf_counter()
+        with self._lock:
+            self._update_rate(now)
+            remaining = max(0, self.discovered - self.persisted)
+            eta = None
+            if self.phase == PHASE_SCANNING and self._rate > 0:
+                eta = remaining / self._rate
+            elif self.phase in (PHASE_FINISHING, PHASE_DONE):
+                eta = 0.0
+            return ScanProgress(
+                root=self.root,
+                phase=self.phase,
+                discovered=self.discovered,
+                probed=self.probed,
+                thumbnailed=self.thumbnailed,
+                persisted=self.persisted,
+                current_folder=self.current_folder,
+                elapsed=now - self._start,
+                files_per_sec=self._rate,
+                eta_seconds=eta,
+            )
+
+    def _emit(self, force=False):
+        if not self._listeners:
+            return
+        now = time.perf_counter()
+        with self._lock:
+            if not force and now - self._last_emit < self.emit_interval:
+                return
+            self._last_emit = now
+        event = self.snapshot()
+        for callback in self._listeners:
+            try:
+                callback(event)
+            except Exception as e:
+                print(f"Error in scan progress listener: {e}")
@@ -8,10 +8,18 @@ import threading
 import sqlite3
 import configparser
 import hashlib
+import shutil
 from pathlib import Path
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
 from translator import tr
 from database import DatabaseManager
+from transcripts import TRANSCRIPT_EXTENSIONS, iter_cues
+from media_backend import FFmpegBackend, get_subprocess_startupinfo, nearest_keyframes
+from name_matching import normalize_name, extract_episode_number, calculate_match_score, score_folder
+from scan_metrics import ScanMetrics
+from media_governor import get_governor, PRIORITY_SCAN
+from scan_progress import ProgressReporter, PHASE_SCANNING, PHASE_FINISHING, PHASE_DONE, PHASE_CANCELLED
 
 # Fix for 'charmap' codec errors on Windows when printing Cyrillic
 if sys.platform == 'win32':
@@ -33,14 +41,14 @@ def natural_sort_key(path):
 
 
 class VideoScanner:
-    def __init__(self, config_file='video_course_browser.ini'):
+    def __init__(self, config_file='video_course_browser.ini', data_dir=None, media_backend=None):
         print("\n" + "=" * 70)
         print(tr('scanner.init_title'))
         print("=" * 70)
 
         self.script_dir = Path(__file__).parent
-        self.data_dir = self.script_dir / 'data'
-        self.data_dir.mkdir(exist_ok=True)
+        self.data_dir = Path(data_dir) if data_dir else self.script_dir / 'data'
+        self.data_dir.mkdir(parents=True, exist_ok=True)
         
         self.config_file = self.script_dir / config_file
         self.db_file = self.data_dir / 'video_courses.db'
@@ -51,11 +59,13 @@ class VideoScanner:
         # Paths to ffprobe and ffmpeg are already set in _load_settings, but ensure defaults if not loaded
         if not hasattr(self, 'ffprobe_path'):
             self.ffprobe_path = self.script_dir / 'resources/bin/ffprobe.exe'
-        self.has_ffprobe = self.ffprobe_path.exists()
-        
         if not hasattr(self, 'ffmpeg_path'):
             self.ffmpeg_path = self.script_dir / 'resources/bin/ffmpeg.exe'
-        self.has_ffmpeg = self.ffmpeg_path.exists()
+
+        # Probing and frame extraction (see media_backend; tests pass a FakeMediaBackend)
+        self.media = media_backend or FFmpegBackend(self.ffmpeg_path, self.ffprobe_path)
+        self.has_ffprobe = self.media.can_probe
+        self.has_ffmpeg = self.media.can_extract
 
         print(f"\n{tr('scanner.paths_title')}")
         print(tr('scanner.path_script', path=self.script_dir))
@@ -79,16 +89,57 @@ class VideoScanner:
         
         self._print_lock = threading.Lock()
         
-        # Statistics
+        # Per-scan stage timings, process counts, queue depths (reset by scan_directory)
+        self.metrics = ScanMetrics()
+        # Discovered/probed/thumbnailed/persisted counts for progress UIs
+        self.progress = ProgressReporter()
+        self.reports_dir = self.data_dir / 'scan_reports'
+        self.last_metrics_report = None
+
+        # Statistics (cumulative over scans; updated from worker threads through _stat)
+        self._stats_lock = threading.Lock()
         self.stats = {
             'thumbnails_generated': 0,
             'thumbnails_cached': 0,
             'thumbnails_failed': 0,
+            'thumbnails_deferred': 0,
+            'thumbnails_recovered': 0,
+            'transcripts_indexed': 0,
+            'transcript_cues': 0,
             'time_thumbnails': 0,
+            'time_transcripts': 0,
             'time_ffprobe': 0,
             'time_total': 0
         }
 
+        # Result of the last prune pass (see _prune_missing)
+        self.last_prune_report = None
+        # Prunes held back by scan_directory(defer_prune=True), see run_deferred_prunes
+        self.deferred_prunes = []
+        # Counts of the last scan_directory call (used by the CLI summary)
+        self.last_scan_summary = None
+
+        # DB rows already re-pointed to a new path during this scan (moved files)
+        self._moves_lock = threading.Lock()
+        self._claimed_moves = set()
+
+        # Frames that failed during the scan, retried at its end (see _retry_deferred_thumbnails)
+        self._retry_queue = {}
+        self._retry_lock = threading.Lock()
+        # Seek latency of successful frame extractions (scan-wide and per file, EWMA seconds)
+        self._frame_latency = None
+        self._file_frame_latency = {}
+        # Files whose thumbnails failed in an earlier scan: {file_path: file_size}
+        self._known_failures = {}
+
+        # Sidecar files and name-match scores of the folder being scanned (see _prepare_folder)
+        self._folder_context = None
+        self._match_pool = None
+
+        # Cooperative cancellation (see cancel); checked between files, frames and folders
+        self._cancel = threading.Event()
+        self.last_scan_cancelled = False
+
     def _load_settings(self):
         """Load settings from configuration file."""
         config = configparser.ConfigParser()
@@ -135,6 +186,7 @@ class VideoScanner:
             fallback='.srt,.ass,.ssa,.sub,.idx,.vtt,.sup,.stl,.smi,.txt'
         )
         self.subtitle_extensions = {e.strip().lower() for e in subtitle_extensions.split(',')}
+        self.index_transcripts = config.getboolean('Subtitles', 'index_transcripts', fallback=False)
 
         # Thumbnail settings
         self.render_width = config.getint('Thumbnails', 'render_width', fallback=320)
@@ -142,11 +194,33 @@ class VideoScanner:
         self.thumbnail_count = config.getint('Thumbnails', 'count', fallback=10)
         self.thumbnail_quality = config.getint('Thumbnails', 'quality', fallback=5)  # 2-31, lower is better
         self.regenerate_thumbnails = config.getboolean('Thumbnails', 'regenerate', fallback=False)
+        # accurate: frames at evenly spread times; keyframe: the nearest keyframes to them
+        # (one keyframe decode per thumbnail instead of decoding from the previous keyframe)
+        self.seek_mode = config.get('Thumbnails', 'seek_mode', fallback='accurate').strip().lower()
+        if self.seek_mode not in ('accurate', 'keyframe'):
+            self.seek_mode = 'accurate'
         
         # Performance settings
         self.max_workers = config.getint('Performance', 'max_workers', fallback=8)
         self.thumbnail_workers = config.getint('Performance', 'thumbnail_workers', fallback=4)
         self.ffmpeg_timeout = config.getint('Performance', 'ffmpeg_timeout', fallback=5)
+        # Upper bound of the adaptive frame timeout, also used by the retry pass
+        self.ffmpeg_timeout_max = config.getint('Performance', 'ffmpeg_timeout_max', fallback=60)
+        # Process-wide cap on ffmpeg/ffprobe processes (0 = automatic, see media_governor)
+        self.media_processes = config.getint('Performance', 'media_processes', fallback=0)
+        self.media_per_device = config.getint('Performance', 'media_per_device', fallback=0)
+        self.governor = get_governor()
+        self.governor.configure(self.media_processes, self.media_per_device)
+        # CPU-bound stages (name matching) in worker threads or processes; 0 processes = CPU count
+        self.executor = config.get('Performance', 'executor', fallback='thread').strip().lower()
+        if self.executor not in ('thread', 'process'):
+            self.executor = 'thread'
+        self.process_workers = config.getint('Performance', 'process_workers', fallback=0)
+
+        # Library maintenance
+        self.prune_missing = config.getboolean('Scan', 'prune_missing', fallback=True)
+        self.prune_dry_run = config.getboolean('Scan', 'prune_dry_run', fallback=False)
+        self.save_metrics_report = config.getboolean('Scan', 'metrics_report', fallback=True)
 
         print(f"\n{'─' * 40}")
         print(tr('scanner.settings_title'))
@@ -157,14 +231,226 @@ class VideoScanner:
         print(tr('scanner.thumbs_count', count=self.thumbnail_count))
         regen_status = tr('scanner.yes') if self.regenerate_thumbnails else tr('scanner.no')
         print(tr('scanner.thumbs_regen', status=regen_status))
+        print(tr('scanner.thumbs_seek_mode', mode=self.seek_mode))
         print(f"\n{tr('scanner.perf_title')}")
         print(tr('scanner.perf_video_workers', count=self.max_workers))
         print(tr('scanner.perf_thumb_workers', count=self.thumbnail_workers))
         print(tr('scanner.perf_timeout', seconds=self.ffmpeg_timeout))
+        print(tr('scanner.perf_media_processes', count=self.governor.max_processes))
+        print(tr('scanner.perf_executor', executor=self.executor))
         print(f"\n{tr('scanner.formats_title')}")
         print(tr('scanner.formats_video', count=len(self.video_extensions)))
         print(tr('scanner.formats_audio', count=len(self.audio_extensions)))
         print(tr('scanner.formats_subtitle', count=len(self.subtitle_extensions)))
+        transcripts_status = tr('scanner.yes') if self.index_transcripts else tr('scanner.no')
+        print(tr('scanner.formats_transcripts', status=transcripts_status))
+
+    def cancel(self):
+        """Ask the running scan to stop. Folders already committed are kept and resumed next time."""
+        self._cancel.set()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def _journal_begin(self, c, root_str):
+        """
+        Mark a scan of root_str as running.
+        If the previous one did not complete, returns the folders it committed:
+        {folder_path: folder_mtime}; otherwise the journal is cleared and {} returned.
+        """
+        c.execute("SELECT status FROM scan_runs WHERE root_path = ?", (root_str,))
+        row = c.fetchone()
+        completed = {}
+        if row and row[0] != 'complete':
+            c.execute("SELECT folder_path, folder_mtime FROM scan_journal WHERE root_path = ?", (root_str,))
+            completed = dict(c.fetchall())
+        else:
+            c.execute("DELETE FROM scan_journal WHERE root_path = ?", (root_str,))
+
+        c.execute("""
+            INSERT INTO scan_runs (root_path, status) VALUES (?, 'running')
+            ON CONFLICT(root_path) DO UPDATE SET
+                status = 'running',
+                started_at = CASE WHEN scan_runs.status = 'complete'
+                                  THEN CURRENT_TIMESTAMP ELSE scan_runs.started_at END,
+                updated_at = CURRENT_TIMESTAMP
+        """, (root_str,))
+        return completed
+
+    def _journal_folder_done(self, c, root_str, folder_path, folder_mtime):
+        c.execute("""
+            INSERT INTO scan_journal (root_path, folder_path, folder_mtime) VALUES (?, ?, ?)
+            ON CONFLICT(root_path, folder_path) DO UPDATE SET
+                folder_mtime = excluded.folder_mtime,
+                completed_at = CURRENT_TIMESTAMP
+        """, (root_str, folder_path, folder_mtime))
+        c.execute("UPDATE scan_runs SET updated_at = CURRENT_TIMESTAMP WHERE root_path = ?", (root_str,))
+
+    def _journal_finish(self, c, root_str, status):
+        """'complete' clears the journal; 'cancelled' keeps it for the next scan."""
+        c.execute("UPDATE scan_runs SET status = ?, updated_at = CURRENT_TIMESTAMP WHERE root_path = ?",
+                  (status, root_str))
+        if status == 'complete':
+            c.execute("DELETE FROM scan_journal WHERE root_path = ?", (root_str,))
+
+    def _folder_mtime(self, folder):
+        try:
+            return folder.stat().st_mtime
+        except OSError:
+            return None
+
+    def _stat(self, key, amount=1):
+        """Thread-safe increment of a self.stats counter."""
+        with self._stats_lock:
+            self.stats[key] += amount
+
+    @contextmanager
+    def _media_slot(self, path):
+        """Governor slot for one ffprobe/ffmpeg run; the wait is recorded as the media_wait stage."""
+        with self.governor.slot(PRIORITY_SCAN, path) as slot:
+            self.metrics.observe('media_wait', slot.waited)
+            yield
+
+    # Adaptive frame timeout: seek latency x factor + size allowance, within [min, ffmpeg_timeout_max]
+    FRAME_TIMEOUT_MIN = 2.0
+    FRAME_TIMEOUT_LATENCY_FACTOR = 4
+    FRAME_TIMEOUT_PER_GB = 2.0
+    FRAME_LATENCY_SMOOTHING = 0.3
+
+    def _frame_timeout(self, video_path, file_size=0):
+        """
+        Timeout for one frame of video_path. Until a frame has been extracted in
+        this scan it is the configured ffmpeg_timeout; then it follows the measured
+        seek latency (of this file if known), so hung processes are dropped early
+        and the frame goes to the retry pass, while slow media gets more time.
+        """
+        with self._retry_lock:
+            latency = self._file_frame_latency.get(str(video_path), self._frame_latency)
+        if latency is None:
+            timeout = self.ffmpeg_timeout
+        else:
+            timeout = max(self.FRAME_TIMEOUT_MIN, latency * self.FRAME_TIMEOUT_LATENCY_FACTOR)
+        timeout += (file_size or 0) / (1024 ** 3) * self.FRAME_TIMEOUT_PER_GB
+        return min(timeout, self.ffmpeg_timeout_max)
+
+    def _record_frame_latency(self, video_path, seconds):
+        def smooth(current):
+            if current is None:
+                return seconds
+            return current + self.FRAME_LATENCY_SMOOTHING * (seconds - current)
+
+        key = str(video_path)
+        with self._retry_lock:
+            self._frame_latency = smooth(self._frame_latency)
+            self._file_frame_latency[key] = smooth(self._file_frame_latency.get(key))
+
+    def _extract_frame(self, video_path, time_sec, thumb_path, timeout=None, seek_mode='accurate'):
+        """One thumbnail frame through the media backend (counted as an ffmpeg run)."""
+        self.metrics.incr('ffmpeg_runs')
+        if timeout is None:
+            timeout = self.ffmpeg_timeout
+        with self._media_slot(video_path):
+            start = time.perf_counter()
+            self.media.extract_frame(
+                video_path, time_sec, thumb_path,
+                self.render_width, self.render_height,
+                self.thumbnail_quality, timeout, seek_mode
+            )
+            if Path(thumb_path).exists():
+                self._record_frame_latency(video_path, time.perf_counter() - start)
+
+    def _get_keyframes(self, video_path):
+        """Keyframe times of the video (one ffprobe packet pass), [] if unavailable."""
+        if not self.has_ffprobe or not hasattr(self.media, 'keyframes'):
+            return []
+        self.metrics.incr('ffprobe_runs')
+        try:
+            with self.metrics.stage('keyframes'), self._media_slot(video_path):
+                return self.media.keyframes(video_path, timeout=self.ffmpeg_timeout_max)
+        except Exception:
+            return []
+
+    def _defer_frames(self, video_path, video_hash, frames):
+        """Queue failed frames [(idx, time_sec)] of a video for the retry pass."""
+        with self._retry_lock:
+            entry = self._retry_queue.setdefault(str(video_path), {'hash': video_hash, 'frames': []})
+            entry['frames'].extend(frames)
+        self._stat('thumbnails_deferred', len(frames))
+
+    def _load_known_failures(self, c):
+        c.execute("SELECT file_path, file_size FROM media_failures WHERE stage = 'thumbnails'")
+        self._known_failures = dict(c.fetchall())
+
+    def _is_known_failure(self, video_path):
+        """Thumbnails of this unchanged file failed in an earlier scan (re-attempted only on regenerate)."""
+        if self.regenerate_thumbnails:
+            return False
+        size = self._known_failures.get(str(video_path))
+        if size is None:
+            return False
+        try:
+            return Path(video_path).stat().st_size == size
+        except OSError:
+            return False
+
+    def _retry_deferred_thumbnails(self, c):
+        """
+        Retry the frames that failed during the scan, one at a time with keyframe
+        seeking and the maximum timeout. Videos that now have all thumbnails are
+        updated in the DB; the ones still failing are recorded in media_failures.
+        """
+        with self._retry_lock:
+            queue, self._retry_queue = self._retry_queue, {}
+        if not queue:
+            return
+
+        print(f"\n{tr('scanner.retry_title', count=sum(len(e['frames']) for e in queue.values()))}")
+        with self.metrics.stage('thumbnail_retry'):
+            for video_path, entry in queue.items():
+                if self._cancel.is_set():
+                    return
+                failed = 0
+                error = None
+                for idx, time_sec in entry['frames']:
+                    thumb_path = self.thumbnails_dir / f"{entry['hash']}_{idx}.jpg"
+                    try:
+                        self._extract_frame(video_path, time_sec, thumb_path,
+                                            self.ffmpeg_timeout_max, seek_mode='keyframe')
+                    except subprocess.TimeoutExpired:
+                        error = 'timeout'
+                    except Exception as e:
+                        error = f"{type(e).__name__}: {e}"
+                    if thumb_path.exists():
+                        self._stat('thumbnails_recovered')
+                        self._stat('thumbnails_generated')
+                    else:
+                        failed += 1
+                        error = error or 'no frame'
+                        self._stat('thumbnails_failed')
+
+                thumbs = [str(p) for p in (self.thumbnails_dir / f"{entry['hash']}_{i}.jpg"
+                                           for i in range(self.thumbnail_count)) if p.exists()]
+                c.execute("UPDATE video_files SET thumbnail_path = ?, thumbnails_json = ? WHERE file_path = ?",
+                          (thumbs[0] if thumbs else None, json.dumps(thumbs) if thumbs else None, video_path))
+
+                if failed:
+                    try:
+                        size = Path(video_path).stat().st_size
+                    except OSError:
+                        size = None
+                    c.execute("""
+                        INSERT INTO media_failures (file_path, file_size, stage, error) VALUES (?, ?, 'thumbnails', ?)
+                        ON CONFLICT(file_path) DO UPDATE SET
+                            file_size = excluded.file_size,
+                            stage = excluded.stage,
+                            error = excluded.error,
+                            attempts = media_failures.attempts + 1,
+                            last_attempt = CURRENT_TIMESTAMP
+                    """, (video_path, size, error))
+                    print(tr('scanner.retry_failed', name=Path(video_path).name, count=failed, error=error))
+                else:
+                    c.execute("DELETE FROM media_failures WHERE file_path = ?", (video_path,))
 
     def _get_existing_video_data(self, file_path):
         """Get existing video data from DB for caching."""
@@ -194,12 +480,7 @@ class VideoScanner:
 
     def _get_subprocess_startupinfo(self):
         """Get startupinfo to hide console windows on Windows."""
-        startupinfo = None
-        if hasattr(subprocess, 'STARTUPINFO'):
-            startupinfo = subprocess.STARTUPINFO()
-            startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-            startupinfo.wShowWindow = subprocess.SW_HIDE
-        return startupinfo
+        return get_subprocess_startupinfo()
 
     def _create_thumbnails_batch(self, video_path, duration, video_hash):
         """
@@ -221,54 +502,31 @@ class VideoScanner:
         # Better to use multiple -ss with -frames:v 1
         
         thumbnail_paths = []
-        startupinfo = self._get_subprocess_startupinfo()
         
         for idx, time_sec in enumerate(timestamps):
+            if self._cancel.is_set():
+                break
             thumb_path = self.thumbnails_dir / f"{video_hash}_{idx}.jpg"
             
             # Skip if already exists
             if thumb_path.exists() and not self.regenerate_thumbnails:
                 thumbnail_paths.append(str(thumb_path))
-                self.stats['thumbnails_cached'] += 1
+                self._stat('thumbnails_cached')
                 continue
             
             try:
-                # OPTIMIZED ffmpeg command:
-                # -ss BEFORE -i = fast seek without decoding
-                # -skip_frame noref = skip non-key frames (faster)
-                # -an = no audio
-                # -frames:v 1 = only 1 frame
-                # -q:v = JPEG quality (2-31)
-                cmd = [
-                    str(self.ffmpeg_path),
-                    '-ss', f'{time_sec:.2f}',           # Seek BEFORE input (fast!)
-                    '-i', str(video_path),
-                    '-vf', f'scale={self.render_width}:{self.render_height}:force_original_aspect_ratio=decrease,'
-                           f'pad={self.render_width}:{self.render_height}:(ow-iw)/2:(oh-ih)/2:color=black',
-                    '-frames:v', '1',                    # Only 1 frame
-                    '-q:v', str(self.thumbnail_quality), # JPEG quality
-                    '-an',                               # No audio
-                    '-y',                                # Overwrite
-                    str(thumb_path)
-                ]
-                
-                result = subprocess.run(
-                    cmd,
-                    capture_output=True,
-                    timeout=self.ffmpeg_timeout,
-                    startupinfo=startupinfo
-                )
+                self._extract_frame(video_path, time_sec, thumb_path, self._frame_timeout(video_path))
                 
                 if thumb_path.exists():
                     thumbnail_paths.append(str(thumb_path))
-                    self.stats['thumbnails_generated'] += 1
+                    self._stat('thumbnails_generated')
                 else:
-                    self.stats['thumbnails_failed'] += 1
+                    self._stat('thumbnails_failed')
                     
             except subprocess.TimeoutExpired:
-                self.stats['thumbnails_failed'] += 1
+                self._stat('thumbnails_failed')
             except Exception:
-                self.stats['thumbnails_failed'] += 1
+                self._stat('thumbnails_failed')
         
         return thumbnail_paths
 
@@ -284,35 +542,30 @@ class VideoScanner:
         end_time = duration * 0.95
         interval = (end_time - start_time) / (self.thumbnail_count - 1) if self.thumbnail_count > 1 else 0
         
+        try:
+            file_size = os.path.getsize(video_path)
+        except OSError:
+            file_size = 0
+        
+        timestamps = [start_time + interval * i for i in range(self.thumbnail_count)]
+        if self.seek_mode == 'keyframe':
+            keyframes = self._get_keyframes(video_path)
+            if keyframes:
+                # Just past the keyframe, so a seek to the previous keyframe lands on it
+                timestamps = [t + 0.001 for t in nearest_keyframes(timestamps, keyframes)]
+        
         def extract_single_frame(args):
             idx, time_sec = args
             thumb_path = self.thumbnails_dir / f"{video_hash}_{idx}.jpg"
             
             if thumb_path.exists() and not self.regenerate_thumbnails:
                 return (idx, str(thumb_path), 'cached')
+            if self._cancel.is_set():
+                return (idx, None, 'cancelled')
             
             try:
-                startupinfo = self._get_subprocess_startupinfo()
-                
-                cmd = [
-                    str(self.ffmpeg_path),
-                    '-ss', f'{time_sec:.2f}',
-                    '-i', str(video_path),
-                    '-vf', f'scale={self.render_width}:{self.render_height}:force_original_aspect_ratio=decrease,'
-                           f'pad={self.render_width}:{self.render_height}:(ow-iw)/2:(oh-ih)/2:color=black',
-                    '-frames:v', '1',
-                    '-q:v', str(self.thumbnail_quality),
-                    '-an',
-                    '-y',
-                    str(thumb_path)
-                ]
-                
-                subprocess.run(
-                    cmd,
-                    capture_output=True,
-                    timeout=self.ffmpeg_timeout,
-                    startupinfo=startupinfo
-                )
+                self._extract_frame(video_path, time_sec, thumb_path, self._frame_timeout(video_path, file_size),
+                                    self.seek_mode)
                 
                 if thumb_path.exists():
                     return (idx, str(thumb_path), 'generated')
@@ -322,24 +575,33 @@ class VideoScanner:
                 return (idx, None, 'failed')
         
         # Create tasks
-        tasks = [(i, start_time + interval * i) for i in range(self.thumbnail_count)]
+        tasks = list(enumerate(timestamps))
         
         # Parallel execution
         results = [None] * self.thumbnail_count
+        deferred = []
         
         with ThreadPoolExecutor(max_workers=self.thumbnail_workers) as executor:
             futures = {executor.submit(extract_single_frame, task): task[0] for task in tasks}
+            pending = len(futures)
+            self.metrics.gauge('thumbnail_queue', pending)
             
             for future in as_completed(futures):
+                pending -= 1
+                self.metrics.gauge('thumbnail_queue', pending)
                 idx, path, status = future.result()
                 results[idx] = path
                 
                 if status == 'cached':
-                    self.stats['thumbnails_cached'] += 1
+                    self._stat('thumbnails_cached')
                 elif status == 'generated':
-                    self.stats['thumbnails_generated'] += 1
-                else:
-                    self.stats['thumbnails_failed'] += 1
+                    self._stat('thumbnails_generated')
+                elif status == 'failed':
+                    # Counted as failed only if the retry at the end of the scan fails too
+                    deferred.append(tasks[idx])
+        
+        if deferred:
+            self._defer_frames(video_path, video_hash, sorted(deferred))
         
         # Filter None
         return [p for p in results if p]
@@ -367,7 +629,7 @@ class VideoScanner:
                         # Check existence of all files
                         all_exist = all(Path(p).exists() for p in cached_list)
                         if all_exist:
-                            self.stats['thumbnails_cached'] += len(cached_list)
+                            self._stat('thumbnails_cached', len(cached_list))
                             return cached_list[0], cached_list
                 except:
                     pass
@@ -381,11 +643,18 @@ class VideoScanner:
                     existing_files.append(str(p))
             
             if len(existing_files) == self.thumbnail_count:
-                self.stats['thumbnails_cached'] += len(existing_files)
+                self._stat('thumbnails_cached', len(existing_files))
                 return existing_files[0], existing_files
         
+        # Failed in an earlier scan and unchanged since: keep what exists
+        if self._is_known_failure(video_path):
+            existing_files = [str(p) for p in (self.thumbnails_dir / f"{video_hash}_{i}.jpg"
+                                               for i in range(self.thumbnail_count)) if p.exists()]
+            self._stat('thumbnails_cached', len(existing_files))
+            return existing_files[0] if existing_files else None, existing_files
+        
         # STEP 3: Generate thumbnails in parallel
-        start_time = time.time()
+        start_time = time.perf_counter()
         
         # Remove ALL old files for this hash to avoid index conflicts
         for old_file in self.thumbnails_dir.glob(f"{video_hash}_*.jpg"):
@@ -396,8 +665,7 @@ class VideoScanner:
         
         thumbnail_paths = self._create_thumbnails_parallel(video_path, duration, video_hash)
         
-        elapsed = time.time() - start_time
-        self.stats['time_thumbnails'] += elapsed
+        self.metrics.observe('thumbnails', time.perf_counter() - start_time)
         
         return thumbnail_paths[0] if thumbnail_paths else None, thumbnail_paths
 
@@ -420,6 +688,101 @@ class VideoScanner:
             
         return hashlib.md5(key.encode('utf-8')).hexdigest()
 
+    # Content fingerprint sampling: block size and relative offsets (start, middle, end)
+    FINGERPRINT_BLOCK = 64 * 1024
+    FINGERPRINT_SAMPLES = (0.0, 0.5, 1.0)
+
+    def _get_content_fingerprint(self, video_path):
+        """
+        Cheap content identity independent of path and mtime:
+        file size + hash of a few sampled blocks (one positioned read each).
+        """
+        try:
+            size = video_path.stat().st_size
+            digest = hashlib.blake2b(digest_size=16)
+            digest.update(size.to_bytes(8, 'little'))
+
+            block = self.FINGERPRINT_BLOCK
+            with open(video_path, 'rb') as f:
+                fd = f.fileno()
+                for ratio in self.FINGERPRINT_SAMPLES:
+                    offset = max(0, min(int(size * ratio), size - block))
+                    if hasattr(os, 'pread'):
+                        data = os.pread(fd, block, offset)
+                    else:
+                        # Windows has no pread
+                        f.seek(offset)
+                        data = f.read(block)
+                    digest.update(data)
+                    self.metrics.incr('bytes_read', len(data))
+
+            return f"{size:x}-{digest.hexdigest()}"
+        except OSError:
+            return None
+
+    def _claim_moved_video(self, fingerprint):
+        """
+        Find a DB row with the same content whose file no longer exists (moved or renamed).
+        Each row is claimed once per scan, so duplicates don't fight over it.
+        """
+        try:
+            with self.db.get_connection() as conn:
+                conn.row_factory = sqlite3.Row
+                c = conn.cursor()
+                c.execute("SELECT * FROM video_files WHERE fingerprint = ?", (fingerprint,))
+                candidates = [dict(row) for row in c.fetchall()]
+        except sqlite3.Error:
+            return None
+
+        for row in candidates:
+            if Path(row['file_path']).exists():
+                continue
+            with self._moves_lock:
+                if row['id'] in self._claimed_moves:
+                    continue
+                self._claimed_moves.add(row['id'])
+            return row
+        return None
+
+    def _get_cached_embedded_tracks(self, video_id):
+        """Embedded audio/subtitle tracks stored by a previous scan (no ffprobe needed)."""
+        audio_tracks = []
+        subtitle_tracks = []
+        try:
+            with self.db.get_connection() as conn:
+                conn.row_factory = sqlite3.Row
+                c = conn.cursor()
+                c.execute("""
+                    SELECT track_type, stream_index, audio_file_path, audio_file_name, language, title,
+                           codec, bitrate, sample_rate, channels, channel_layout, duration, file_size,
+                           is_default, match_score
+                    FROM audio_tracks WHERE video_id = ? AND track_type = 'embedded'
+                    ORDER BY stream_index
+                """, (video_id,))
+                audio_tracks = [dict(row) for row in c.fetchall()]
+
+                c.execute("""
+                    SELECT track_type, stream_index, subtitle_file_path, subtitle_file_name, language, title,
+                           codec, format, is_default, is_forced, match_score
+                    FROM subtitle_tracks WHERE video_id = ? AND track_type = 'embedded'
+                    ORDER BY stream_index
+                """, (video_id,))
+                subtitle_tracks = [dict(row) for row in c.fetchall()]
+        except sqlite3.Error:
+            return None
+        return audio_tracks, subtitle_tracks
+
+    def _move_marker_thumbnails(self, old_path, new_path):
+        """Re-point cached marker previews (keyed by path hash) to the new path."""
+        marker_thumbs_dir = self.data_dir / 'marker_thumbs'
+        old_dir = marker_thumbs_dir / hashlib.md5(old_path.encode()).hexdigest()
+        new_dir = marker_thumbs_dir / hashlib.md5(new_path.encode()).hexdigest()
+        if old_dir.is_dir() and not new_dir.exists():
+            try:
+                old_dir.rename(new_dir)
+            except OSError:
+                pass
+
     def _get_video_info_with_audio_subs(self, path):
         """
         Get full information about video file via ffprobe.
@@ -432,7 +795,7 @@ class VideoScanner:
         - embedded_audio_tracks: list of embedded audio tracks
         - embedded_subtitle_tracks: list of embedded subtitle tracks
         """
-        start_time = time.time()
+        start_time = time.perf_counter()
         
         duration = 0
         resolution = None
@@ -447,27 +810,11 @@ class VideoScanner:
         
         if self.has_ffprobe:
             try:
-                startupinfo = self._get_subprocess_startupinfo()
+                self.metrics.incr('ffprobe_runs')
+                with self._media_slot(path):
+                    data = self.media.probe(path, timeout=10)
                 
-                result = subprocess.run(
-                    [
-                        str(self.ffprobe_path),
-                        '-v', 'quiet',
-                        '-print_format', 'json',
-                        '-show_format',
-                        '-show_streams',
-                        str(path)
-                    ],
-                    capture_output=True,
-                    encoding='utf-8',
-                    errors='ignore',
-                    timeout=10,
-                    startupinfo=startupinfo
-                )
-                
-                if result.returncode == 0 and result.stdout:
-                    data = json.loads(result.stdout)
-                    
+                if data:
                     # Duration from format
                     if 'format' in data and 'duration' in data['format']:
                         try:
@@ -590,8 +937,7 @@ class VideoScanner:
             except Exception as e:
                 pass
         
-        elapsed = time.time() - start_time
-        self.stats['time_ffprobe'] += elapsed
+        self.metrics.observe('probe', time.perf_counter() - start_time)
         
         return duration, resolution, codec, file_size, embedded_audio_tracks, embedded_subtitle_tracks
 
@@ -616,28 +962,11 @@ class VideoScanner:
         
         if self.has_ffprobe:
             try:
-                startupinfo = self._get_subprocess_startupinfo()
+                self.metrics.incr('ffprobe_runs')
+                with self.metrics.stage('probe_audio'), self._media_slot(audio_path):
+                    data = self.media.probe(audio_path, select_streams='a:0', timeout=5)
                 
-                result = subprocess.run(
-                    [
-                        str(self.ffprobe_path),
-                        '-v', 'quiet',
-                        '-print_format', 'json',
-                        '-show_format',
-                        '-show_streams',
-                        '-select_streams', 'a:0',
-                        str(audio_path)
-                    ],
-                    capture_output=True,
-                    encoding='utf-8',
-                    errors='ignore',
-                    timeout=5,
-                    startupinfo=startupinfo
-                )
-                
-                if result.returncode == 0 and result.stdout:
-                    data = json.loads(result.stdout)
-                    
+                if data:
                     if 'format' in data:
                         fmt = data['format']
                         if 'duration' in fmt:
@@ -676,87 +1005,86 @@ class VideoScanner:
 
     def _normalize_name(self, name):
         """Normalize filename for comparison."""
-        name = Path(name).stem
-        name = name.lower()
-        name = re.sub(r'[_\-\.\[\]\(\)\{\}]', ' ', name)
-        name = re.sub(r'\s+', ' ', name).strip()
-        return name
+        return normalize_name(name)
 
     def _extract_episode_number(self, name):
         """Extract episode/lesson number from filename."""
-        name = Path(name).stem
-        
-        patterns = [
-            r'(?:episode|ep|e|урок|lesson|part|часть|глава|chapter|ch)[\s\.\-_]*(\d+)',
-            r'^(\d+)[\s\.\-_]',
-            r'[\s\.\-_](\d+)[\s\.\-_]',
-            r'[\s\.\-_](\d+)$',
-            r's\d+e(\d+)',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, name, re.IGNORECASE)
-            if match:
-                return int(match.group(1))
-        
-        return None
+        return extract_episode_number(name)
 
     def _calculate_match_score(self, video_name, audio_name):
         """Calculate match score of external audio to video."""
-        score = 0
-        
-        video_norm = self._normalize_name(video_name)
-        audio_norm = self._normalize_name(audio_name)
-        
-        # Exact name match
-        if video_norm == audio_norm:
-            score += 100
-        else:
-            # One name contains the other
-            if video_norm in audio_norm or audio_norm in video_norm:
-                score += 50
-            
-            # Common prefix
-            min_len = min(len(video_norm), len(audio_norm))
-            if min_len > 0:
-                common_prefix = 0
-                for i in range(min_len):
-                    if video_norm[i] == audio_norm[i]:
-                        common_prefix += 1
-                    else:
-                        break
-                score += int(common_prefix / min_len * 30)
-        
-        # Episode number match
-        video_ep = self._extract_episode_number(video_name)
-        audio_ep = self._extract_episode_number(audio_name)
-        if video_ep is not None and audio_ep is not None:
-            if video_ep == audio_ep:
-                score += 40
-        
-        # Language tags
-        lang_patterns = [
-            r'[\[\(]?(rus|russian|ru|рус|русский)[\]\)]?',
-            r'[\[\(]?(eng|english|en|англ|английский)[\]\)]?',
-            r'[\[\(]?(ukr|ukrainian|ua|укр|украинский)[\]\)]?',
-        ]
-        
-        for pattern in lang_patterns:
-            if re.search(pattern, audio_name, re.IGNORECASE):
-                score += 5
-                break
-        
-        return score
+        return calculate_match_score(video_name, audio_name)
+
+    # Folders with fewer (video, sidecar) pairs are scored in the calling thread:
+    # below this, pickling and process round trips cost more than the matching
+    PROCESS_MATCH_MIN_PAIRS = 2000
+
+    def _create_match_pool(self):
+        if self.executor != 'process':
+            return None
+        self._match_workers = self.process_workers or os.cpu_count() or 1
+        return ProcessPoolExecutor(max_workers=self._match_workers)
+
+    def _prepare_folder(self, folder, video_files):
+        """
+        List the folder's audio/subtitle files once and score every
+        (video, sidecar) name pair, in worker processes for big folders
+        with executor = process. _find_external_* read the result.
+        """
+        audio_files, subtitle_files = [], []
+        try:
+            for f in folder.iterdir():
+                suffix = f.suffix.lower()
+                if suffix in self.audio_extensions and f.is_file():
+                    audio_files.append(f)
+                elif suffix in self.subtitle_extensions and f.is_file():
+                    subtitle_files.append(f)
+        except OSError:
+            self._folder_context = None
+            return
+
+        video_names = [f.name for f in video_files]
+        other_names = sorted({f.name for f in audio_files + subtitle_files})
+        scores = {}
+        if other_names:
+            with self.metrics.stage('name_match'):
+                if self._match_pool and len(video_names) * len(other_names) >= self.PROCESS_MATCH_MIN_PAIRS:
+                    size = max(1, -(-len(video_names) // self._match_workers))
+                    chunks = [video_names[i:i + size] for i in range(0, len(video_names), size)]
+                    for part in self._match_pool.map(score_folder, chunks, [other_names] * len(chunks)):
+                        scores.update(part)
+                    self.metrics.incr('name_match_process_batches', len(chunks))
+                else:
+                    scores = score_folder(video_names, other_names)
+
+        self._folder_context = {
+            'folder': folder,
+            'audio': audio_files,
+            'subtitles': subtitle_files,
+            'scores': scores,
+        }
+
+    def _folder_files(self, folder, kind, extensions):
+        """Sidecar files of `folder` from _prepare_folder, or listed now."""
+        context = self._folder_context
+        if context and context['folder'] == folder:
+            return context[kind]
+        return [f for f in folder.iterdir() if f.is_file() and f.suffix.lower() in extensions]
+
+    def _match_score(self, folder, video_name, other_name):
+        context = self._folder_context
+        if context and context['folder'] == folder:
+            score = context['scores'].get((video_name, other_name))
+            if score is not None:
+                return score
+        return calculate_match_score(video_name, other_name)
 
     def _find_external_audio(self, video_file, folder):
         """Find external audio tracks matching video file."""
         external_audio = []
         
         try:
-            audio_files = [
-                f for f in folder.iterdir()
-                if f.is_file() and f.suffix.lower() in self.audio_extensions
-            ]
+            audio_files = self._folder_files(folder, 'audio', self.audio_extensions)
             
             if not audio_files:
                 return []
@@ -767,11 +1095,11 @@ class VideoScanner:
                 audio_name = audio_file.name
                 audio_stem = audio_file.stem.lower()
                 
-                audio_info = self._get_external_audio_info(audio_file)
-                match_score = self._calculate_match_score(video_name, audio_name)
+                match_score = self._match_score(folder, video_name, audio_name)
                 
-                # Minimum match threshold
+                # Minimum match threshold (only matching files are probed)
                 if match_score >= 30:
+                    audio_info = self._get_external_audio_info(audio_file)
                     language = audio_info['language']
                     if not language:
                         lang_patterns = [
@@ -815,10 +1143,7 @@ class VideoScanner:
         external_subtitles = []
         
         try:
-            subtitle_files = [
-                f for f in folder.iterdir()
-                if f.is_file() and f.suffix.lower() in self.subtitle_extensions
-            ]
+            subtitle_files = self._folder_files(folder, 'subtitles', self.subtitle_extensions)
             
             if not subtitle_files:
                 return []
@@ -830,7 +1155,7 @@ class VideoScanner:
                 sub_name = sub_file.name
                 sub_stem = sub_file.stem.lower()
                 
-                match_score = self._calculate_match_score(video_name, sub_name)
+                match_score = self._match_score(folder, video_name, sub_name)
                 
                 # Also check exact name match (video.ru.srt -> video.mp4)
                 if sub_stem.startswith(video_stem):
@@ -901,16 +1226,25 @@ class VideoScanner:
         Process a single video file.
         
         Stages:
-        1. Check cache in DB
+        1. Check cache in DB (by path, then by content fingerprint for moved files)
         2. Get metadata via ffprobe
         3. Generate thumbnails
         4. Find external audio tracks
+        Returns None on error or when the scan was cancelled.
         """
+        if self._cancel.is_set():
+            return None
         try:
             file_path_str = str(video_file)
+            fingerprint = self._get_content_fingerprint(video_file)
             
             # Get existing data from DB
             existing_data = self._get_existing_video_data(file_path_str)
+            moved_from = None
+            if not existing_data and fingerprint:
+                existing_data = self._claim_moved_video(fingerprint)
+                if existing_data:
+                    moved_from = existing_data['file_path']
             saved_audio_selection = None
             
             if existing_data:
@@ -925,6 +1259,8 @@ class VideoScanner:
             file_changed = True
             if existing_data and existing_data.get('file_size') == current_file_size:
                 file_changed = False
+            if existing_data and existing_data.get('fingerprint') and existing_data['fingerprint'] != fingerprint:
+                file_changed = True
             
             # CACHING: if file has not changed
             if not file_changed and existing_data:
@@ -938,7 +1274,8 @@ class VideoScanner:
                 if thumbnails_json:
                     try:
                         thumb_list = json.loads(thumbnails_json)
-                        if not all(Path(p).exists() for p in thumb_list) or len(thumb_list) != self.thumbnail_count:
+                        if not all(Path(p).exists() for p in thumb_list) or (
+                                len(thumb_list) != self.thumbnail_count and not self._is_known_failure(video_file)):
                             # Thumbnails damaged or count mismatch - regenerate
                             # Pass None instead of existing_data to force regenerate all thumbnails
                             thumbnail_path_str, thumb_list = self._create_thumbnails_fast(
@@ -946,17 +1283,33 @@ class VideoScanner:
                             )
                             thumbnails_json = json.dumps(thumb_list) if thumb_list else None
                         else:
-                            self.stats['thumbnails_cached'] += len(thumb_list)
+                            self._stat('thumbnails_cached', len(thumb_list))
                     except:
                         thumbnail_path_str, thumb_list = self._create_thumbnails_fast(
                             video_file, duration, None
                         )
                         thumbnails_json = json.dumps(thumb_list) if thumb_list else None
                 
-                # Scan audio tracks and subtitles anyway (external ones might have changed)
-                _, resolution, codec, file_size, embedded_audio, embedded_subs = self._get_video_info_with_audio_subs(video_file)
-                external_audio = self._find_external_audio(video_file, folder)
-                external_subs = self._find_external_subtitles(video_file, folder)
+                self.progress.add_thumbnailed()
+                
+                # Same content as last scan: reuse stored stream info instead of re-probing
+                cached_tracks = None
+                if fingerprint and existing_data.get('fingerprint') == fingerprint:
+                    cached_tracks = self._get_cached_embedded_tracks(existing_data['id'])
+                
+                if cached_tracks is not None:
+                    embedded_audio, embedded_subs = cached_tracks
+                    resolution = existing_data.get('resolution')
+                    codec = existing_data.get('codec')
+                    file_size = current_file_size
+                else:
+                    _, resolution, codec, file_size, embedded_audio, embedded_subs = self._get_video_info_with_audio_subs(video_file)
+                self.progress.add_probed()
+                
+                # External audio tracks and subtitles might have changed
+                with self.metrics.stage('external_match'):
+                    external_audio = self._find_external_audio(video_file, folder)
+                    external_subs = self._find_external_subtitles(video_file, folder)
                 all_audio_tracks = embedded_audio + external_audio
                 all_subtitle_tracks = embedded_subs + external_subs
                 
@@ -983,11 +1336,14 @@ class VideoScanner:
                     'embedded_subtitle_count': len(embedded_subs),
                     'external_subtitle_count': len(external_subs),
                     'saved_audio_selection': saved_audio_selection,
+                    'fingerprint': fingerprint,
+                    'moved_from': moved_from,
                     'from_cache': True
                 }
             
             # FULL SCAN
             duration, resolution, codec, file_size, embedded_audio, embedded_subs = self._get_video_info_with_audio_subs(video_file)
+            self.progress.add_probed()
             
             thumbnail_path_str = None
             thumbnails_json = None
@@ -999,9 +1355,11 @@ class VideoScanner:
                     thumbnail_path_str = main_thumb
                 if thumb_list:
                     thumbnails_json = json.dumps(thumb_list)
+            self.progress.add_thumbnailed()
             
-            external_audio = self._find_external_audio(video_file, folder)
-            external_subs = self._find_external_subtitles(video_file, folder)
+            with self.metrics.stage('external_match'):
+                external_audio = self._find_external_audio(video_file, folder)
+                external_subs = self._find_external_subtitles(video_file, folder)
             all_audio_tracks = embedded_audio + external_audio
             all_subtitle_tracks = embedded_subs + external_subs
             
@@ -1031,21 +1389,279 @@ class VideoScanner:
                 'embedded_subtitle_count': len(embedded_subs),
                 'external_subtitle_count': len(external_subs),
                 'saved_audio_selection': saved_audio_selection,
+                'fingerprint': fingerprint,
+                'moved_from': moved_from,
                 'from_cache': False
             }
         except Exception as e:
             return None
 
-    def scan_directory(self, root_path):
+    def _index_transcripts(self, c, video_id, subtitle_tracks):
+        """
+        Parse external text subtitles of a video into the cue table.
+        Incremental: files with unchanged mtime and size are skipped.
+        """
+        start_time = time.time()
+        current_paths = set()
+
+        for subtitle in subtitle_tracks:
+            sub_path_str = subtitle.get('subtitle_file_path')
+            if not sub_path_str:
+                continue
+            sub_path = Path(sub_path_str)
+            if sub_path.suffix.lower() not in TRANSCRIPT_EXTENSIONS:
+                continue
+
+            try:
+                stat = sub_path.stat()
+            except OSError:
+                continue
+            current_paths.add(sub_path_str)
+
+            c.execute("SELECT id, video_id, mtime, file_size FROM transcript_files WHERE subtitle_file_path = ?",
+                      (sub_path_str,))
+            row = c.fetchone()
+            if row and row[1] == video_id and row[2] == stat.st_mtime and row[3] == stat.st_size:
+                continue
+
+            if row:
+                c.execute("DELETE FROM subtitle_cues WHERE transcript_id = ?", (row[0],))
+                c.execute("DELETE FROM transcript_files WHERE id = ?", (row[0],))
+
+            c.execute("""
+                INSERT INTO transcript_files (subtitle_file_path, video_id, mtime, file_size)
+                VALUES (?, ?, ?, ?)
+            """, (sub_path_str, video_id, stat.st_mtime, stat.st_size))
+            transcript_id = c.lastrowid
+
+            # Cues are streamed from the parser straight into SQLite
+            try:
+                c.executemany("""
+                    INSERT INTO subtitle_cues (transcript_id, video_id, start_seconds, end_seconds, text)
+                    VALUES (?, ?, ?, ?, ?)
+                """, ((transcript_id, video_id, start, end, text) for start, end, text in iter_cues(sub_path)))
+                cue_count = max(c.rowcount, 0)
+            except (OSError, UnicodeError) as e:
+                print(tr('scanner.transcript_error', file=sub_path.name, error=e))
+                cue_count = 0
+
+            c.execute("UPDATE transcript_files SET cue_count = ? WHERE id = ?", (cue_count, transcript_id))
+            self.metrics.incr('bytes_read', stat.st_size)
+            self.stats['transcripts_indexed'] += 1
+            self.stats['transcript_cues'] += cue_count
+
+        # Drop transcripts of subtitle files no longer matched to this video
+        c.execute("SELECT id, subtitle_file_path FROM transcript_files WHERE video_id = ?", (video_id,))
+        stale_ids = [row[0] for row in c.fetchall() if row[1] not in current_paths]
+        for transcript_id in stale_ids:
+            c.execute("DELETE FROM subtitle_cues WHERE transcript_id = ?", (transcript_id,))
+            c.execute("DELETE FROM transcript_files WHERE id = ?", (transcript_id,))
+
+        self.metrics.observe('transcripts', time.time() - start_time)
+
+    def _prune_missing(self, c, root_str, seen_files, seen_folders, skip_folders, dry_run):
+        """
+        Remove DB entries under root_str that were not seen on disk during this scan.
+        Orphaned videos lose their tracks, markers, tags, transcripts and thumbnails.
+        In dry-run mode nothing is changed; the report lists what would be removed.
+        """
+        def skipped(folder_path):
+            # Folders that could not be listed keep their rows, subfolders included
+            return any(f == '.' or folder_path == f or folder_path.startswith(f + os.sep)
+                       for f in skip_folders)
+
+        c.execute("""
+            SELECT id, file_path, folder_path, thumbnails_json FROM video_files
+            WHERE folder_path IN (SELECT path FROM folders WHERE root_path = ?)
+        """, (root_str,))
+        orphan_videos = [
+            row for row in c.fetchall()
+            if row[1] not in seen_files and not skipped(row[2]) and row[1].startswith(root_str)
+        ]
+
+        c.execute("SELECT path FROM folders WHERE root_path = ?", (root_str,))
+        orphan_folders = [row[0] for row in c.fetchall()
+                          if row[0] not in seen_folders and not skipped(row[0])]
+
+        thumbnail_files = []
+        for _, file_path, _, thumbnails_json in orphan_videos:
+            if thumbnails_json:
+                try:
+                    thumbnail_files.extend(Path(p) for p in json.loads(thumbnails_json))
+                except (ValueError, TypeError):
+                    pass
+
+        report = {
+            'dry_run': dry_run,
+            'videos': [row[1] for row in orphan_videos],
+            'folders': orphan_folders,
+            'thumbnails': len(thumbnail_files)
+        }
+
+        if not orphan_videos and not orphan_folders:
+            return report
+
+        print(f"\n{tr('scanner.prune_title_dry_run' if dry_run else 'scanner.prune_title')}")
+        for file_path in report['videos']:
+            print(tr('scanner.prune_video', path=file_path))
+        for folder_path in orphan_folders:
+            print(tr('scanner.prune_folder', path=folder_path))
+
+        if dry_run:
+            print(tr('scanner.prune_summary_dry_run', videos=len(orphan_videos),
+                     folders=len(orphan_folders), thumbs=len(thumbnail_files)))
+            return report
+
+        video_ids = [(row[0],) for row in orphan_videos]
+        for table in ('audio_tracks', 'subtitle_tracks', 'video_markers', 'video_tags',
+                      'subtitle_cues', 'transcript_files'):
+            c.executemany(f"DELETE FROM {table} WHERE video_id = ?", video_ids)
+        c.executemany("DELETE FROM media_failures WHERE file_path = ?", [(row[1],) for row in orphan_videos])
+        c.executemany("DELETE FROM video_files WHERE id = ?", video_ids)
+        c.executemany("DELETE FROM folders WHERE path = ?", [(p,) for p in orphan_folders])
+
+        # Thumbnails (scanner previews and cached marker previews)
+        marker_thumbs_dir = self.data_dir / 'marker_thumbs'
+        for thumb in thumbnail_files:
+            try:
+                thumb.unlink()
+            except OSError:
+                pass
+        for _, file_path, _, _ in orphan_videos:
+            marker_dir = marker_thumbs_dir / hashlib.md5(file_path.encode()).hexdigest()
+            if marker_dir.is_dir():
+                shutil.rmtree(marker_dir, ignore_errors=True)
+
+        print(tr('scanner.prune_summary', videos=len(orphan_videos),
+                 folders=len(orphan_folders), thumbs=len(thumbnail_files)))
+        return report
+
+    def run_deferred_prunes(self):
+        """
+        Prune the roots scanned with defer_prune=True. Scans of several roots
+        prune once every root was scanned, so a course moved from one root to
+        another is claimed as moved (_claim_moved_video) before its rows go.
+        Returns the prune reports; the last one is kept in last_prune_report.
+        """
+        prunes, self.deferred_prunes = self.deferred_prunes, []
+        reports = []
+        if not prunes:
+            return reports
+        with self.db.get_connection() as conn:
+            c = conn.cursor()
+            for root_str, seen_files, seen_folders, skip_folders, dry_run in prunes:
+                reports.append(self._prune_missing(c, root_str, seen_files, seen_folders, skip_folders, dry_run))
+                conn.commit()
+        self.last_prune_report = reports[-1]
+        return reports
+
+    def _find_video_folders(self, root, failed=None):
+        """
+        Folders under root (root included) that directly contain video files, naturally sorted.
+        Folders that could not be listed are added to `failed` (paths relative to root).
+        """
+        def add_failed(path):
+            if failed is not None:
+                try:
+                    failed.add(str(Path(path).relative_to(root)))
+                except ValueError:
+                    pass
+
+        # os.walk reports unreadable folders (rglob skips them silently);
+        # symlinked folders are checked but not descended into, as before
+        folders = [root]
+        for dirpath, dirnames, _ in os.walk(root, onerror=lambda e: add_failed(e.filename or root)):
+            if self._cancel.is_set():
+                break
+            folders.extend(Path(dirpath) / name for name in dirnames)
+
+        video_folders = []
+        for folder in folders:
+            if self._cancel.is_set():
+                break
+            # Count videos in the folder itself (the total drives progress and ETA)
+            try:
+                count = sum(1 for f in folder.iterdir()
+                            if f.suffix.lower() in self.video_extensions and f.is_file())
+            except OSError:
+                add_failed(folder)
+                continue
+            if count:
+                video_folders.append(folder)
+                self.progress.add_discovered(count)
+        
+        video_folders.sort(key=natural_sort_key)
+        return video_folders
+
+    def plan_directory(self, root_path):
+        """
+        Dry run of scan_directory: what a scan of root_path would find, without
+        probing files or writing to the DB. Changes are judged by file size only
+        (the scan also compares content fingerprints).
+        """
+        root = Path(root_path)
+        root_str = str(root)
+        plan = {'root': root_str, 'exists': root.exists(), 'folders': 0, 'videos': 0,
+                'new': 0, 'changed': 0, 'unchanged': 0, 'missing': 0}
+        if not plan['exists']:
+            return plan
+
+        with self.db.get_connection() as conn:
+            indexed = dict(conn.execute("""
+                SELECT file_path, file_size FROM video_files
+                WHERE folder_path IN (SELECT path FROM folders WHERE root_path = ?)
+            """, (root_str,)).fetchall())
+
+        seen = set()
+        for folder in self._find_video_folders(root):
+            plan['folders'] += 1
+            try:
+                video_files = [f for f in folder.iterdir()
+                               if f.is_file() and f.suffix.lower() in self.video_extensions]
+            except OSError:
+                continue
+            for video_file in video_files:
+                path = str(video_file)
+                seen.add(path)
+                plan['videos'] += 1
+                if path not in indexed:
+                    plan['new'] += 1
+                    continue
+                try:
+                    size = video_file.stat().st_size
+                except OSError:
+                    size = None
+                plan['unchanged' if size == indexed[path] else 'changed'] += 1
+
+        plan['missing'] = sum(1 for path in indexed if path not in seen)
+        return plan
+
+    def scan_directory(self, root_path, prune=None, dry_run=None, incremental_only=False, defer_prune=False):
         """
         Main directory scanning method.
         
         Features:
-        - Incremental addition (does not remove existing data)
+        - Incremental update; entries missing on disk are pruned
+          (prune / dry_run override the [Scan] settings, the report is kept in last_prune_report)
         - Parallel video file processing
         - Thumbnail and metadata caching
         - Save user data (progress, audio selection)
+        - Cancellable (cancel()); each folder is committed and journaled, and a
+          cancelled or crashed scan skips the unchanged folders it already finished
+        - incremental_only: folders whose mtime is older than their last scan are
+          skipped (edits of existing files that keep the folder mtime are missed)
+        - defer_prune: keep the prune for run_deferred_prunes (scans of several roots)
         """
+        self._match_pool = self._create_match_pool()
+        try:
+            return self._scan_directory(root_path, prune, dry_run, incremental_only, defer_prune)
+        finally:
+            self._folder_context = None
+            if self._match_pool:
+                self._match_pool.shutdown(cancel_futures=True)
+                self._match_pool = None
+
+    def _scan_directory(self, root_path, prune, dry_run, incremental_only, defer_prune=False):
         total_start_time = time.time()
         
         print("\n" + "=" * 70)
@@ -1055,6 +1671,11 @@ class VideoScanner:
         root = Path(root_path)
         root_str = str(root)
         print(f"\n{tr('scanner.scan_path', path=root)}")
+        self.metrics.reset(root_str)
+        self.progress.reset(root_str)
+        self._cancel.clear()
+        self.last_scan_cancelled = False
+        self.last_scan_summary = None
 
         if not root.exists():
             print(f"\n{tr('scanner.scan_error_not_exists')}")
@@ -1078,6 +1699,26 @@ class VideoScanner:
                 print(tr('scanner.scan_existing_folders', count=existing_folders))
                 print(tr('scanner.scan_existing_videos', count=existing_videos))
 
+            # Folders committed by an interrupted scan of this root are skipped if unchanged
+            completed_folders = self._journal_begin(c, root_str)
+            self._load_known_failures(c)
+            with self._retry_lock:
+                self._retry_queue = {}
+                self._frame_latency = None
+                self._file_frame_latency = {}
+            conn.commit()
+            if completed_folders:
+                print(f"\n{tr('scanner.scan_resume', count=len(completed_folders))}")
+            resumed_folders = 0
+
+            # Last scan time of each folder (UTC seconds) for incremental_only
+            folder_scanned_at = {}
+            if incremental_only:
+                c.execute("SELECT path, CAST(strftime('%s', last_updated) AS INTEGER) FROM folders WHERE root_path = ?",
+                          (root_str,))
+                folder_scanned_at = {path: ts for path, ts in c.fetchall() if ts is not None}
+            unchanged_folders = 0
+
             total_video_count = 0
             total_folder_count = 0
             new_videos = 0
@@ -1085,6 +1726,8 @@ class VideoScanner:
             total_embedded_audio = 0
             total_external_audio = 0
             restored_audio_selections = 0
+            moved_videos = 0
+            self._claimed_moves.clear()
             total_embedded_subs = 0
             total_external_subs = 0
 
@@ -1092,52 +1735,58 @@ class VideoScanner:
             print(f"\n{tr('scanner.scan_searching')}")
             scan_start = time.time()
             
-            video_folders = []
-            for item in root.rglob('*'):
-                if item.is_dir():
-                    # Check if there are videos in the folder itself
-                    try:
-                        if any(f.suffix.lower() in self.video_extensions for f in item.iterdir() if f.is_file()):
-                            video_folders.append(item)
-                    except:
-                        continue
-            
-            # Also check root
-            try:
-                if any(f.suffix.lower() in self.video_extensions for f in root.iterdir() if f.is_file()):
-                    if root not in video_folders:
-                        video_folders.append(root)
-            except:
-                pass
+            # Everything seen on disk (for pruning); unreadable folders are not pruned
+            failed_folders = set()
+            video_folders = self._find_video_folders(root, failed_folders)
+            self.progress.set_phase(PHASE_SCANNING)
             
-            video_folders.sort(key=natural_sort_key)
+            seen_files = set()
+            seen_folders = set()
+            for rel_path in [folder.relative_to(root) for folder in video_folders] + \
+                    [Path(f) for f in failed_folders]:
+                seen_folders.add(str(rel_path))
+                seen_folders.update(str(p) for p in rel_path.parents if str(p) != '.')
             
             for folder in video_folders:
+                if self._cancel.is_set():
+                    break
                 try:
                     rel_path = folder.relative_to(root)
                     parent = rel_path.parent if str(rel_path.parent) != '.' else ''
                     
                     print(f"\n📁 {rel_path if str(rel_path) != '.' else folder.name}")
+                    self.progress.set_folder(rel_path if str(rel_path) != '.' else folder.name)
                     
                     # List of video files
-                    video_files = sorted(
-                        [f for f in folder.iterdir() if f.is_file() and f.suffix.lower() in self.video_extensions],
-                        key=natural_sort_key
-                    )
+                    try:
+                        video_files = sorted(
+                            [f for f in folder.iterdir() if f.is_file() and f.suffix.lower() in self.video_extensions],
+                            key=natural_sort_key
+                        )
+                    except OSError:
+                        failed_folders.add(str(rel_path))
+                        raise
+                    seen_files.update(str(f) for f in video_files)
                     
                     video_count = len(video_files)
                     
-                    # Insert/update folder
-                    c.execute("""
-                        INSERT INTO folders (path, parent_path, name, video_count, root_path, total_duration, total_size)
-                        VALUES (?, ?, ?, ?, ?, 0, 0)
-                        ON CONFLICT(path) DO UPDATE SET
-                            parent_path = excluded.parent_path,
-                            name = excluded.name,
-                            video_count = excluded.video_count,
-                            root_path = excluded.root_path,
-                            last_updated = CURRENT_TIMESTAMP
-                    """, (str(rel_path), str(parent), folder.name, video_count, root_str))
+                    # Already committed by the interrupted scan this one resumes
+                    folder_mtime = self._folder_mtime(folder)
+                    if folder_mtime is not None and completed_folders.get(str(rel_path)) == folder_mtime:
+                        total_video_count += video_count
+                        resumed_folders += 1
+                        self.progress.add_persisted(video_count)
+                        print(tr('scanner.scan_resume_skipped'))
+                        continue
+                    
+                    # Not modified since it was last scanned (last_updated has 1 s resolution)
+                    scanned_at = folder_scanned_at.get(str(rel_path))
+                    if scanned_at is not None and folder_mtime is not None and folder_mtime < scanned_at:
+                        total_video_count += video_count
+                        unchanged_folders += 1
+                        self.progress.add_persisted(video_count)
+                        print(tr('scanner.scan_unchanged_skipped'))
+                        continue
 
                     # Process video files
                     folder_start = time.time()
@@ -1151,6 +1800,8 @@ class VideoScanner:
                     folder_cached = 0
                     folder_new = 0
                     
+                    self._prepare_folder(folder, video_files)
+                    
                     tasks = [(video_files[i], folder, rel_path, i + 1) 
                              for i in range(len(video_files))]
                     
@@ -1160,7 +1811,11 @@ class VideoScanner:
                     if len(video_files) > 2:
                         with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
                             futures = [executor.submit(self._process_video_file, *task) for task in tasks]
+                            pending = len(futures)
+                            self.metrics.gauge('video_queue', pending)
                             for future in as_completed(futures):
+                                pending -= 1
+                                self.metrics.gauge('video_queue', pending)
                                 result = future.result()
                                 if result:
                                     results.append(result)
@@ -1170,8 +1825,27 @@ class VideoScanner:
                             if result:
                                 results.append(result)
                     
+                    # Cancelled mid-folder: drop its partial rows, it is redone on resume
+                    if self._cancel.is_set():
+                        conn.rollback()
+                        break
+                    
+                    # Insert/update folder. Written after the files are processed so the
+                    # write transaction (and the DB lock) only spans the DB writes.
+                    c.execute("""
+                        INSERT INTO folders (path, parent_path, name, video_count, root_path, total_duration, total_size)
+                        VALUES (?, ?, ?, ?, ?, 0, 0)
+                        ON CONFLICT(path) DO UPDATE SET
+                            parent_path = excluded.parent_path,
+                            name = excluded.name,
+                            video_count = excluded.video_count,
+                            root_path = excluded.root_path,
+                            last_updated = CURRENT_TIMESTAMP
+                    """, (str(rel_path), str(parent), folder.name, video_count, root_str))
+                    
                     # Save results to DB
                     for result in results:
+                        write_start = time.perf_counter()
                         folder_duration += result['duration'] or 0
                         folder_size += result['file_size'] or 0
                         folder_thumbs += result['thumb_count']
@@ -1185,14 +1859,22 @@ class VideoScanner:
                         else:
                             folder_new += 1
                         
+                        # Moved/renamed file: re-point the old row so progress, markers and tags stay
+                        if result.get('moved_from'):
+                            c.execute("UPDATE video_files SET file_path = ? WHERE file_path = ?",
+                                      (result['file_path'], result['moved_from']))
+                            self._move_marker_thumbnails(result['moved_from'], result['file_path'])
+                            moved_videos += 1
+                        
                         # Upsert video
                         c.execute("""
                             INSERT INTO video_files
                             (folder_path, file_path, file_name, track_number,
                              duration, resolution, file_size, codec,
                              thumbnail_path, thumbnails_json, watched_percent, last_position,
-                             audio_track_count, selected_audio_id, subtitle_track_count, selected_subtitle_id)
-                            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, NULL, ?, NULL)
+                             audio_track_count, selected_audio_id, subtitle_track_count, selected_subtitle_id,
+                             fingerprint)
+                            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, NULL, ?, NULL, ?)
                             ON CONFLICT(file_path) DO UPDATE SET
                                 folder_path = excluded.folder_path,
                                 file_name = excluded.file_name,
@@ -1204,13 +1886,15 @@ class VideoScanner:
                                 thumbnail_path = excluded.thumbnail_path,
                                 thumbnails_json = excluded.thumbnails_json,
                                 audio_track_count = excluded.audio_track_count,
-                                subtitle_track_count = excluded.subtitle_track_count
+                                subtitle_track_count = excluded.subtitle_track_count,
+                                fingerprint = excluded.fingerprint
                         """, (
                             result['folder_path'], result['file_path'], result['file_name'],
                             result['track_number'], result['duration'], result['resolution'],
                             result['file_size'], result['codec'], result['thumbnail_path'],
                             result['thumbnails_json'], result['watched_percent'], result['last_position'],
-                            result['audio_track_count'], result['subtitle_track_count']
+                            result['audio_track_count'], result['subtitle_track_count'],
+                            result['fingerprint']
                         ))
                         
                         # Video ID
@@ -1275,7 +1959,13 @@ class VideoScanner:
                                 subtitle['is_forced'], subtitle['match_score']
                             ))
                         
+                        # Index subtitle text for transcript search
+                        if self.index_transcripts:
+                            self._index_transcripts(c, video_id, result.get('subtitle_tracks', []))
+                        
                         total_video_count += 1
+                        self.metrics.observe('db_write', time.perf_counter() - write_start)
+                        self.progress.add_persisted()
                     
                     total_embedded_audio += folder_embedded_audio
                     total_external_audio += folder_external_audio
@@ -1318,10 +2008,55 @@ class VideoScanner:
                     
                     print(tr('scanner.process_info', info=' | '.join(info_parts)))
 
+                    # Checkpoint: the folder is durable and skipped if the scan is resumed
+                    self._journal_folder_done(c, root_str, str(rel_path), folder_mtime)
+                    conn.commit()
+
                 except Exception as e:
                     print(tr('scanner.process_error', error=f"{type(e).__name__}: {e}"))
                     continue
 
+            self.progress.set_phase(PHASE_FINISHING)
+
+            if not self._cancel.is_set():
+                self._retry_deferred_thumbnails(c)
+                conn.commit()
+
+            if self._cancel.is_set():
+                # No prune or hierarchy pass on a partial view of the disk
+                self._journal_finish(c, root_str, 'cancelled')
+                conn.commit()
+                self.last_scan_cancelled = True
+                self.last_scan_summary = {
+                    'root': root_str, 'videos': total_video_count, 'folders': len(video_folders),
+                    'new': new_videos, 'cached': cached_videos, 'moved': moved_videos,
+                    'resumed_folders': resumed_folders, 'unchanged_folders': unchanged_folders,
+                    'cancelled': True, 'elapsed_s': round(time.time() - total_start_time, 3),
+                }
+                self.metrics.flush()
+                self.progress.set_phase(PHASE_CANCELLED)
+                print(f"\n{tr('scanner.scan_cancelled')}")
+                return total_video_count, len(video_folders)
+
+            # Remove entries that no longer exist on disk (before the hierarchy
+            # pass, so stale parents are not recreated)
+            do_prune = self.prune_missing if prune is None else prune
+            do_dry_run = self.prune_dry_run if dry_run is None else dry_run
+            self.last_prune_report = None
+            if do_prune:
+                if not video_folders:
+                    # An empty scan usually means an unmounted or unreadable drive
+                    print(f"\n{tr('scanner.prune_skipped_empty')}")
+                elif defer_prune:
+                    # A root scanned later may still claim these rows as moved files
+                    self.deferred_prunes.append(
+                        (root_str, seen_files, seen_folders, failed_folders, do_dry_run)
+                    )
+                else:
+                    self.last_prune_report = self._prune_missing(
+                        c, root_str, seen_files, seen_folders, failed_folders, do_dry_run
+                    )
+
             # Create folder hierarchy
             print(f"\n{tr('scanner.hierarchy_building')}")
             
@@ -1342,11 +2077,34 @@ class VideoScanner:
                         """, (current, parent, Path(current).name, root_str))
                         added.add(current)
 
+            self._journal_finish(c, root_str, 'complete')
             conn.commit()
 
         # Final statistics
         total_time = time.time() - total_start_time
         self.stats['time_total'] = total_time
+        self.stats['time_ffprobe'] += self.metrics.stage_total('probe') + self.metrics.stage_total('probe_audio')
+        self.stats['time_thumbnails'] += self.metrics.stage_total('thumbnails')
+        self.stats['time_transcripts'] += self.metrics.stage_total('transcripts')
+
+        self.metrics.incr('videos', total_video_count)
+        self.metrics.incr('videos_cached', cached_videos)
+        self.metrics.incr('videos_new', new_videos)
+        self.metrics.incr('videos_moved', moved_videos)
+        self.metrics.incr('folders', len(video_folders))
+        self.last_scan_summary = {
+            'root': root_str, 'videos': total_video_count, 'folders': len(video_folders),
+            'new': new_videos, 'cached': cached_videos, 'moved': moved_videos,
+            'resumed_folders': resumed_folders, 'unchanged_folders': unchanged_folders,
+            'cancelled': False, 'elapsed_s': round(total_time, 3),
+        }
+        self.metrics.flush()
+        self.progress.set_phase(PHASE_DONE)
+        if self.save_metrics_report:
+            self.last_metrics_report = self.metrics.save_report(
+                self.reports_dir, extra={'total_time_s': round(total_time, 3), 'stats': dict(self.stats),
+                                         'governor': self.governor.snapshot()}
+            )
         
         print("\n" + "=" * 70)
         print(tr('scanner.scan_complete_title'))
@@ -1358,46 +2116,245 @@ class VideoScanner:
         print(tr('scanner.stats_videos', count=total_video_count))
         print(tr('scanner.stats_cached', count=cached_videos))
         print(tr('scanner.stats_new', count=new_videos))
+        print(tr('scanner.stats_moved', count=moved_videos))
         print(f"   {'─' * 40}")
         print(tr('scanner.stats_thumbs_title'))
         print(tr('scanner.stats_thumbs_generated', count=self.stats['thumbnails_generated']))
         print(tr('scanner.stats_thumbs_cached', count=self.stats['thumbnails_cached']))
         print(tr('scanner.stats_thumbs_failed', count=self.stats['thumbnails_failed']))
+        if self.stats['thumbnails_deferred']:
+            print(tr('scanner.stats_thumbs_recovered', count=self.stats['thumbnails_recovered'],
+                     deferred=self.stats['thumbnails_deferred']))
         print(f"   {'─' * 40}")
         print(tr('scanner.stats_audio_title'))
         print(tr('scanner.stats_audio_embedded', count=total_embedded_audio))
         print(tr('scanner.stats_audio_external', count=total_external_audio))
         print(tr('scanner.stats_audio_restored', count=restored_audio_selections))
         print(f"   {'─' * 40}")
+        if self.index_transcripts:
+            print(tr('scanner.stats_transcripts_title'))
+            print(tr('scanner.stats_transcripts_indexed', count=self.stats['transcripts_indexed']))
+            print(tr('scanner.stats_transcripts_cues', count=self.stats['transcript_cues']))
+            print(f"   {'─' * 40}")
         print(tr('scanner.stats_time_title'))
         print(tr('scanner.stats_time_ffprobe', time=f"{self.stats['time_ffprobe']:.1f}"))
         print(tr('scanner.stats_time_thumbs', time=f"{self.stats['time_thumbnails']:.1f}"))
+        print(tr('scanner.stats_time_transcripts', time=f"{self.stats['time_transcripts']:.1f}"))
         print(tr('scanner.stats_time_total', time=f"{total_time:.1f}"))
         
         if self.stats['thumbnails_generated'] > 0:
             avg_thumb_time = self.stats['time_thumbnails'] / self.stats['thumbnails_generated'] * 1000
             print(tr('scanner.stats_time_avg', time=f"{avg_thumb_time:.0f}"))
+
+        if self.last_metrics_report:
+            print(tr('scanner.metrics_report_saved', path=self.last_metrics_report))
         
         print()
 
         return total_video_count, len(video_folders)
 
 
-def main():
-    scanner = VideoScanner()
+# scanner.py exit codes
+EXIT_OK = 0
+EXIT_FAILED = 1      # a root is missing or its scan raised
+EXIT_USAGE = 2       # bad arguments (argparse)
+EXIT_CANCELLED = 130  # interrupted (Ctrl+C); the next scan resumes
 
-    config = configparser.ConfigParser()
-    config.read(scanner.config_file, encoding='utf-8')
 
-    default_path = config.get('Paths', 'default_path', fallback=r'D:\Courses')
+def _parse_args(argv):
+    import argparse
+    parser = argparse.ArgumentParser(
+        prog='scanner.py',
+        description="Scan course folders into the library database without the GUI."
+    )
+    parser.add_argument('roots', nargs='*',
+                        help="folders to scan (default: [Paths] default_path from the config)")
+    parser.add_argument('--config', default='video_course_browser.ini',
+                        help="settings file (relative to the app folder)")
+    parser.add_argument('--data-dir', help="folder with video_courses.db and thumbnails (default: data/)")
+    parser.add_argument('--parallel-roots', type=int, default=1, metavar='N',
+                        help="roots scanned at the same time (default: 1)")
+    parser.add_argument('--workers', type=int, metavar='N', help="video workers per folder ([Performance] max_workers)")
+    parser.add_argument('--thumbnail-workers', type=int, metavar='N',
+                        help="frame extractions per video ([Performance] thumbnail_workers)")
+    parser.add_argument('--executor', choices=('thread', 'process'),
+                        help="CPU-bound stages in threads or worker processes ([Performance] executor)")
+    parser.add_argument('--process-workers', type=int, metavar='N',
+                        help="worker processes for --executor process (default: CPU count)")
+    parser.add_argument('--media-processes', type=int, metavar='N',
+                        help="cap on concurrent ffmpeg/ffprobe processes ([Performance] media_processes)")
+    parser.add_argument('--thumbnails', choices=('ffmpeg', 'none'), default='ffmpeg',
+                        help="thumbnail engine; 'none' indexes without generating thumbnails")
+    parser.add_argument('--seek-mode', choices=('accurate', 'keyframe'),
+                        help="thumbnail seeking ([Thumbnails] seek_mode)")
+    parser.add_argument('--regenerate-thumbnails', action='store_true', default=None,
+                        help="regenerate existing thumbnails ([Thumbnails] regenerate)")
+    parser.add_argument('--prune', action=argparse.BooleanOptionalAction, default=None,
+                        help="remove DB entries missing on disk ([Scan] prune_missing)")
+    parser.add_argument('--incremental-only', action='store_true',
+                        help="skip folders not modified since their last scan")
+    parser.add_argument('--dry-run', action='store_true',
+                        help="report what would be scanned; nothing is probed or written")
+    parser.add_argument('--json', action='store_true',
+                        help="JSON lines on stdout (progress events and summaries); log goes to stderr")
+    parser.add_argument('-q', '--quiet', action='store_true', help="no log output")
+    args = parser.parse_args(argv)
+    if args.parallel_roots < 1:
+        parser.error("--parallel-roots must be at least 1")
+    return args
 
-    import sys
-    path = sys.argv[1] if len(sys.argv) > 1 else default_path
 
-    video_count, folder_count = scanner.scan_directory(path)
-    
-    print(tr('scanner.scanner_units.done', folder_count=folder_count, video_count=video_count))
+def main(argv=None):
+    """Headless scan: `python scanner.py [roots...] [options]`; returns an exit code."""
+    from dataclasses import asdict
+    from concurrent.futures import wait, FIRST_COMPLETED
+
+    args = _parse_args(argv)
+
+    # Log (localized prose) to stderr in JSON mode, so stdout stays machine-readable
+    out = sys.stdout
+    if args.quiet:
+        sys.stdout = open(os.devnull, 'w', encoding='utf-8')
+    elif args.json:
+        sys.stdout = sys.stderr
+
+    out_lock = threading.Lock()
+
+    def emit(record):
+        if args.json:
+            with out_lock:
+                out.write(json.dumps(record, ensure_ascii=False) + '\n')
+                out.flush()
+
+    def new_scanner():
+        scanner = VideoScanner(args.config, data_dir=args.data_dir)
+        if args.workers:
+            scanner.max_workers = args.workers
+        if args.thumbnail_workers:
+            scanner.thumbnail_workers = args.thumbnail_workers
+        if args.media_processes:
+            scanner.governor.configure(args.media_processes, scanner.media_per_device)
+        if args.executor:
+            scanner.executor = args.executor
+        if args.process_workers:
+            scanner.process_workers = args.process_workers
+        if args.seek_mode:
+            scanner.seek_mode = args.seek_mode
+        if args.regenerate_thumbnails:
+            scanner.regenerate_thumbnails = True
+        if args.thumbnails == 'none':
+            scanner.has_ffmpeg = False
+        return scanner
+
+    try:
+        first = new_scanner()
+        roots = args.roots
+        if not roots:
+            config = configparser.ConfigParser()
+            config.read(first.config_file, encoding='utf-8')
+            roots = [config.get('Paths', 'default_path', fallback=r'D:\Courses')]
+
+        results = []
+        exit_code = EXIT_OK
+
+        if args.dry_run:
+            for root in roots:
+                plan = first.plan_directory(root)
+                if not plan['exists']:
+                    print(f"\n{tr('scanner.scan_path', path=root)}")
+                    print(tr('scanner.scan_error_not_exists'))
+                    exit_code = EXIT_FAILED
+                else:
+                    print(tr('scanner.cli_plan', **plan))
+                results.append(plan)
+                emit(dict(plan, type='plan'))
+            emit({'type': 'summary', 'dry_run': True, 'exit_code': exit_code, 'roots': results})
+            return exit_code
+
+        # One scanner per root: scan state (metrics, progress, journal, stats) is per scanner.
+        # Each folder is its own short write transaction, so parallel roots share the DB.
+        scanners = {roots[0]: first}
+        for root in roots[1:]:
+            scanners[root] = new_scanner()
+        for scanner in scanners.values():
+            scanner.progress.add_listener(lambda event: emit(dict(asdict(event), type='progress')))
+        # With several roots, pruning waits for all of them: a course moved
+        # between roots is then claimed as moved rather than deleted
+        defer_prune = len(scanners) > 1
+
+        def prune_summary(report):
+            return {key: len(value) if isinstance(value, list) else value for key, value in report.items()}
+
+        def scan_root(root):
+            scanner = scanners[root]
+            if not Path(root).exists():
+                print(f"\n{tr('scanner.scan_path', path=root)}")
+                print(tr('scanner.scan_error_not_exists'))
+                return {'root': root, 'error': 'not_found'}
+            try:
+                scanner.scan_directory(root, prune=args.prune, incremental_only=args.incremental_only,
+                                       defer_prune=defer_prune)
+            except Exception as e:
+                print(tr('scanner.process_error', error=f"{type(e).__name__}: {e}"))
+                return {'root': root, 'error': f"{type(e).__name__}: {e}"}
+            summary = dict(scanner.last_scan_summary or {'root': root})
+            summary['stats'] = {k: v for k, v in scanner.stats.items() if not k.startswith('time_')}
+            if scanner.last_prune_report:
+                summary['prune'] = prune_summary(scanner.last_prune_report)
+            if scanner.last_metrics_report:
+                summary['metrics_report'] = str(scanner.last_metrics_report)
+            return summary
+
+        cancelled = False
+        with ThreadPoolExecutor(max_workers=min(args.parallel_roots, len(roots))) as executor:
+            # Results are reported in argv order; summaries carry the normalized root path
+            order = {executor.submit(scan_root, root): i for i, root in enumerate(roots)}
+            pending = set(order)
+            finished = []
+            while pending:
+                try:
+                    done, pending = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+                except KeyboardInterrupt:
+                    # Finished folders are committed and journaled; the next scan resumes
+                    cancelled = True
+                    for scanner in scanners.values():
+                        scanner.cancel()
+                    for future in pending:
+                        future.cancel()
+                    continue
+                for future in done:
+                    if future.cancelled():
+                        continue
+                    summary = future.result()
+                    finished.append((order[future], summary))
+                    emit(dict(summary, type='root'))
+
+        results = [summary for _, summary in sorted(finished, key=lambda item: item[0])]
+        if defer_prune and not cancelled and not any(r.get('cancelled') for r in results):
+            for index, summary in sorted(finished, key=lambda item: item[0]):
+                if summary.get('error'):
+                    continue
+                reports = scanners[roots[index]].run_deferred_prunes()
+                if reports:
+                    summary['prune'] = prune_summary(reports[-1])
+        if any(r.get('error') for r in results):
+            exit_code = EXIT_FAILED
+        if cancelled or any(r.get('cancelled') for r in results):
+            exit_code = EXIT_CANCELLED
+
+        total_videos = sum(r.get('videos', 0) for r in results)
+        total_folders = sum(r.get('folders', 0) for r in results)
+        print(tr('scanner.scanner_units.done', folders=total_folders, videos=total_videos))
+        emit({'type': 'summary', 'dry_run': False, 'exit_code': exit_code,
+              'videos': total_videos, 'folders': total_folders, 'roots': results,
+              'governor': get_governor().snapshot()})
+        return exit_code
+    finally:
+        if sys.stdout is not out:
+            if args.quiet:
+                sys.stdout.close()
+            sys.stdout = out
 
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    sys.exit(main())
@@ -3,6 +3,7 @@ import os
 import configparser
 import time
 import io
+import threading
 from pathlib import Path
 
 from PyQt6.QtWidgets import (
@@ -55,9 +56,38 @@ class OutputCapture(io.StringIO):
         if self._real_stdout:
             self._real_stdout.flush()
 
+class BufferedOutputCapture(io.StringIO):
+    """Collects print output from worker threads; the UI drains it on a timer."""
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.Lock()
+        self._chunks = []
+        self._real_stdout = sys.__stdout__
+
+    def write(self, text):
+        if text and ('\r' in text or text.strip()):
+            with self._lock:
+                self._chunks.append(text if '\r' in text else text.rstrip())
+
+        # Also write to real stdout for debugging
+        if self._real_stdout:
+            self._real_stdout.write(text)
+        return len(text)
+
+    def drain(self):
+        with self._lock:
+            chunks, self._chunks = self._chunks, []
+        return chunks
+
+    def flush(self):
+        if self._real_stdout:
+            self._real_stdout.flush()
+
 class ScannerThread(QThread):
     """Background thread for scanning directories"""
     progress = pyqtSignal(str)  # Log message
+    metrics = pyqtSignal(object)  # ScanMetrics snapshot dict
+    scan_progress = pyqtSignal(object)  # scan_progress.ScanProgress
     finished_scan = pyqtSignal(int, int)  # total_videos, total_folders
     
     def __init__(self, config_file, paths, ffmpeg_path=None, ffprobe_path=None):
@@ -68,12 +98,22 @@ class ScannerThread(QThread):
         self.ffprobe_path = ffprobe_path
         self.total_videos = 0
         self.total_folders = 0
+        self.scanner = None
+        self.cancelled = False
+        # Scanner output; ScanProgressDialog appends it in batches
+        self.log = BufferedOutputCapture()
+    
+    def cancel(self):
+        """Stop after the current files; the remaining paths are skipped."""
+        self.cancelled = True
+        if self.scanner:
+            self.scanner.cancel()
     
     def run(self):
         try:
             # Redirect stdout to capture print statements
             old_stdout = sys.stdout
-            sys.stdout = OutputCapture(self.progress)
+            sys.stdout = self.log
             
             # Check for ffmpeg/ffprobe before starting
             ffmpeg_path = self.ffmpeg_path or (RESOURCES_DIR / 'bin/ffmpeg.exe')
@@ -99,11 +139,23 @@ class ScannerThread(QThread):
             
             from scanner import VideoScanner
             scanner = VideoScanner(str(self.config_file))
+            scanner.metrics.add_listener(self.metrics.emit)
+            scanner.progress.add_listener(self.scan_progress.emit)
+            self.scanner = scanner
             
+            # With several roots, pruning waits for all of them: a course moved
+            # between roots is then claimed as moved rather than deleted
+            defer_prune = len(self.paths) > 1
             for path in self.paths:
-                videos, folders = scanner.scan_directory(path)
+                if self.cancelled:
+                    break
+                videos, folders = scanner.scan_directory(path, defer_prune=defer_prune)
                 self.total_videos += videos
                 self.total_folders += folders
+                if scanner.last_scan_cancelled:
+                    self.cancelled = True
+            if not self.cancelled:
+                scanner.run_deferred_prunes()
             
             sys.stdout = old_stdout
             self.finished_scan.emit(self.total_videos, self.total_folders)
@@ -149,7 +201,7 @@ class ScanProgressDialog(QDialog):
         self.status_label.setObjectName("scanStatusLabel")
         layout.addWidget(self.status_label)
         
-        # Progress bar (indeterminate)
+        # Progress bar (indeterminate until the scanner has counted the files)
         self.progress_bar = QProgressBar()
         self.progress_bar.setObjectName("scanProgressBar")
         self.progress_bar.setTextVisible(True)
@@ -157,25 +209,106 @@ class ScanProgressDialog(QDialog):
         self.progress_bar.setRange(0, 0)  # Indeterminate
         layout.addWidget(self.progress_bar)
         
+        # Files/sec and ETA
+        self.throughput_label = QLabel()
+        self.throughput_label.setObjectName("scanThroughputLabel")
+        self.throughput_label.hide()
+        layout.addWidget(self.throughput_label)
+        
+        # Stage timings and process counts from the scanner's metrics
+        self.metrics_label = QLabel()
+        self.metrics_label.setObjectName("scanMetricsLabel")
+        self.metrics_label.setWordWrap(True)
+        self.metrics_label.hide()
+        layout.addWidget(self.metrics_label)
+        
         # Console output
         self.console = QTextEdit()
         self.console.setObjectName("scanConsole")
         self.console.setReadOnly(True)
+        # Keep huge scans responsive: only the latest lines are kept
+        self.console.document().setMaximumBlockCount(5000)
         layout.addWidget(self.console, 1)
         
-        # Close button (disabled during scan)
+        # Cancel (during scan) / Close (after it)
+        buttons_layout = QHBoxLayout()
+        self.cancel_btn = QPushButton(tr('scan_dialog.cancel'))
+        self.cancel_btn.clicked.connect(self.cancel_scan)
+        buttons_layout.addWidget(self.cancel_btn)
+        
         self.close_btn = QPushButton(tr('scan_dialog.close'))
         self.close_btn.setEnabled(False)
         self.close_btn.clicked.connect(self.accept)
-        layout.addWidget(self.close_btn)
+        buttons_layout.addWidget(self.close_btn)
+        layout.addLayout(buttons_layout)
         
         self.scanner_thread = None
+        
+        # Scanner output is appended in batches
+        self.log_timer = QTimer(self)
+        self.log_timer.setInterval(200)
+        self.log_timer.timeout.connect(self.flush_log)
     
     def start_scan(self, config_file, paths, ffmpeg_path=None, ffprobe_path=None):
         self.scanner_thread = ScannerThread(config_file, paths, ffmpeg_path, ffprobe_path)
         self.scanner_thread.progress.connect(self.append_log)
+        self.scanner_thread.metrics.connect(self.update_metrics)
+        self.scanner_thread.scan_progress.connect(self.update_progress)
         self.scanner_thread.finished_scan.connect(self.on_scan_finished)
         self.scanner_thread.start()
+        self.log_timer.start()
+    
+    def cancel_scan(self):
+        """Stop the scan; finished folders are kept and resumed by the next scan."""
+        if self.scanner_thread and self.scanner_thread.isRunning():
+            self.scanner_thread.cancel()
+            self.cancel_btn.setEnabled(False)
+            self.status_label.setText(tr('scan_dialog.cancelling'))
+    
+    def flush_log(self):
+        """Append everything the scanner printed since the last tick in one go."""
+        if not self.scanner_thread:
+            return
+        chunks = self.scanner_thread.log.drain()
+        if not chunks:
+            return
+        
+        lines = []
+        for chunk in chunks:
+            if '\r' in chunk:
+                # Progress line: replaces the previous one, so flush what came before
+                if lines:
+                    self.console.append('\n'.join(lines))
+                    lines = []
+                self.append_log(chunk)
+            else:
+                lines.append(chunk)
+        if lines:
+            self.append_log('\n'.join(lines))
+    
+    def update_progress(self, event):
+        """Progress bar, status and throughput from a ScanProgress event."""
+        if event.discovered:
+            self.progress_bar.setRange(0, event.discovered)
+            self.progress_bar.setValue(min(event.persisted, event.discovered))
+            self.progress_bar.setFormat("%v / %m (%p%)")
+        
+        if self.scanner_thread and self.scanner_thread.cancelled:
+            pass  # keep "Cancelling..."
+        elif event.phase == 'finishing':
+            self.status_label.setText(tr('scan_dialog.finishing'))
+        elif event.current_folder:
+            self.status_label.setText(tr('scan_dialog.scanning_folder', folder=event.current_folder))
+        
+        if event.phase == 'scanning' and event.discovered:
+            if event.eta_seconds is None:
+                eta = tr('scan_dialog.eta_unknown')
+            else:
+                minutes, seconds = divmod(int(event.eta_seconds), 60)
+                eta = f"{minutes}:{seconds:02d}"
+            self.throughput_label.setText(tr('scan_dialog.throughput',
+                                             rate=f"{event.files_per_sec:.1f}", eta=eta))
+            self.throughput_label.show()
     
     def append_log(self, text):
         if '\r' in text:
@@ -192,10 +325,38 @@ class ScanProgressDialog(QDialog):
         scrollbar = self.console.verticalScrollBar()
         scrollbar.setValue(scrollbar.maximum())
     
+    def update_metrics(self, snapshot):
+        """Show per-stage p50/p95 and process counts from a ScanMetrics snapshot."""
+        counters = snapshot.get('counters', {})
+        lines = [tr('scan_dialog.metrics_processes',
+                    ffprobe=counters.get('ffprobe_runs', 0),
+                    ffmpeg=counters.get('ffmpeg_runs', 0),
+                    mb=f"{counters.get('bytes_read', 0) / (1024 * 1024):.1f}")]
+
+        stages = snapshot.get('stages', {})
+        for stage in ('media_wait', 'probe', 'name_match', 'external_match', 'thumbnails', 'db_write'):
+            data = stages.get(stage)
+            if not data or not data['count']:
+                continue
+            lines.append(tr('scan_dialog.metrics_stage',
+                            stage=tr(f'scan_dialog.stage_{stage}'),
+                            p50=f"{data['p50_ms']:.0f}", p95=f"{data['p95_ms']:.0f}"))
+
+        self.metrics_label.setText('  ·  '.join(lines))
+        self.metrics_label.show()
+
     def on_scan_finished(self, videos, folders):
+        self.log_timer.stop()
+        self.flush_log()
         self.progress_bar.setRange(0, 100)
         self.progress_bar.setValue(100)
-        self.status_label.setText(tr('scan_dialog.complete', folders=folders, videos=videos))
+        self.progress_bar.setFormat("%p%")
+        self.throughput_label.hide()
+        if self.scanner_thread and self.scanner_thread.cancelled:
+            self.status_label.setText(tr('scan_dialog.cancelled', folders=folders, videos=videos))
+        else:
+            self.status_label.setText(tr('scan_dialog.complete', folders=folders, videos=videos))
+        self.cancel_btn.setEnabled(False)
         self.close_btn.setEnabled(True)
     
     def closeEvent(self, event):
@@ -0,0 +1,128 @@
+"""
+Startup profile harness.
+
+Set VCP_STARTUP_PROFILE=1 to print, after the main window is interactive,
+how long each startup step and each imported module took. Any other value
+is used as a path to also save the report as JSON, e.g.:
+
+    VCP_STARTUP_PROFILE=data/startup_profile.json python main.py
+
+Does nothing (and wraps nothing) when the variable is not set.
+"""
+import os
+import sys
+import json
+import time
+import importlib.abc
+
+ENV_VAR = 'VCP_STARTUP_PROFILE'
+
+_started = time.perf_counter()
+_last_mark = _started
+_enabled = False
+_reported = False
+_steps = []     # [(step, seconds since previous mark, seconds since start)]
+_imports = {}   # {module: (cumulative seconds, self seconds)}
+_stack = []     # time spent in nested imports of the module being executed
+
+
+class _TimingLoader(importlib.abc.Loader):
+    """Wraps a module loader and measures exec_module."""
+
+    def __init__(self, loader):
+        self.loader = loader
+
+    def create_module(self, spec):
+        return self.loader.create_module(spec)
+
+    def exec_module(self, module):
+        _stack.append(0.0)
+        t0 = time.perf_counter()
+        try:
+            self.loader.exec_module(module)
+        finally:
+            total = time.perf_counter() - t0
+            nested = _stack.pop()
+            if _stack:
+                _stack[-1] += total
+            _imports[module.__name__] = (total, total - nested)
+
+    def __getattr__(self, name):
+        # get_resource_reader, get_filename, is_package, ...
+        return getattr(self.loader, name)
+
+
+class _TimingFinder(importlib.abc.MetaPathFinder):
+    """Delegates to the other finders and wraps the loader they return."""
+
+    def find_spec(self, fullname, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, 'find_spec'):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is None:
+                continue
+            if spec.loader is not None and hasattr(spec.loader, 'exec_module'):
+                spec.loader = _TimingLoader(spec.loader)
+            return spec
+        return None
+
+
+def install():
+    """Start profiling if requested through the environment. Call before other imports."""
+    global _enabled
+    if _enabled or not os.environ.get(ENV_VAR):
+        return _enabled
+    _enabled = True
+    sys.meta_path.insert(0, _TimingFinder())
+    return True
+
+
+def enabled():
+    return _enabled
+
+
+def mark(step):
+    """Record the time spent since the previous mark under `step`."""
+    global _last_mark
+    if not _enabled:
+        return
+    now = time.perf_counter()
+    _steps.append((step, now - _last_mark, now - _started))
+    _last_mark = now
+
+
+def report(top=25):
+    """Print the steps and the slowest imports (once); save JSON if a path was given."""
+    global _reported
+    if not _enabled or _reported:
+        return
+    _reported = True
+
+    print("=" * 60)
+    print("Startup profile")
+    print("-" * 60)
+    for step, seconds, total in _steps:
+        print(f"{step:<32} {seconds * 1000:9.1f} ms {total * 1000:9.1f} ms")
+
+    print("-" * 60)
+    print(f"{'Slowest imports (self time)':<32} {'self':>12} {'cumulative':>12}")
+    slowest = sorted(_imports.items(), key=lambda kv: kv[1][1], reverse=True)[:top]
+    for module, (cumulative, self_time) in slowest:
+        print(f"{module:<32} {self_time * 1000:9.1f} ms {cumulative * 1000:9.1f} ms")
+    print("=" * 60)
+
+    target = os.environ.get(ENV_VAR, '')
+    if target and target != '1':
+        data = {
+            'steps': [{'step': s, 'ms': round(sec * 1000, 2), 'total_ms': round(t * 1000, 2)}
+                      for s, sec, t in _steps],
+            'imports': {m: {'self_ms': round(st * 1000, 2), 'cumulative_ms': round(c * 1000, 2)}
+                        for m, (c, st) in _imports.items()},
+        }
+        try:
+            with open(target, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2)
+            print(f"Startup profile saved to {target}")
+        except OSError as e:
+            print(f"Error saving startup profile: {e}")
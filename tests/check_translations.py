@@ -1,8 +1,13 @@
 import os
 import re
+import sys
 import json
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from translator import flatten_translations
+
 def get_translation_keys_from_code(project_root):
     """Scan .py files for tr('key') or tr("key") patterns."""
     keys = set()
@@ -28,16 +33,12 @@ def get_translation_keys_from_code(project_root):
                     
     return keys
 
-def check_key_in_translations(key, translations):
-    """Check if a dot-separated key exists in the translations dict."""
-    parts = key.split('.')
-    current = translations
-    for part in parts:
-        if isinstance(current, dict) and part in current:
-            current = current[part]
-        else:
-            return False
-    return True
+def check_key_in_translations(key, flat):
+    """Check if a dot-separated key exists in the flattened translations (leaf or section)."""
+    if key in flat:
+        return True
+    prefix = key + '.'
+    return any(k.startswith(prefix) for k in flat)
 
 def main():
     # Assuming the script is in SPVideoCoursesPlayer/tests/
@@ -66,7 +67,7 @@ def main():
         
         try:
             with open(trans_file, 'r', encoding='utf-8') as f:
-                translations = json.load(f)
+                translations = flatten_translations(json.load(f))
         except Exception as e:
             print(f"  Error loading {trans_file.name}: {e}")
             continue
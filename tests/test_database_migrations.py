@@ -0,0 +1,168 @@
+"""
+DatabaseManager schema migrations: upgrade of a pre-migration DB, the
+fast path for a current DB and rollback of a failing migration.
+
+Run: python -m pytest tests/test_database_migrations.py
+"""
+import sys
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from database import DatabaseManager
+
+LATEST = DatabaseManager.MIGRATIONS[-1][0]
+
+# Schema written by app versions before versioned migrations (no schema_version
+# table; later columns such as is_favorite were added with ALTER TABLE)
+LEGACY_SCHEMA = """
+CREATE TABLE folders (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    path TEXT UNIQUE NOT NULL,
+    parent_path TEXT,
+    name TEXT NOT NULL,
+    root_path TEXT,
+    is_folder INTEGER DEFAULT 1,
+    is_expanded INTEGER DEFAULT 0,
+    video_count INTEGER DEFAULT 0,
+    total_duration REAL DEFAULT 0,
+    total_size INTEGER DEFAULT 0,
+    last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE video_files (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    folder_path TEXT NOT NULL,
+    file_path TEXT UNIQUE NOT NULL,
+    file_name TEXT,
+    track_number INTEGER,
+    duration REAL DEFAULT 0,
+    resolution TEXT,
+    file_size INTEGER DEFAULT 0,
+    codec TEXT,
+    thumbnail_path TEXT,
+    thumbnails_json TEXT,
+    watched_percent INTEGER DEFAULT 0,
+    last_position REAL DEFAULT 0,
+    audio_track_count INTEGER DEFAULT 0,
+    selected_audio_id INTEGER DEFAULT NULL,
+    subtitle_track_count INTEGER DEFAULT 0,
+    selected_subtitle_id INTEGER DEFAULT NULL,
+    volume INTEGER DEFAULT 100,
+    subtitles_enabled INTEGER DEFAULT 0
+);
+ALTER TABLE video_files ADD COLUMN is_favorite INTEGER DEFAULT 0;
+CREATE TABLE video_markers (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    video_id INTEGER NOT NULL,
+    position_seconds REAL NOT NULL,
+    label TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE tags (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT UNIQUE NOT NULL,
+    color TEXT DEFAULT '#3498db'
+);
+CREATE TABLE video_tags (
+    video_id INTEGER NOT NULL,
+    tag_id INTEGER NOT NULL,
+    PRIMARY KEY(video_id, tag_id)
+);
+INSERT INTO folders (path, parent_path, name, root_path) VALUES ('Course', '', 'Course', 'D:\\Courses');
+INSERT INTO video_files (folder_path, file_path, file_name, watched_percent, last_position, is_favorite)
+    VALUES ('Course', 'D:\\Courses\\Course\\01.mp4', '01.mp4', 55, 120.5, 1);
+INSERT INTO video_markers (video_id, position_seconds, label) VALUES (1, 30, 'Intro');
+"""
+
+
+def _columns(conn, table):
+    return {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+
+
+def _tables(conn):
+    return {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+
+
+def test_legacy_database_is_upgraded(tmp_path):
+    db_path = tmp_path / 'legacy.db'
+    conn = sqlite3.connect(db_path)
+    conn.executescript(LEGACY_SCHEMA)
+    conn.close()
+
+    DatabaseManager(db_path)
+
+    conn = sqlite3.connect(db_path)
+    try:
+        versions = [row[0] for row in conn.execute("SELECT version FROM schema_version ORDER BY version")]
+        assert versions == [m[0] for m in DatabaseManager.MIGRATIONS]
+        # User data survives, columns missing from the old schema are added
+        assert conn.execute(
+            "SELECT watched_percent, last_position, is_favorite FROM video_files"
+        ).fetchone() == (55, 120.5, 1)
+        assert conn.execute("SELECT label, color FROM video_markers").fetchone() == ('Intro', '#FFD700')
+        assert 'fingerprint' in _columns(conn, 'video_files')
+        assert {'transcript_files', 'scan_runs', 'media_failures'} <= _tables(conn)
+    finally:
+        conn.close()
+
+
+def test_current_database_runs_no_ddl(tmp_path, monkeypatch):
+    db_path = tmp_path / 'current.db'
+    DatabaseManager(db_path)
+
+    statements = []
+    connect = sqlite3.connect
+
+    def traced_connect(*args, **kwargs):
+        conn = connect(*args, **kwargs)
+        conn.set_trace_callback(statements.append)
+        return conn
+
+    monkeypatch.setattr(sqlite3, 'connect', traced_connect)
+    DatabaseManager(db_path)
+
+    executed = [' '.join(s.split()).upper() for s in statements]
+    assert executed and all(
+        s.startswith('SELECT') or s.startswith('CREATE TABLE IF NOT EXISTS SCHEMA_VERSION') for s in executed
+    ), executed
+
+
+class BrokenMigrationManager(DatabaseManager):
+    MIGRATIONS = DatabaseManager.MIGRATIONS + [(LATEST + 1, 'broken', '_migration_broken')]
+
+    def _migration_broken(self, c):
+        c.execute("CREATE TABLE half_done (id INTEGER)")
+        c.execute("ALTER TABLE video_files ADD COLUMN half_done INTEGER")
+        raise RuntimeError("migration failed halfway")
+
+
+class FixedMigrationManager(BrokenMigrationManager):
+    def _migration_broken(self, c):
+        c.execute("CREATE TABLE half_done (id INTEGER)")
+
+
+def test_failed_migration_is_rolled_back(tmp_path):
+    db_path = tmp_path / 'broken.db'
+    DatabaseManager(db_path)
+
+    with pytest.raises(RuntimeError):
+        BrokenMigrationManager(db_path)
+
+    conn = sqlite3.connect(db_path)
+    try:
+        assert conn.execute("SELECT MAX(version) FROM schema_version").fetchone()[0] == LATEST
+        assert 'half_done' not in _tables(conn)
+        assert 'half_done' not in _columns(conn, 'video_files')
+    finally:
+        conn.close()
+
+    # A fixed release applies the migration on the next start
+    FixedMigrationManager(db_path)
+    conn = sqlite3.connect(db_path)
+    try:
+        assert conn.execute("SELECT MAX(version) FROM schema_version").fetchone()[0] == LATEST + 1
+    finally:
+        conn.close()
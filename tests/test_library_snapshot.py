@@ -0,0 +1,60 @@
+"""
+Library snapshot round trip and DB generation counter.
+
+Run: python -m pytest tests/test_library_snapshot.py
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from database import DatabaseManager
+import library_snapshot
+
+
+def _add_video(db):
+    with db.get_connection() as conn:
+        conn.execute(
+            "INSERT INTO folders (path, parent_path, name, root_path, video_count) VALUES ('c', NULL, 'c', 'R', 1)"
+        )
+        conn.execute(
+            """INSERT INTO video_files (folder_path, file_path, file_name, track_number, duration, thumbnails_json)
+               VALUES ('c', 'R\\c\\1.mp4', '1.mp4', 1, 60, '["a.jpg", "b.jpg"]')"""
+        )
+
+
+def test_generation_tracks_library_changes(tmp_path):
+    db = DatabaseManager(tmp_path / 'library.db')
+    start = db.get_library_generation()
+    assert start == 0
+
+    _add_video(db)
+    after_insert = db.get_library_generation()
+    assert after_insert > start
+
+    with db.get_connection() as conn:
+        conn.execute("UPDATE video_files SET last_position = 10")
+    assert db.get_library_generation() > after_insert
+
+
+def test_snapshot_round_trip(tmp_path):
+    db = DatabaseManager(tmp_path / 'library.db')
+    _add_video(db)
+    folders, videos = db.get_courses()
+    path = tmp_path / 'library_snapshot.bin'
+
+    assert library_snapshot.save_snapshot(path, db.get_library_generation(), folders, videos)
+    generation, s_folders, s_videos = library_snapshot.load_snapshot(path)
+
+    assert generation == db.get_library_generation()
+    assert [f['path'] for f in s_folders] == ['c']
+    assert s_videos[0]['file_path'] == 'R\\c\\1.mp4'
+    assert s_videos[0]['thumbnails'] == ['a.jpg', 'b.jpg']
+    assert library_snapshot.parse_thumbnails(s_videos[0]) == ['a.jpg', 'b.jpg']
+
+
+def test_corrupt_snapshot_is_ignored(tmp_path):
+    path = tmp_path / 'library_snapshot.bin'
+    assert library_snapshot.load_snapshot(path) is None
+    path.write_bytes(b'not a snapshot')
+    assert library_snapshot.load_snapshot(path) is None
@@ -0,0 +1,76 @@
+"""
+media_governor.MediaGovernor: limits, priority order and per-device caps.
+
+Run: python -m pytest tests/test_media_governor.py
+"""
+import sys
+import time
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from media_governor import MediaGovernor, PRIORITY_INTERACTIVE, PRIORITY_MARKERS, PRIORITY_SCAN
+
+
+def _wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+
+
+def test_scan_leaves_a_slot_for_interactive():
+    gov = MediaGovernor(max_processes=3)
+    scans = [gov.try_acquire(PRIORITY_SCAN) for _ in range(3)]
+    assert scans[2] is None  # scanning stops at max - 1
+
+    preview = gov.try_acquire(PRIORITY_INTERACTIVE)
+    assert preview is not None
+    assert gov.try_acquire(PRIORITY_MARKERS) is None
+
+    gov.release(preview)
+    gov.release(preview)  # idempotent
+    assert gov.snapshot()['active'] == 2
+
+
+def test_waiters_are_served_by_priority():
+    gov = MediaGovernor(max_processes=2)
+    held = gov.acquire(PRIORITY_MARKERS)
+    blocker = gov.acquire(PRIORITY_MARKERS)
+    order = []
+
+    def worker(priority):
+        slot = gov.acquire(priority)
+        order.append(priority)
+        gov.release(slot)
+
+    scan = threading.Thread(target=worker, args=(PRIORITY_SCAN,))
+    scan.start()
+    _wait_for(lambda: gov.snapshot()['waiting'] == 1)
+    preview = threading.Thread(target=worker, args=(PRIORITY_INTERACTIVE,))
+    preview.start()
+    _wait_for(lambda: gov.snapshot()['waiting'] == 2)
+
+    gov.release(held)
+    gov.release(blocker)
+    scan.join(2)
+    preview.join(2)
+    assert order == [PRIORITY_INTERACTIVE, PRIORITY_SCAN]
+
+    waits = gov.snapshot()['waits']
+    assert waits['scan']['count'] == 1 and waits['scan']['max_ms'] > 0
+
+
+def test_per_device_limit(tmp_path):
+    gov = MediaGovernor(max_processes=8, per_device=1)
+    video = tmp_path / 'a.mp4'
+    video.write_bytes(b'x')
+
+    first = gov.acquire(PRIORITY_SCAN, video)
+    assert gov.acquire(PRIORITY_SCAN, video, timeout=0.05) is None
+    # A path that can't be stat'ed counts against the disk of its parent folder
+    assert gov.acquire(PRIORITY_SCAN, tmp_path / 'missing' / 'b.mp4', timeout=0.05) is None
+    assert gov.acquire(PRIORITY_SCAN, timeout=0.01) is not None  # no device: total cap only
+    gov.release(first)
+    assert gov.acquire(PRIORITY_SCAN, video, timeout=0.05) is not None
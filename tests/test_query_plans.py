@@ -0,0 +1,239 @@
+"""
+Query plan audit for DatabaseManager and VideoScanner.
+
+Every SQL statement issued by the database layer and by a library scan is
+captured with a trace callback and run through EXPLAIN QUERY PLAN against a
+synthetic library of 100k videos. Hot paths must be served by indices.
+
+Run: python -m pytest tests/test_query_plans.py
+"""
+import sys
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from database import DatabaseManager
+from scanner import VideoScanner
+
+VIDEO_COUNT = 100_000
+VIDEOS_PER_FOLDER = 50
+ROOT_PATH = 'D:\\Courses'
+
+# Statements that read or wipe whole tables by design (library load, reset)
+BULK_STATEMENTS = (
+    'SELECT * FROM folders ORDER BY path',
+    'SELECT v.*',                                 # get_courses: all videos
+    'SELECT vt.video_id, t.id, t.name, t.color',  # get_courses: all tags
+    'SELECT * FROM tags ORDER BY name',           # tag list (tiny table)
+    'SELECT file_path, file_size FROM media_failures',  # known failures, once per scan
+    'DELETE FROM',                                # clear_all_metadata (without WHERE)
+    'SELECT MAX(version) FROM schema_version',
+)
+
+
+def _build_synthetic_library(db):
+    """Fills the DB with folders, videos, tracks, markers, tags and transcripts."""
+    folder_count = VIDEO_COUNT // VIDEOS_PER_FOLDER
+    with db.get_connection() as conn:
+        c = conn.cursor()
+        c.executemany(
+            "INSERT INTO folders (path, parent_path, name, root_path, video_count) VALUES (?, ?, ?, ?, ?)",
+            ((f"course_{f // 20}\\module_{f}", f"course_{f // 20}", f"module_{f}", ROOT_PATH, VIDEOS_PER_FOLDER)
+             for f in range(folder_count))
+        )
+        c.executemany(
+            """INSERT INTO video_files (id, folder_path, file_path, file_name, track_number, duration, file_size)
+               VALUES (?, ?, ?, ?, ?, 600, 1000000)""",
+            ((v + 1,
+              f"course_{(v // VIDEOS_PER_FOLDER) // 20}\\module_{v // VIDEOS_PER_FOLDER}",
+              f"{ROOT_PATH}\\video_{v}.mp4", f"video_{v}.mp4", v % VIDEOS_PER_FOLDER + 1)
+             for v in range(VIDEO_COUNT))
+        )
+        c.executemany(
+            """INSERT INTO audio_tracks (video_id, video_file_path, track_type, stream_index)
+               VALUES (?, ?, 'embedded', 1)""",
+            ((v + 1, f"{ROOT_PATH}\\video_{v}.mp4") for v in range(VIDEO_COUNT))
+        )
+        c.executemany(
+            """INSERT INTO subtitle_tracks (video_id, video_file_path, track_type, subtitle_file_path)
+               VALUES (?, ?, 'external', ?)""",
+            ((v + 1, f"{ROOT_PATH}\\video_{v}.mp4", f"{ROOT_PATH}\\video_{v}.srt") for v in range(VIDEO_COUNT))
+        )
+        c.executemany(
+            "INSERT INTO video_markers (video_id, position_seconds, label) VALUES (?, ?, 'marker')",
+            ((v % VIDEO_COUNT + 1, v % 600) for v in range(0, VIDEO_COUNT * 2, 3))
+        )
+        c.executemany("INSERT INTO tags (id, name) VALUES (?, ?)", ((t, f"tag_{t}") for t in range(1, 101)))
+        c.executemany(
+            "INSERT INTO video_tags (video_id, tag_id) VALUES (?, ?)",
+            ((v + 1, v % 100 + 1) for v in range(0, VIDEO_COUNT, 2))
+        )
+        c.executemany(
+            "INSERT INTO transcript_files (id, subtitle_file_path, video_id) VALUES (?, ?, ?)",
+            ((v + 1, f"{ROOT_PATH}\\video_{v}.srt", v + 1) for v in range(0, VIDEO_COUNT, 10))
+        )
+        c.executemany(
+            """INSERT INTO subtitle_cues (transcript_id, video_id, start_seconds, end_seconds, text)
+               VALUES (?, ?, ?, ?, ?)""",
+            ((v + 1, v + 1, i * 5, i * 5 + 4, f"lecture {v} phrase {i} gradient descent")
+             for v in range(0, VIDEO_COUNT, 10) for i in range(5))
+        )
+        conn.commit()
+
+
+def _capture_statements(db, monkeypatch):
+    """Records every statement sent through DatabaseManager.get_connection."""
+    statements = []
+    original = DatabaseManager.get_connection
+
+    def traced_connection(self, timeout=10):
+        conn = original(self, timeout)
+        conn.set_trace_callback(statements.append)
+        return conn
+
+    monkeypatch.setattr(DatabaseManager, 'get_connection', traced_connection)
+    return statements
+
+
+def _exercise_database_manager(db):
+    """Calls every query method of DatabaseManager once."""
+    path = f"{ROOT_PATH}\\video_4242.mp4"
+    folder = "course_4\\module_84"
+
+    db.get_existing_video_data(path)
+    db.save_progress(path, 30, 600)
+    db.update_folder_expanded_state(folder, True)
+    db.load_audio_tracks(path)
+    db.load_subtitle_tracks(path)
+    db.get_video_session(path)
+    db.get_track_info('audio_tracks', 10)
+    db.get_track_info('subtitle_tracks', 10)
+    db.save_selected_audio(path, 10)
+    db.save_selected_subtitle(path, 10, True)
+    db.save_selected_subtitle(path, 10)
+    db.update_subtitle_enabled(path, False)
+    db.get_courses()
+    db.mark_video_as_watched(path)
+    db.mark_folder_as_watched(folder)
+    db.reset_folder_progress(folder)
+    db.reset_video_progress(path)
+    db.get_video_progress(path)
+    db.get_marker_count(path)
+    db.get_video_info(path)
+    marker_id = db.add_marker(path, 12.5, 'audit')
+    db.get_markers(path)
+    db.update_marker(marker_id, 'audit', '#FFFFFF', 13.0)
+    db.update_marker(marker_id, 'audit', '#FFFFFF')
+    db.delete_marker(marker_id)
+    db.toggle_favorite(path)
+    db.get_tags()
+    tag_id = db.create_tag('audit_tag')
+    db.add_tag_to_video(path, tag_id)
+    db.get_video_tags(path)
+    db.remove_tag_from_video(path, tag_id)
+    db.delete_tag(tag_id)
+    db.search_transcripts('gradient desc')
+
+
+def _exercise_scanner(tmp_path):
+    """Runs a scan of a tiny library (existing DB content stays 100k rows)."""
+    library = tmp_path / 'library'
+    for course in ('01 Intro', '02 Basics\\Part 1'):
+        folder = library.joinpath(*course.split('\\'))
+        folder.mkdir(parents=True)
+        for i in range(3):
+            (folder / f"{i + 1:02d} lesson.mp4").write_bytes(b'\0' * 1024)
+            (folder / f"{i + 1:02d} lesson.srt").write_text(
+                f"1\n00:00:01,000 --> 00:00:02,000\nLesson {i} text\n", encoding='utf-8'
+            )
+
+    scanner = VideoScanner(str(tmp_path / 'missing.ini'), data_dir=tmp_path)
+    scanner.index_transcripts = True
+    scanner.scan_directory(str(library))
+    # Second pass takes the cached/incremental paths
+    scanner.scan_directory(str(library))
+
+
+def _is_auditable(sql):
+    head = sql.lstrip().split(None, 1)[0].upper() if sql.strip() else ''
+    if head not in ('SELECT', 'INSERT', 'UPDATE', 'DELETE', 'WITH'):
+        return False
+    # Catalog lookups and FTS5 shadow-table housekeeping are not app queries
+    return 'sqlite_master' not in sql and '_fts_' not in sql
+
+
+def _is_bulk(sql):
+    normalized = ' '.join(sql.split())
+    if normalized.startswith('DELETE FROM') and ' WHERE ' in normalized:
+        return False
+    return any(normalized.startswith(prefix) for prefix in BULK_STATEMENTS)
+
+
+def _full_scans(conn, sql):
+    """Returns plan lines that walk a whole table or index."""
+    plan = conn.execute(f"EXPLAIN QUERY PLAN {sql}").fetchall()
+    scans = []
+    for row in plan:
+        detail = row[3]
+        if not detail.startswith('SCAN '):
+            continue
+        if 'VIRTUAL TABLE' in detail or 'CONSTANT ROW' in detail:
+            continue
+        scans.append(detail)
+    return scans
+
+
+@pytest.fixture(scope='module')
+def audit(tmp_path_factory):
+    tmp_path = tmp_path_factory.mktemp('query_plans')
+    db = DatabaseManager(tmp_path / 'video_courses.db')
+    _build_synthetic_library(db)
+
+    monkeypatch = pytest.MonkeyPatch()
+    statements = _capture_statements(db, monkeypatch)
+    try:
+        _exercise_database_manager(db)
+        _exercise_scanner(tmp_path)
+    finally:
+        monkeypatch.undo()
+
+    unique = list(dict.fromkeys(s for s in statements if _is_auditable(s)))
+    conn = sqlite3.connect(tmp_path / 'video_courses.db')
+    yield conn, unique
+    conn.close()
+
+
+def test_statements_were_captured(audit):
+    _, statements = audit
+    # Sanity check that tracing works for both the manager and the scanner
+    assert any('FROM video_markers' in s for s in statements)
+    assert any('INSERT INTO video_files' in s for s in statements)
+    assert any('subtitle_cues' in s for s in statements)
+
+
+def test_no_full_scans_on_hot_paths(audit):
+    conn, statements = audit
+    offenders = {}
+    for sql in statements:
+        if _is_bulk(sql):
+            continue
+        scans = _full_scans(conn, sql)
+        if scans:
+            offenders[' '.join(sql.split())[:200]] = scans
+    assert not offenders, "Full table scans:\n" + "\n".join(f"{k}\n    {v}" for k, v in offenders.items())
+
+
+def test_library_videos_read_in_index_order(audit):
+    conn, statements = audit
+    library_query = next(s for s in statements if ' '.join(s.split()).startswith('SELECT v.*'))
+    plan = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {library_query}")]
+    assert not any('TEMP B-TREE' in line for line in plan), plan
+
+
+def test_schema_is_current(audit):
+    conn, _ = audit
+    version = conn.execute("SELECT MAX(version) FROM schema_version").fetchone()[0]
+    assert version == DatabaseManager.MIGRATIONS[-1][0]
@@ -0,0 +1,96 @@
+"""
+Headless scanner CLI (scanner.main): JSON output and exit codes.
+
+Runs without ffmpeg: files are indexed without stream info or thumbnails.
+
+Run: python -m pytest tests/test_scanner_cli.py
+"""
+import sys
+import json
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import scanner
+from database import DatabaseManager
+
+
+def _make_root(path, modules=2, lessons=3):
+    for m in range(1, modules + 1):
+        folder = path / f"{m:02d}. {path.name} Module"
+        folder.mkdir(parents=True)
+        for n in range(1, lessons + 1):
+            (folder / f"{n:02d}. Lesson.mp4").write_bytes(f"{path.name} {m} {n}".encode() * 100)
+    return path
+
+
+def _run(tmp_path, capsys, *args):
+    code = scanner.main(['--config', str(tmp_path / 'missing.ini'), '--data-dir', str(tmp_path / 'data'),
+                         '--json', '--thumbnails', 'none', *map(str, args)])
+    records = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    return code, records
+
+
+def test_parallel_roots_json_summary(tmp_path, capsys):
+    first = _make_root(tmp_path / 'First')
+    second = _make_root(tmp_path / 'Second', modules=1)
+
+    code, records = _run(tmp_path, capsys, '--parallel-roots', '2', first, second)
+    assert code == scanner.EXIT_OK
+
+    summary = records[-1]
+    assert summary['type'] == 'summary'
+    assert (summary['videos'], summary['folders']) == (9, 3)
+    assert [r['root'] for r in summary['roots']] == [str(first), str(second)]
+    assert {r['type'] for r in records[:-1]} == {'progress', 'root'}
+
+    # Dry run against the populated DB: nothing new, nothing written
+    (first / '01. First Module' / '01. Lesson.mp4').unlink()
+    (second / '01. Second Module' / '09. Extra.mp4').write_bytes(b'extra' * 100)
+    code, records = _run(tmp_path, capsys, '--dry-run', first, second)
+    assert code == scanner.EXIT_OK
+    plans = records[-1]['roots']
+    assert (plans[0]['unchanged'], plans[0]['missing']) == (5, 1)
+    assert (plans[1]['new'], plans[1]['unchanged']) == (1, 3)
+
+
+def test_missing_root_exit_code(tmp_path, capsys):
+    root = _make_root(tmp_path / 'Library', modules=1)
+
+    code, records = _run(tmp_path, capsys, root, tmp_path / 'Unmounted')
+    assert code == scanner.EXIT_FAILED
+    roots = records[-1]['roots']
+    assert roots[0]['videos'] == 3
+    assert roots[1] == {'root': str(tmp_path / 'Unmounted'), 'error': 'not_found'}
+
+
+def test_root_with_trailing_slash(tmp_path, capsys):
+    root = _make_root(tmp_path / 'Library', modules=1)
+
+    code, records = _run(tmp_path, capsys, str(root) + '/')
+    assert code == scanner.EXIT_OK
+    summary = records[-1]
+    assert [r['root'] for r in summary['roots']] == [str(root)]
+    assert summary['videos'] == 3
+
+
+def test_course_moved_between_roots_keeps_progress(tmp_path, capsys):
+    first = _make_root(tmp_path / 'First')
+    second = _make_root(tmp_path / 'Second', modules=1)
+    assert _run(tmp_path, capsys, first, second)[0] == scanner.EXIT_OK
+
+    db = DatabaseManager(tmp_path / 'data' / 'video_courses.db')
+    with db.get_connection() as conn:
+        conn.execute("UPDATE video_files SET last_position = 42")
+
+    # The first root is scanned (and would be pruned) before the second claims the move
+    (first / '02. First Module').rename(second / '02. First Module')
+    code, records = _run(tmp_path, capsys, first, second)
+    assert code == scanner.EXIT_OK
+    assert records[-1]['roots'][1]['moved'] == 3
+
+    with db.get_connection() as conn:
+        rows = conn.execute("SELECT file_path, last_position FROM video_files").fetchall()
+    assert len(rows) == 9
+    assert all(position == 42 for _, position in rows)
+    assert sum(path.startswith(str(second)) for path, _ in rows) == 6
@@ -0,0 +1,386 @@
+"""
+VideoScanner against media_backend.FakeMediaBackend: no ffmpeg, no real media.
+
+Run: python -m pytest tests/test_scanner_fake_backend.py
+"""
+import os
+import sys
+import json
+import shutil
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from scanner import VideoScanner
+from media_backend import FakeMediaBackend, nearest_keyframes
+from scan_metrics import Histogram
+
+LESSONS = 4
+
+
+def _make_library(root):
+    folder = root / 'Course' / '01. Basics'
+    folder.mkdir(parents=True)
+    for n in range(1, LESSONS + 1):
+        (folder / f"{n:02d}. Lesson.mp4").write_bytes(f"lesson {n}".encode() * 1000)
+    (folder / "01. Lesson.ru.srt").write_text("1\n00:00:00,000 --> 00:00:01,000\nHi\n", encoding='utf-8')
+    return folder
+
+
+def _scanner(tmp_path, backend):
+    return VideoScanner(config_file=str(tmp_path / 'missing.ini'),
+                        data_dir=tmp_path / 'data', media_backend=backend)
+
+
+def test_cold_then_warm_scan(tmp_path):
+    root = tmp_path / 'library'
+    _make_library(root)
+
+    cold_backend = FakeMediaBackend(duration=120.0, subtitle_streams=1)
+    cold = _scanner(tmp_path, cold_backend)
+    videos, folders = cold.scan_directory(str(root))
+
+    assert (videos, folders) == (LESSONS, 1)
+    assert cold_backend.calls['probe'] == LESSONS
+    assert cold_backend.calls['frame'] == LESSONS * cold.thumbnail_count
+    assert cold.stats['thumbnails_generated'] == LESSONS * cold.thumbnail_count
+
+    counters = cold.metrics.snapshot()['counters']
+    assert counters['ffprobe_runs'] == LESSONS
+    assert counters['ffmpeg_runs'] == LESSONS * cold.thumbnail_count
+    assert counters['bytes_read'] > 0
+    report = json.loads(cold.last_metrics_report.read_text(encoding='utf-8'))
+    assert report['stages']['probe']['count'] == LESSONS
+    assert report['stages']['db_write']['count'] == LESSONS
+
+    with cold.db.get_connection() as conn:
+        rows = conn.execute("SELECT duration, resolution, codec FROM video_files").fetchall()
+        assert rows == [(120.0, '1280x720', 'h264')] * LESSONS
+        subs = conn.execute(
+            "SELECT track_type, COUNT(*) FROM subtitle_tracks GROUP BY track_type ORDER BY track_type"
+        ).fetchall()
+        assert subs == [('embedded', LESSONS), ('external', 1)]
+
+    # Unchanged files: stream info and thumbnails come from the DB
+    warm_backend = FakeMediaBackend(duration=120.0, subtitle_streams=1)
+    warm = _scanner(tmp_path, warm_backend)
+    assert warm.scan_directory(str(root)) == (LESSONS, 1)
+    assert warm_backend.calls == {'probe': 0, 'frame': 0, 'keyframes': 0}
+    assert warm.stats['thumbnails_cached'] == LESSONS * warm.thumbnail_count
+
+
+def test_progress_events(tmp_path):
+    root = tmp_path / 'library'
+    _make_library(root)
+
+    scan = _scanner(tmp_path, FakeMediaBackend())
+    events = []
+    scan.progress.add_listener(events.append)
+    scan.scan_directory(str(root))
+
+    assert events[0].phase == 'discovering'
+    last = events[-1]
+    assert last.phase == 'done'
+    assert (last.discovered, last.probed, last.thumbnailed, last.persisted) == (LESSONS,) * 4
+    assert last.eta_seconds == 0.0
+
+
+def test_failed_probe_still_indexes_file(tmp_path):
+    root = tmp_path / 'library'
+    _make_library(root)
+
+    backend = FakeMediaBackend(fail=('02.',))
+    scan = _scanner(tmp_path, backend)
+    assert scan.scan_directory(str(root)) == (LESSONS, 1)
+
+    with scan.db.get_connection() as conn:
+        row = conn.execute(
+            "SELECT duration, resolution FROM video_files WHERE file_name = '02. Lesson.mp4'"
+        ).fetchone()
+    assert row == (0, None)
+
+
+def test_histogram_percentiles():
+    hist = Histogram()
+    for ms in (1, 1, 1, 1, 1, 1, 1, 1, 1, 400):
+        hist.observe(ms / 1000)
+    assert hist.percentile(0.5) == 0.001
+    assert hist.percentile(0.95) == 0.4  # capped at the observed max
+    assert hist.to_dict()['count'] == 10
+
+
+class CancellingBackend(FakeMediaBackend):
+    """Cancels the scan once `after` probes have run."""
+
+    def __init__(self, after, **kwargs):
+        super().__init__(**kwargs)
+        self.after = after
+        self.scanner = None
+
+    def probe(self, path, select_streams=None, timeout=10):
+        result = super().probe(path, select_streams, timeout)
+        if self.calls['probe'] >= self.after:
+            self.scanner.cancel()
+        return result
+
+
+def test_cancelled_scan_resumes(tmp_path):
+    root = tmp_path / 'library'
+    for module in ('01. Basics', '02. Advanced', '03. Projects'):
+        folder = root / 'Course' / module
+        folder.mkdir(parents=True)
+        for n in range(1, 3):
+            (folder / f"{n:02d}. Lesson.mp4").write_bytes(f"{module} {n}".encode() * 100)
+
+    backend = CancellingBackend(after=3)
+    first = _scanner(tmp_path, backend)
+    backend.scanner = first
+    first.scan_directory(str(root))
+    assert first.last_scan_cancelled
+
+    with first.db.get_connection() as conn:
+        assert conn.execute("SELECT status FROM scan_runs").fetchone() == ('cancelled',)
+        journal = conn.execute("SELECT folder_path FROM scan_journal").fetchall()
+        # The folder being scanned when cancelled is rolled back, not journaled
+        assert journal == [(str(Path('Course') / '01. Basics'),)]
+        assert conn.execute("SELECT COUNT(*) FROM video_files").fetchone()[0] == 2
+
+    # Resume: the journaled folder is not probed again
+    resume_backend = FakeMediaBackend()
+    resumed = _scanner(tmp_path, resume_backend)
+    assert resumed.scan_directory(str(root)) == (6, 3)
+    assert not resumed.last_scan_cancelled
+    assert resume_backend.calls['probe'] == 4
+
+    with resumed.db.get_connection() as conn:
+        assert conn.execute("SELECT status FROM scan_runs").fetchone() == ('complete',)
+        assert conn.execute("SELECT COUNT(*) FROM scan_journal").fetchone()[0] == 0
+        assert conn.execute("SELECT COUNT(*) FROM video_files").fetchone()[0] == 6
+
+
+def _tracks(scan):
+    with scan.db.get_connection() as conn:
+        audio = conn.execute(
+            "SELECT video_file_path, audio_file_name, match_score FROM audio_tracks "
+            "WHERE track_type = 'external' ORDER BY 1, 2"
+        ).fetchall()
+        subs = conn.execute(
+            "SELECT video_file_path, subtitle_file_name FROM subtitle_tracks "
+            "WHERE track_type = 'external' ORDER BY 1, 2"
+        ).fetchall()
+    return audio, subs
+
+
+def test_process_executor_matches_like_threads(tmp_path):
+    results = {}
+    for executor in ('thread', 'process'):
+        root = tmp_path / executor / 'library'
+        folder = _make_library(root)
+        for n in range(1, LESSONS + 1):
+            (folder / f"{n:02d}. Lesson [rus].mka").write_bytes(b'audio')
+        (folder / "Unrelated track.mka").write_bytes(b'audio')
+
+        backend = FakeMediaBackend()
+        scan = VideoScanner(config_file=str(tmp_path / 'missing.ini'),
+                            data_dir=tmp_path / executor / 'data', media_backend=backend)
+        scan.executor = executor
+        scan.process_workers = 2
+        scan.PROCESS_MATCH_MIN_PAIRS = 1
+        scan.scan_directory(str(root))
+
+        if executor == 'process':
+            assert scan.metrics.snapshot()['counters']['name_match_process_batches'] == 2
+        # Only audio files that match a video are probed
+        assert backend.calls['probe'] == LESSONS * 2
+        audio, subs = _tracks(scan)
+        results[executor] = ([(Path(v).name, a, s) for v, a, s in audio],
+                             [(Path(v).name, s) for v, s in subs])
+
+    assert results['thread'] == results['process']
+    audio, subs = results['thread']
+    assert [(v, a) for v, a, _ in audio] == [
+        (f"{n:02d}. Lesson.mp4", f"{n:02d}. Lesson [rus].mka") for n in range(1, LESSONS + 1)
+    ]
+    assert subs == [("01. Lesson.mp4", "01. Lesson.ru.srt")]
+
+
+def test_failed_thumbnails_are_retried_then_recorded(tmp_path):
+    root = tmp_path / 'library'
+    _make_library(root)
+
+    # 02: frames time out with accurate seeking only; 03: frames never work
+    backend = FakeMediaBackend(slow_frames=('02.',), broken_frames=('03.',))
+    scan = _scanner(tmp_path, backend)
+    scan.scan_directory(str(root))
+    count = scan.thumbnail_count
+
+    assert scan.stats['thumbnails_deferred'] == 2 * count
+    assert scan.stats['thumbnails_recovered'] == count
+    assert scan.stats['thumbnails_failed'] == count
+    with scan.db.get_connection() as conn:
+        thumbs = dict(conn.execute("SELECT file_name, thumbnails_json FROM video_files").fetchall())
+        failures = conn.execute("SELECT file_path, stage, attempts FROM media_failures").fetchall()
+    assert len(json.loads(thumbs['02. Lesson.mp4'])) == count
+    assert thumbs['03. Lesson.mp4'] is None
+    assert failures == [(str(root / 'Course' / '01. Basics' / '03. Lesson.mp4'), 'thumbnails', 1)]
+
+    # Unchanged broken file: not re-attempted on rescan
+    rescan_backend = FakeMediaBackend(broken_frames=('03.',))
+    rescan = _scanner(tmp_path, rescan_backend)
+    rescan.scan_directory(str(root))
+    assert rescan_backend.calls['frame'] == 0
+    assert rescan.stats['thumbnails_deferred'] == 0
+
+
+def test_frame_timeout_follows_seek_latency(tmp_path):
+    scan = _scanner(tmp_path, FakeMediaBackend())
+    assert scan._frame_timeout('a.mp4') == scan.ffmpeg_timeout
+
+    scan._record_frame_latency('a.mp4', 3.0)
+    assert scan._frame_timeout('a.mp4') == 12.0
+    assert scan._frame_timeout('b.mp4', file_size=2 * 1024 ** 3) == 16.0  # scan-wide latency + size
+    scan._record_frame_latency('a.mp4', 0.1)  # smoothed: 3.0 + 0.3 * (0.1 - 3.0)
+    assert abs(scan._frame_timeout('a.mp4') - 2.13 * 4) < 1e-9
+    scan._record_frame_latency('c.mp4', 100.0)
+    assert scan._frame_timeout('c.mp4') == scan.ffmpeg_timeout_max
+
+
+def test_nearest_keyframes():
+    # Each keyframe once while a neighbour is free; targets unchanged without keyframes
+    assert nearest_keyframes([1.0, 9.0, 11.0], [0, 10, 20]) == [0, 10, 20]
+    assert nearest_keyframes([1.0, 2.0, 3.0], [0]) == [0, 0, 0]
+    assert nearest_keyframes([5.0], []) == [5.0]
+
+
+def test_keyframe_seek_mode(tmp_path):
+    root = tmp_path / 'library'
+    _make_library(root)
+
+    backend = FakeMediaBackend(duration=120.0, keyframe_interval=10.0)
+    scan = _scanner(tmp_path, backend)
+    scan.seek_mode = 'keyframe'
+    seeks = []
+    extract = backend.extract_frame
+
+    def recording_extract(video_path, time_sec, *args):
+        seeks.append((round(time_sec, 3), args[-1]))
+        return extract(video_path, time_sec, *args)
+
+    backend.extract_frame = recording_extract
+    scan.scan_directory(str(root))
+
+    assert backend.calls['keyframes'] == LESSONS
+    assert scan.stats['thumbnails_generated'] == LESSONS * scan.thumbnail_count
+    # Every seek lands just past a distinct keyframe, without accurate seeking
+    assert all(mode == 'keyframe' for _, mode in seeks)
+    assert all(round((t - 0.001) % 10.0, 3) == 0 for t, _ in seeks)
+    assert len({t for t, _ in seeks}) == scan.thumbnail_count
+
+
+def test_unreadable_folder_is_not_pruned(tmp_path, monkeypatch):
+    root = tmp_path / 'library'
+    for module in ('A', 'B'):
+        folder = root / 'Course' / module
+        folder.mkdir(parents=True)
+        for n in range(1, 3):
+            (folder / f"{n:02d}. Lesson.mp4").write_bytes(f"{module} {n}".encode() * 100)
+
+    scan = _scanner(tmp_path, FakeMediaBackend())
+    scan.scan_directory(str(root))
+    with scan.db.get_connection() as conn:
+        conn.execute("UPDATE video_files SET last_position = 42")
+
+    # B can't be listed: neither by the discovery walk nor by iterdir
+    unreadable = root / 'Course' / 'B'
+    scandir, iterdir = os.scandir, Path.iterdir
+
+    def denied(path):
+        if Path(path) == unreadable:
+            raise PermissionError(13, 'Permission denied', str(path))
+
+    def guarded_scandir(path='.'):
+        denied(path)
+        return scandir(path)
+
+    def guarded_iterdir(self):
+        denied(self)
+        return iterdir(self)
+
+    monkeypatch.setattr(os, 'scandir', guarded_scandir)
+    monkeypatch.setattr(Path, 'iterdir', guarded_iterdir)
+    rescan = _scanner(tmp_path, FakeMediaBackend())
+    rescan.scan_directory(str(root))
+
+    assert rescan.last_prune_report is None or not rescan.last_prune_report['videos']
+    with rescan.db.get_connection() as conn:
+        positions = conn.execute(
+            "SELECT last_position FROM video_files WHERE folder_path = ?", (str(Path('Course') / 'B'),)
+        ).fetchall()
+        folder = conn.execute("SELECT COUNT(*) FROM folders WHERE path = ?",
+                              (str(Path('Course') / 'B'),)).fetchone()[0]
+    assert positions == [(42,), (42,)]
+    assert folder == 1
+
+
+def _counts(scan):
+    with scan.db.get_connection() as conn:
+        return {table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                for table in ('video_files', 'folders', 'audio_tracks', 'subtitle_tracks')}
+
+
+def test_prune_removes_missing_entries(tmp_path):
+    root = tmp_path / 'library'
+    folder = _make_library(root)
+    extra = root / 'Course' / '02. Extra'
+    extra.mkdir()
+    (extra / '01. Bonus.mp4').write_bytes(b'bonus' * 1000)
+    other = tmp_path / 'other'
+    (other / 'Talks').mkdir(parents=True)
+    (other / 'Talks' / '01. Talk.mp4').write_bytes(b'talk' * 1000)
+
+    scan = _scanner(tmp_path, FakeMediaBackend(subtitle_streams=1))
+    scan.scan_directory(str(root))
+    scan.scan_directory(str(other))
+    with scan.db.get_connection() as conn:
+        thumbs = [Path(p) for (value,) in conn.execute(
+            "SELECT thumbnails_json FROM video_files WHERE file_name IN ('01. Lesson.mp4', '01. Bonus.mp4')"
+        ) for p in json.loads(value)]
+    assert thumbs and all(p.exists() for p in thumbs)
+    before = _counts(scan)
+
+    removed = str(folder / '01. Lesson.mp4')
+    (folder / '01. Lesson.mp4').unlink()
+    shutil.rmtree(extra)
+
+    # Dry run: reported, nothing written or deleted
+    dry = _scanner(tmp_path, FakeMediaBackend(subtitle_streams=1))
+    dry.scan_directory(str(root), dry_run=True)
+    assert dry.last_prune_report['dry_run']
+    assert sorted(dry.last_prune_report['videos']) == sorted([removed, str(extra / '01. Bonus.mp4')])
+    assert dry.last_prune_report['folders'] == [str(Path('Course') / '02. Extra')]
+    assert _counts(dry) == before
+    assert all(p.exists() for p in thumbs)
+
+    # Deferred prune of both roots: the missing entries go, the other root stays
+    real = _scanner(tmp_path, FakeMediaBackend(subtitle_streams=1))
+    real.scan_directory(str(root), defer_prune=True)
+    real.scan_directory(str(other), defer_prune=True)
+    assert _counts(real) == before
+    reports = real.run_deferred_prunes()
+    assert [len(r['videos']) for r in reports] == [2, 0]
+
+    assert not any(p.exists() for p in thumbs)
+    with real.db.get_connection() as conn:
+        files = {row[0] for row in conn.execute("SELECT file_path FROM video_files")}
+        folders = {row[0] for row in conn.execute("SELECT path FROM folders")}
+        tracks = conn.execute("""
+            SELECT COUNT(*) FROM subtitle_tracks
+            WHERE video_id NOT IN (SELECT id FROM video_files)
+        """).fetchone()[0]
+        external = conn.execute(
+            "SELECT COUNT(*) FROM subtitle_tracks WHERE track_type = 'external'").fetchone()[0]
+    assert removed not in files and len(files) == LESSONS  # 3 lessons + the talk
+    assert str(other / 'Talks' / '01. Talk.mp4') in files
+    assert str(Path('Course') / '02. Extra') not in folders and 'Talks' in folders
+    assert tracks == 0 and external == 0
+    assert _counts(real)['subtitle_tracks'] == LESSONS  # embedded: 3 lessons + the talk
@@ -0,0 +1,180 @@
+"""
+Subtitle transcript index: transcripts.py parsers and encoding detection,
+incremental indexing by VideoScanner and DatabaseManager.search_transcripts.
+
+Run: python -m pytest tests/test_transcripts.py
+"""
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from scanner import VideoScanner
+from media_backend import FakeMediaBackend
+from transcripts import iter_cues, detect_encoding, build_match_query
+
+SRT = """1
+00:00:01,500 --> 00:00:04,250
+<i>Hello</i>   and
+<b>welcome</b>
+
+2
+01:02:03,5 --> 01:02:04,05
+Second cue
+"""
+
+VTT = """WEBVTT
+Kind: captions
+
+NOTE a comment
+that spans lines
+
+STYLE
+::cue { color: yellow }
+
+intro
+00:01.000 --> 00:02.500 align:start
+<v Teacher>Gradient <c.hl>descent</c>
+
+01:00:00.250 --> 01:00:01.000
+Hour mark
+"""
+
+ASS = """[Script Info]
+Title: Lesson
+
+[V4+ Styles]
+Format: Name, Fontname
+Style: Default,Arial
+
+[Events]
+Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
+Comment: 0,0:00:00.00,0:00:01.00,Default,,0,0,0,,hidden
+Dialogue: 0,0:00:05.10,0:00:07.00,Default,,0,0,0,,{\\b1}First{\\b0} line\\Nsecond, with commas
+Dialogue: 0,1:00:00.00,1:00:02.50,Default,,0,0,0,,{\\pos(10,10)}
+"""
+
+
+def _write(path, text, encoding='utf-8'):
+    path.write_bytes(text.encode(encoding))
+    return path
+
+
+def test_srt_cues(tmp_path):
+    cues = list(iter_cues(_write(tmp_path / 'a.srt', SRT)))
+    assert cues == [(1.5, 4.25, 'Hello and welcome'), (3723.5, 3724.05, 'Second cue')]
+
+
+def test_vtt_cues(tmp_path):
+    cues = list(iter_cues(_write(tmp_path / 'a.vtt', VTT)))
+    assert cues == [(1.0, 2.5, 'Gradient descent'), (3600.25, 3601.0, 'Hour mark')]
+
+
+def test_ass_cues(tmp_path):
+    # Comments and cues left empty by override removal are skipped
+    cues = list(iter_cues(_write(tmp_path / 'a.ass', ASS)))
+    assert cues == [(5.1, 7.0, 'First line second, with commas')]
+
+
+def test_unknown_extension_yields_nothing(tmp_path):
+    assert list(iter_cues(_write(tmp_path / 'a.txt', SRT))) == []
+
+
+def test_encoding_detection(tmp_path):
+    text = "1\n00:00:01,000 --> 00:00:02,000\nПривет, мир\n"
+    assert detect_encoding(_write(tmp_path / 'utf8.srt', text)) == 'utf-8'
+    assert detect_encoding(_write(tmp_path / 'bom.srt', text, 'utf-8-sig')) == 'utf-8-sig'
+    assert detect_encoding(_write(tmp_path / 'utf16.srt', text, 'utf-16')) == 'utf-16'
+    # Not valid UTF-8: legacy Cyrillic subtitles fall back to cp1251
+    cp1251 = _write(tmp_path / 'cp1251.srt', text, 'cp1251')
+    assert detect_encoding(cp1251) == 'cp1251'
+    assert list(iter_cues(cp1251)) == [(1.0, 2.0, 'Привет, мир')]
+
+
+def test_encoding_detection_multibyte_cut_by_sample(tmp_path):
+    # "Ж" is two bytes in UTF-8; the sample ends between them
+    path = _write(tmp_path / 'cut.srt', 'a' * 9 + 'Ж')
+    assert detect_encoding(path, sample_size=10) == 'utf-8'
+
+
+def test_build_match_query():
+    assert build_match_query('gradient desc') == '"gradient"* "desc"*'
+    assert build_match_query('"AND" (OR) c++ -x') == '"AND"* "OR"* "c"* "x"*'
+    assert build_match_query('Привет!') == '"Привет"*'
+    assert build_match_query(' ?! ') == ''
+
+
+def _make_course(root):
+    folder = root / 'Course'
+    folder.mkdir(parents=True)
+    for n in (1, 2):
+        (folder / f"{n:02d}. Lesson.mp4").write_bytes(f"lesson {n}".encode() * 1000)
+    _write(folder / '01. Lesson.srt',
+           "1\n00:00:10,000 --> 00:00:12,000\nToday: gradient descent\n\n"
+           "2\n00:01:00,000 --> 00:01:05,000\nA long cue that mentions the gradient once "
+           "among many other words about optimization and learning rates\n")
+    _write(folder / '02. Lesson.vtt',
+           "WEBVTT\n\n00:00:30.000 --> 00:00:31.000\nGradient descent, gradient descent\n\n"
+           "00:00:40.000 --> 00:00:41.000\nNothing relevant here\n")
+    return folder
+
+
+def _scanner(tmp_path):
+    scan = VideoScanner(config_file=str(tmp_path / 'missing.ini'),
+                        data_dir=tmp_path / 'data', media_backend=FakeMediaBackend())
+    scan.index_transcripts = True
+    return scan
+
+
+def _hits(db, query):
+    return [(hit['file_name'], hit['start_seconds']) for hit in db.search_transcripts(query)]
+
+
+def test_unchanged_transcripts_are_skipped(tmp_path):
+    root = tmp_path / 'library'
+    folder = _make_course(root)
+
+    cold = _scanner(tmp_path)
+    cold.scan_directory(str(root))
+    assert cold.stats['transcripts_indexed'] == 2
+    assert cold.stats['transcript_cues'] == 4
+
+    warm = _scanner(tmp_path)
+    warm.scan_directory(str(root))
+    assert warm.stats['transcripts_indexed'] == 0
+
+    # An edited file (new mtime and size) is re-parsed, its old cues replaced
+    srt = folder / '01. Lesson.srt'
+    _write(srt, "1\n00:00:03,000 --> 00:00:04,000\nRewritten intro\n")
+    stat = srt.stat()
+    os.utime(srt, (stat.st_atime, stat.st_mtime + 10))
+
+    edited = _scanner(tmp_path)
+    edited.scan_directory(str(root))
+    assert edited.stats['transcripts_indexed'] == 1
+    assert edited.stats['transcript_cues'] == 1
+    assert _hits(edited.db, 'rewritten') == [('01. Lesson.mp4', 3.0)]
+    assert _hits(edited.db, 'optimization') == []
+
+
+def test_search_transcripts_rank_order(tmp_path):
+    root = tmp_path / 'library'
+    _make_course(root)
+    scan = _scanner(tmp_path)
+    scan.scan_directory(str(root))
+
+    # Denser matches rank first; a prefix finds the whole word
+    assert _hits(scan.db, 'gradient desc') == [
+        ('02. Lesson.mp4', 30.0),
+        ('01. Lesson.mp4', 10.0),
+    ]
+    assert _hits(scan.db, 'gradient') == [
+        ('02. Lesson.mp4', 30.0),
+        ('01. Lesson.mp4', 10.0),
+        ('01. Lesson.mp4', 60.0),
+    ]
+    hit = scan.db.search_transcripts('optimiz')[0]
+    assert (hit['folder_path'], hit['end_seconds']) == ('Course', 65.0)
+    assert scan.db.search_transcripts('  ') == []
+    assert scan.db.search_transcripts('?!') == []
@@ -1,12 +1,14 @@
 import os
 import hashlib
 from pathlib import Path
-from PyQt6.QtCore import QObject, QProcess, pyqtSignal, QSize
+from PyQt6.QtCore import QObject, QProcess, QTimer, pyqtSignal, QSize
 from PyQt6.QtGui import QPixmap
+from media_governor import get_governor, PRIORITY_MARKERS
 
 class ThumbnailProvider(QObject):
     """Utility to generate and cache video thumbnails."""
     finished = pyqtSignal(str, QPixmap) # marker_id or timestamp, pixmap
+    failed = pyqtSignal(str) # marker_id or timestamp whose thumbnail was not made
 
     def __init__(self, parent=None, ffmpeg_path=None):
         super().__init__(parent)
@@ -15,8 +17,15 @@ class ThumbnailProvider(QObject):
         self.cache_dir.mkdir(parents=True, exist_ok=True)
         self.process = QProcess()
         self.process.finished.connect(self._on_finished)
+        self.process.errorOccurred.connect(self._on_error)
         self.current_request = None
         self.queue = [] # [(video_path, timestamp, cache_path, request_id), ...]
+        # Media process slot (see media_governor); retried while all slots are taken
+        self.slot = None
+        self.retry_timer = QTimer(self)
+        self.retry_timer.setSingleShot(True)
+        self.retry_timer.setInterval(100)
+        self.retry_timer.timeout.connect(self._next)
 
     def get_thumbnail(self, video_path, timestamp, marker_id=None):
         """Get thumbnail from cache or generate it."""
@@ -42,12 +51,33 @@ class ThumbnailProvider(QObject):
         self._generate(video_path, timestamp, cache_path, file_id)
         return None
 
+    def invalidate(self, video_path, marker_id):
+        """Drop the cached thumbnail of a marker (e.g. after its position changed)."""
+        video_id = hashlib.md5(str(video_path).encode()).hexdigest()
+        cache_path = self.cache_dir / video_id / f"marker_{marker_id}.jpg"
+        for req in [req for req in self.queue if req[2] == cache_path]:
+            self.queue.remove(req)
+            self.failed.emit(str(req[3]))
+        try:
+            cache_path.unlink()
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"Error removing thumbnail {cache_path}: {e}")
+
     def _generate(self, video_path, timestamp, cache_path, request_id):
         if self.process.state() != QProcess.ProcessState.NotRunning:
             print(f"DEBUG: ThumbnailProvider busy, queueing {request_id}")
             self.queue.append((video_path, timestamp, cache_path, request_id))
             return
 
+        self.slot = get_governor().try_acquire(PRIORITY_MARKERS, video_path)
+        if self.slot is None:
+            # All media slots are busy (e.g. a library scan): keep the order and retry
+            self.queue.insert(0, (video_path, timestamp, cache_path, request_id))
+            self.retry_timer.start()
+            return
+
         print(f"DEBUG: Generating thumbnail for {request_id} at {timestamp}s")
         self.current_request = (request_id, cache_path)
         
@@ -65,7 +95,13 @@ class ThumbnailProvider(QObject):
         
         self.process.start(str(self.ffmpeg_path), args)
 
+    def _on_error(self, error):
+        if error == QProcess.ProcessError.FailedToStart:
+            self._on_finished()
+
     def _on_finished(self):
+        get_governor().release(self.slot)
+        self.slot = None
         if self.current_request:
             req_id, path = self.current_request
             if path.exists():
@@ -74,9 +110,13 @@ class ThumbnailProvider(QObject):
                 self.finished.emit(str(req_id), pixmap)
             else:
                 print(f"DEBUG: Thumbnail generation failed for {req_id} (file not created)")
+                self.failed.emit(str(req_id))
         self.current_request = None
         
-        # Process next in queue
-        if self.queue:
+        self._next()
+
+    def _next(self):
+        """Process next in queue."""
+        if self.queue and self.process.state() == QProcess.ProcessState.NotRunning:
             next_req = self.queue.pop(0)
             self._generate(*next_req)
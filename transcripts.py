@@ -0,0 +1,191 @@
+"""
+Streaming parsers for external subtitle files (SRT, WebVTT, ASS/SSA).
+
+Used by the scanner to build the subtitle transcript index, so that
+phrases spoken in lectures can be searched across the whole library.
+"""
+import re
+from pathlib import Path
+
+# Extensions that carry timed text cues we know how to parse
+TRANSCRIPT_EXTENSIONS = {'.srt', '.vtt', '.ass', '.ssa'}
+
+_SRT_TIMING = re.compile(
+    r'(\d+):(\d{1,2}):(\d{1,2})[,.](\d{1,3})\s*-->\s*(\d+):(\d{1,2}):(\d{1,2})[,.](\d{1,3})'
+)
+_VTT_TIMING = re.compile(
+    r'(?:(\d+):)?(\d{1,2}):(\d{1,2})\.(\d{1,3})\s*-->\s*(?:(\d+):)?(\d{1,2}):(\d{1,2})\.(\d{1,3})'
+)
+_ASS_TIME = re.compile(r'(\d+):(\d{1,2}):(\d{1,2})[.:](\d{1,3})')
+_HTML_TAG = re.compile(r'<[^>]*>')
+_ASS_OVERRIDE = re.compile(r'\{[^}]*\}')
+_WHITESPACE = re.compile(r'\s+')
+
+
+def _to_seconds(hours, minutes, seconds, fraction):
+    """Convert timestamp components to seconds ("5" = .5, "05" = .05)."""
+    frac = int(fraction) / (10 ** len(fraction)) if fraction else 0
+    return int(hours or 0) * 3600 + int(minutes) * 60 + int(seconds) + frac
+
+
+def _clean_text(text):
+    """Strip markup and collapse whitespace."""
+    text = _ASS_OVERRIDE.sub('', text)
+    text = _HTML_TAG.sub('', text)
+    text = text.replace('\\N', ' ').replace('\\n', ' ').replace('\\h', ' ')
+    return _WHITESPACE.sub(' ', text).strip()
+
+
+def detect_encoding(path, sample_size=65536):
+    """Guess file encoding from BOM or a sample (UTF-8, then cp1251)."""
+    with open(path, 'rb') as f:
+        sample = f.read(sample_size)
+
+    if sample.startswith(b'\xef\xbb\xbf'):
+        return 'utf-8-sig'
+    if sample.startswith((b'\xff\xfe', b'\xfe\xff')):
+        return 'utf-16'
+
+    try:
+        sample.decode('utf-8')
+        return 'utf-8'
+    except UnicodeDecodeError as e:
+        # A multibyte character cut at the end of the sample is still UTF-8
+        if e.start >= len(sample) - 3 and len(sample) == sample_size:
+            return 'utf-8'
+    return 'cp1251'
+
+
+def _iter_srt(lines):
+    """Yield cues from SRT lines (also tolerates WebVTT-like files)."""
+    start = end = None
+    text_lines = []
+
+    for line in lines:
+        line = line.strip()
+        if not line:
+            if start is not None and text_lines:
+                yield start, end, _clean_text(' '.join(text_lines))
+            start = end = None
+            text_lines = []
+            continue
+
+        if start is None:
+            match = _SRT_TIMING.search(line)
+            if match:
+                g = match.groups()
+                start = _to_seconds(*g[0:4])
+                end = _to_seconds(*g[4:8])
+            # Otherwise it's the cue counter
+            continue
+
+        text_lines.append(line)
+
+    if start is not None and text_lines:
+        yield start, end, _clean_text(' '.join(text_lines))
+
+
+def _iter_vtt(lines):
+    """Yield cues from WebVTT lines."""
+    start = end = None
+    text_lines = []
+    skip_block = False
+
+    for line in lines:
+        line = line.strip()
+        if not line:
+            if start is not None and text_lines:
+                yield start, end, _clean_text(' '.join(text_lines))
+            start = end = None
+            text_lines = []
+            skip_block = False
+            continue
+
+        if skip_block:
+            continue
+
+        if start is None:
+            if line.startswith(('WEBVTT', 'NOTE', 'STYLE', 'REGION')):
+                skip_block = True
+                continue
+            match = _VTT_TIMING.search(line)
+            if match:
+                g = match.groups()
+                start = _to_seconds(*g[0:4])
+                end = _to_seconds(*g[4:8])
+            # Otherwise it's the cue identifier
+            continue
+
+        text_lines.append(line)
+
+    if start is not None and text_lines:
+        yield start, end, _clean_text(' '.join(text_lines))
+
+
+def _iter_ass(lines):
+    """Yield cues from the [Events] section of ASS/SSA lines."""
+    in_events = False
+    fields = None
+
+    for line in lines:
+        line = line.strip()
+        if line.startswith('['):
+            in_events = line.lower() == '[events]'
+            continue
+        if not in_events:
+            continue
+
+        if line.lower().startswith('format:'):
+            fields = [f.strip().lower() for f in line[7:].split(',')]
+            continue
+
+        if not line.lower().startswith('dialogue:') or not fields:
+            continue
+
+        # Text is always the last field and may itself contain commas
+        values = line[9:].split(',', len(fields) - 1)
+        if len(values) != len(fields):
+            continue
+        row = dict(zip(fields, values))
+
+        start_match = _ASS_TIME.search(row.get('start', ''))
+        end_match = _ASS_TIME.search(row.get('end', ''))
+        if not start_match or not end_match:
+            continue
+
+        text = _clean_text(row.get('text', ''))
+        if text:
+            yield _to_seconds(*start_match.groups()), _to_seconds(*end_match.groups()), text
+
+
+def iter_cues(path):
+    """
+    Stream (start_seconds, end_seconds, text) cues from a subtitle file.
+    The file is read line by line, so large transcripts are never loaded whole.
+    """
+    path = Path(path)
+    ext = path.suffix.lower()
+    if ext not in TRANSCRIPT_EXTENSIONS:
+        return
+
+    encoding = detect_encoding(path)
+    with open(path, 'r', encoding=encoding, errors='replace') as f:
+        if ext == '.srt':
+            parser = _iter_srt
+        elif ext == '.vtt':
+            parser = _iter_vtt
+        else:
+            parser = _iter_ass
+
+        for start, end, text in parser(f):
+            if text:
+                yield start, end, text
+
+
+def build_match_query(text):
+    """
+    Build an FTS5 MATCH expression from free user input.
+    Every word becomes a quoted prefix term, so punctuation can't break the syntax.
+    """
+    words = re.findall(r'\w+', text, re.UNICODE)
+    return ' '.join(f'"{w}"*' for w in words)
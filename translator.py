@@ -4,6 +4,20 @@ Translator module for managing translations across the application.
 import json
 from pathlib import Path
 
+_MISSING = object()
+
+
+def flatten_translations(tree, prefix=''):
+    """Turn nested translation dicts into {'section.key': value}."""
+    flat = {}
+    for name, value in tree.items():
+        key = f"{prefix}{name}"
+        if isinstance(value, dict):
+            flat.update(flatten_translations(value, key + '.'))
+        else:
+            flat[key] = value
+    return flat
+
 
 class Translator:
     """Class for managing translations"""
@@ -11,6 +25,9 @@ class Translator:
         self.lang_dir = lang_dir or Path(__file__).parent / 'resources' / 'translations'
         self.current_lang = 'ru'
         self.translations = {}
+        self.flat = {}           # {'section.key': value}, built once per language
+        self._formatters = {}    # {'section.key': bound str.format} for templates with fields
+        self._missing = set()    # keys already known to be absent
         self.load_language(self.current_lang)
 
     def load_language(self, lang_code):
@@ -21,27 +38,57 @@ class Translator:
             return False
         try:
             with open(lang_file, 'r', encoding='utf-8') as f:
-                self.translations = json.load(f)
+                translations = json.load(f)
+            self._compile(translations)
             self.current_lang = lang_code
             return True
         except Exception as e:
             print(f"Error loading language file: {e}")
             return False
 
-    def get(self, key, **kwargs):
-        keys = key.split('.')
+    def _compile(self, translations):
+        """Flatten the language tree and precompile format templates."""
+        self.translations = translations
+        self.flat = flatten_translations(translations)
+        # Strings without braces format to themselves: no need to call format()
+        self._formatters = {
+            key: value.format for key, value in self.flat.items()
+            if isinstance(value, str) and ('{' in value or '}' in value)
+        }
+        self._missing = set()
+
+    def _lookup_section(self, key):
+        """Slow path for keys that are not leaves (e.g. a whole section)."""
+        if key in self._missing:
+            return _MISSING
         value = self.translations
         try:
-            for k in keys:
+            for k in key.split('.'):
                 value = value[k]
-            if kwargs:
-                return value.format(**kwargs)
-            return value
         except (KeyError, TypeError):
-            return key
+            self._missing.add(key)
+            return _MISSING
+        self.flat[key] = value
+        return value
+
+    def get(self, key, **kwargs):
+        value = self.flat.get(key, _MISSING)
+        if value is _MISSING:
+            value = self._lookup_section(key)
+            if value is _MISSING:
+                return key
+        if kwargs:
+            formatter = self._formatters.get(key)
+            if formatter is None:
+                return value
+            try:
+                return formatter(**kwargs)
+            except (KeyError, TypeError):
+                return key
+        return value
 
-    def __call__(self, key, **kwargs):
-        return self.get(key, **kwargs)
+    # tr(...) is the hot path: skip the extra call frame of a wrapper
+    __call__ = get
 
 
 # Global translator instance